@@ -0,0 +1,94 @@
+# benchmarks/bench_get_all_addresses.py
+"""
+Benchmark utils.get_all_addresses against a fake node holding a large wallet.
+
+    python benchmarks/bench_get_all_addresses.py --addresses 100000
+
+The legacy N+1 implementation (one getaccount RPC per address) is timed on a
+sample and extrapolated, since running it over the full wallet takes minutes.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_node import FakeNode
+from pepecoin.transport import RPCTransport
+from pepecoin.utils import get_all_addresses, iter_all_addresses
+
+
+class Node:
+    """Just enough of Pepecoin for the utils helpers."""
+
+    def __init__(self, port):
+        self.rpc_connection = RPCTransport('bench', 'bench', port=port)
+
+
+def make_wallet(size, with_accounts):
+    wallet = []
+    for i in range(size):
+        entry = {'address': f"P{i:033d}", 'amount': (i % 1000) / 1000 + 0.00000001, 'confirmations': i % 50}
+        if with_accounts:
+            entry['account'] = f"acc{i % 200}"
+        wallet.append(entry)
+    return wallet
+
+
+def legacy_get_all_addresses(node, limit):
+    addresses_info = node.rpc_connection.listreceivedbyaddress(0, True)
+    result = {}
+    for info in addresses_info[:limit]:
+        node.rpc_connection.getaccount(info['address'])
+        result[info['address']] = float(info['amount'])
+    return result
+
+
+def run(size, legacy_sample):
+    results = {}
+    for with_accounts in (True, False):
+        wallet = make_wallet(size, with_accounts)
+        accounts = {entry['address']: f"acc{i % 200}" for i, entry in enumerate(wallet)}
+        handlers = {
+            'listreceivedbyaddress': lambda *args: wallet,
+            'getaccount': lambda address: accounts[address],
+        }
+        label = 'with_account_field' if with_accounts else 'batched_getaccount'
+        with FakeNode(handlers) as fake:
+            node = Node(fake.port)
+
+            start = time.perf_counter()
+            addresses = get_all_addresses(node)
+            results[f"get_all_addresses[{label}]"] = time.perf_counter() - start
+            assert len(addresses) == size
+
+            start = time.perf_counter()
+            streamed = sum(1 for _ in iter_all_addresses(node))
+            results[f"iter_all_addresses[{label}]"] = time.perf_counter() - start
+            assert streamed == size
+
+            if not with_accounts:
+                start = time.perf_counter()
+                legacy_get_all_addresses(node, legacy_sample)
+                elapsed = time.perf_counter() - start
+                results["legacy_n_plus_1[extrapolated]"] = elapsed * size / legacy_sample
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--addresses', type=int, default=100_000)
+    parser.add_argument('--legacy-sample', type=int, default=2_000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    for name, seconds in run(args.addresses, args.legacy_sample).items():
+        print(f"{name:45s} {seconds:8.3f}s")
+
+
+if __name__ == '__main__':
+    main()
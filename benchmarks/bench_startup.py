@@ -0,0 +1,77 @@
+# benchmarks/bench_startup.py
+"""
+Measure process start-up cost of the pepecoin package: import time and time
+to a usable client, each in a fresh interpreter.
+
+    python benchmarks/bench_startup.py --runs 20 --output startup.json
+    python benchmarks/bench_startup.py --max-import-ms 150   # exit 1 if slower
+
+Results are JSON with the median and max milliseconds of every scenario.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from pepecoin.simulator import PepecoinSimulator, SimulatedNode
+
+SCENARIOS = {
+    'python': "pass",
+    'import pepecoin': "import pepecoin",
+    'from pepecoin import Pepecoin': "from pepecoin import Pepecoin",
+    'Pepecoin(lazy=True)': "from pepecoin import Pepecoin; Pepecoin('u', 'p', port={port}, lazy=True, "
+                           "setup_logging=False)",
+    'Pepecoin() + connect': "from pepecoin import Pepecoin; Pepecoin('u', 'p', port={port}, setup_logging=False)",
+}
+
+TIMER = """
+import time
+_start = time.perf_counter()
+{code}
+print((time.perf_counter() - _start) * 1000)
+"""
+
+
+def time_scenario(code, runs):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', TIMER.format(code=code)], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return {'median_ms': statistics.median(timings), 'max_ms': max(timings), 'runs': runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+    parser.add_argument('--max-import-ms', type=float, help="fail if 'from pepecoin import Pepecoin' is slower")
+    args = parser.parse_args()
+
+    results = {}
+    with PepecoinSimulator(SimulatedNode(addresses=10, blocks=10)) as simulator:
+        for name, code in SCENARIOS.items():
+            results[name] = time_scenario(code.format(port=simulator.port), args.runs)
+            print(f"{name:32s} median {results[name]['median_ms']:7.1f}ms  max {results[name]['max_ms']:7.1f}ms",
+                  file=sys.stderr)
+
+    data = json.dumps({'python': sys.version.split()[0], 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(data + '\n')
+    else:
+        print(data)
+
+    if args.max_import_ms is not None and results['from pepecoin import Pepecoin']['median_ms'] > args.max_import_ms:
+        print(f"REGRESSION import takes longer than {args.max_import_ms}ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
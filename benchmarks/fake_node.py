@@ -0,0 +1,63 @@
+# benchmarks/fake_node.py
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeNode:
+    """
+    Local JSON-RPC server standing in for pepecoind in benchmarks.
+
+    ``handlers`` maps RPC method names to callables taking the call params.
+    Responses are encoded once per request, so large results cost the server
+    roughly what they cost a real node.
+    """
+
+    def __init__(self, handlers, host='127.0.0.1', port=0):
+        self.handlers = handlers
+        self.requests = 0
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                node.requests += 1
+                if isinstance(payload, list):
+                    body, status = [node.dispatch(item) for item in payload], 200
+                else:
+                    body = node.dispatch(payload)
+                    status = 500 if body['error'] else 200
+                data = json.dumps(body, default=float).encode('utf8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.host, self.port = self.httpd.server_address[:2]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def dispatch(self, request):
+        handler = self.handlers.get(request['method'])
+        if handler is None:
+            error = {'code': -32601, 'message': 'Method not found'}
+            return {'result': None, 'error': error, 'id': request.get('id')}
+        return {'result': handler(*request.get('params', [])), 'error': None, 'id': request.get('id')}
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return False
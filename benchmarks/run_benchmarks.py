@@ -0,0 +1,198 @@
+# benchmarks/run_benchmarks.py
+"""
+Throughput and tail-latency benchmarks of the main Pepecoin operations against
+a simulated pepecoind (``pepecoin.simulator``).
+
+    python benchmarks/run_benchmarks.py --latency-ms 1 --jitter-ms 2 --addresses 20000 \\
+        --output results.json
+
+    # fail (exit 1) if p50 latency or throughput regressed more than 20%
+    python benchmarks/run_benchmarks.py --baseline results.json --max-regression 0.2
+
+Results are written as JSON: run parameters under "meta" and, per operation,
+iterations, ops_per_sec and mean/p50/p90/p99/max latency in milliseconds.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from pepecoin import Pepecoin
+from pepecoin.simulator import PepecoinSimulator, SimulatedNode
+from pepecoin.utils import get_all_addresses
+
+MASS_TRANSFER_ACCOUNTS = 20
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(operation, iterations, concurrency):
+    """
+    Run ``operation`` ``iterations`` times on ``concurrency`` threads and summarize the latencies.
+    """
+    def timed(_):
+        start = time.perf_counter()
+        operation()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = list(pool.map(timed, range(iterations)))
+    else:
+        latencies = [timed(i) for i in range(iterations)]
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ms = 1000.0
+    return {
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'ops_per_sec': iterations / elapsed if elapsed else 0.0,
+        'mean_ms': sum(latencies) / len(latencies) * ms,
+        'p50_ms': percentile(latencies, 0.50) * ms,
+        'p90_ms': percentile(latencies, 0.90) * ms,
+        'p99_ms': percentile(latencies, 0.99) * ms,
+        'max_ms': latencies[-1] * ms,
+    }
+
+
+def build_operations(node, simulated, rng, iterations):
+    """
+    Map benchmark names to (operation, iteration scale). The scale shrinks the
+    iteration count for operations that touch the whole wallet.
+    """
+    addresses = [simulated.address(k) for k in range(simulated.address_count)]
+    block_hashes = [simulated.block_hash(h) for h in range(simulated.tip + 1)]
+    sources = [f"acc{j}" for j in range(min(MASS_TRANSFER_ACCOUNTS, simulated.account_count))]
+    amounts = [0.01] * len(sources)
+    plain_account = node.get_account('acc0')
+    # Size the pool for the whole burst: this measures checkout latency, not how fast
+    # a background refill can keep up with back-to-back pops.
+    node.get_address_pool('acc1', low_water=iterations, refill_batch=iterations + 1).refill()
+    pooled_account = node.get_account('acc1')
+
+    return {
+        'get_block': (lambda: node.get_block(rng.choice(block_hashes)), 1.0),
+        'get_balance_of_address': (lambda: node.get_balance_of_address(rng.choice(addresses)), 1.0),
+        'get_all_addresses': (lambda: get_all_addresses(node), 0.01),
+        'send_from': (lambda: node.send_from('acc0', rng.choice(addresses), 0.01), 1.0),
+        'mass_transfer_from_accounts': (
+            lambda: node.mass_transfer_from_accounts(sources, rng.choice(addresses), amounts), 0.1),
+        'mass_transfer_from_accounts[batched]': (
+            lambda: node.mass_transfer_from_accounts(sources, rng.choice(addresses), amounts, batched=True), 0.1),
+        'generate_address': (plain_account.generate_address, 1.0),
+        'generate_address[pooled]': (pooled_account.generate_address, 1.0),
+    }
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    simulated = SimulatedNode(addresses=args.addresses, utxos=args.utxos, accounts=args.accounts, blocks=args.blocks)
+    results = {}
+    with PepecoinSimulator(simulated, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                           seed=args.seed) as simulator:
+        node = Pepecoin('bench', 'bench', port=simulator.port)
+        try:
+            operations = build_operations(node, simulated, rng, args.iterations)
+            for name, (operation, scale) in operations.items():
+                if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                    continue
+                operation()  # warm up connections, pools and caches
+                iterations = max(1, int(args.iterations * scale))
+                results[name] = measure(operation, iterations, args.concurrency)
+        finally:
+            node.close()
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'addresses': args.addresses,
+            'utxos': args.utxos or args.addresses,
+            'accounts': args.accounts,
+            'blocks': args.blocks,
+            'iterations': args.iterations,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, max_regression):
+    """
+    Return a description of every operation whose p50 latency or throughput
+    is more than ``max_regression`` worse than in ``baseline``.
+    """
+    regressions = []
+    for name, current in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        if previous['p50_ms'] and current['p50_ms'] > previous['p50_ms'] * (1 + max_regression):
+            regressions.append(f"{name}: p50 {previous['p50_ms']:.3f}ms -> {current['p50_ms']:.3f}ms")
+        if current['ops_per_sec'] < previous['ops_per_sec'] * (1 - max_regression):
+            regressions.append(f"{name}: {previous['ops_per_sec']:.1f} -> {current['ops_per_sec']:.1f} ops/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="fixed delay added to every RPC request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="extra uniform random delay per request")
+    parser.add_argument('--addresses', type=int, default=10_000, help="addresses in the simulated wallet")
+    parser.add_argument('--utxos', type=int, help="unspent outputs in the simulated wallet (default: one per address)")
+    parser.add_argument('--accounts', type=int, default=200)
+    parser.add_argument('--blocks', type=int, default=1_000)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=1, help="threads issuing operations")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--only', nargs='*', help="run only operations starting with these names")
+    parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+    parser.add_argument('--baseline', help="JSON results of a previous run to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.2)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    report = run(args)
+    for name, stats in report['results'].items():
+        print(f"{name:40s} {stats['ops_per_sec']:9.1f} ops/s  p50 {stats['p50_ms']:8.3f}ms  "
+              f"p99 {stats['p99_ms']:8.3f}ms", file=sys.stderr)
+
+    data = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(data + '\n')
+    else:
+        print(data)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
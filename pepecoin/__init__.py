@@ -1,5 +1,29 @@
 # this is pepecoin/__init__.py
 
-from .pepecoin import Pepecoin
-# from .pepecoin_old import Pepecoin
-from .test_pepecoin import test_pepecoin_class
\ No newline at end of file
+# Submodules are imported on first attribute access, so `import pepecoin` stays
+# cheap and e.g. the async client does not pull in asyncio unless it is used.
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'Pepecoin': '.pepecoin',
+    'configure_logging': '.pepecoin',
+    'AsyncPepecoin': '.async_pepecoin',
+    'Account': '.account',
+    # from .pepecoin_old import Pepecoin
+    'test_pepecoin_class': '.test_pepecoin',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
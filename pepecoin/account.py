@@ -1,9 +1,15 @@
 # pepecoin/account.py
 
-from typing import List, Dict, Optional
-from bitcoinrpc.authproxy import AuthServiceProxy, JSONRPCException
+from typing import TYPE_CHECKING, List, Dict, Optional
+from bitcoinrpc.authproxy import JSONRPCException
 import logging
 
+from .transport import RPCTransport
+
+if TYPE_CHECKING:
+    from .address_pool import AddressPool
+    from .history import HistoryCursor, WalletHistory
+
 # Configure logging
 logger = logging.getLogger(__name__)
 # logging.basicConfig(level=logging.INFO)
@@ -15,8 +21,10 @@ class Account:
         rpc_user: str,
         rpc_password: str,
         host: str = '127.0.0.1',
-        port: int = 29373,
-        account_name: str = ''
+        port: int = 33873,
+        account_name: str = '',
+        transport: Optional[RPCTransport] = None,
+        address_pool: Optional['AddressPool'] = None
     ):
         """
         Initialize the Account instance.
@@ -26,10 +34,15 @@ class Account:
         :param host: RPC host.
         :param port: RPC port.
         :param account_name: The name of the account to manage.
+        :param transport: An existing RPC transport to share (e.g. the one owned by ``Pepecoin``).
+                          If omitted, the account opens its own.
+        :param address_pool: Pre-generated addresses for this account used by ``generate_address``.
         """
         self.account_name = account_name
-        rpc_url = f"http://{rpc_user}:{rpc_password}@{host}:{port}"
-        self.rpc_connection = AuthServiceProxy(rpc_url)
+        self.address_pool = address_pool
+        if transport is None:
+            transport = RPCTransport(rpc_user, rpc_password, host, port)
+        self.rpc_connection = transport
         logger.debug(f"Initialized RPC connection for account '{self.account_name}'.")
 
     # ------------------------- Balance Management -------------------------
@@ -62,6 +75,10 @@ class Account:
 
         :raises JSONRPCException: If the RPC call fails.
         """
+        if self.address_pool is not None:
+            address = self.address_pool.pop()
+            logger.debug(f"Issued pooled address '{address}' for account '{self.account_name}'.")
+            return address
         try:
             address = self.rpc_connection.getnewaddress(self.account_name)
             logger.info(f"Generated new address '{address}' for account '{self.account_name}'.")
@@ -112,6 +129,25 @@ class Account:
             logger.error(f"Failed to list transactions for account '{self.account_name}': {e}")
             raise e
 
+    def iter_history(
+        self,
+        state_path: Optional[str] = None,
+        cursor: Optional['HistoryCursor'] = None,
+        **kwargs
+    ) -> 'WalletHistory':
+        """
+        Stream this account's full transaction history without ``count``/``skip`` paging.
+
+        :param state_path: Optional JSON file used to persist the cursor between runs.
+        :param cursor: Explicit ``HistoryCursor`` to resume from.
+        :param kwargs: Passed to ``WalletHistory``.
+        :return: A ``WalletHistory`` yielding ``HistoryRecord``s of this account.
+        """
+        from .history import WalletHistory
+
+        return WalletHistory(self.rpc_connection, cursor=cursor, state_path=state_path,
+                             account=self.account_name, **kwargs)
+
     def send_to_address(
         self,
         address: str,
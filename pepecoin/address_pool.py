@@ -0,0 +1,209 @@
+# pepecoin/address_pool.py
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import List, Optional
+
+from bitcoinrpc.authproxy import JSONRPCException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOW_WATER = 20
+DEFAULT_REFILL_BATCH = 100
+
+
+class AddressPool:
+    """
+    Pre-generated receiving addresses for one account.
+
+    ``pop`` hands out an address from memory; a background thread tops the pool
+    up with one batched ``getnewaddress`` request whenever it falls to
+    ``low_water``. Only when the pool is empty does ``pop`` call the node itself.
+
+    With ``state_path`` the unissued addresses are written to disk (atomically)
+    on every refill, and each issued address is appended to ``<state_path>.issued``
+    before it is handed out, so an address is never issued twice, even across
+    restarts. The log is folded back into the state file on the next refill.
+    A crash can at worst lose unissued addresses, which stay unused in the wallet.
+    """
+
+    def __init__(
+        self,
+        rpc_connection,
+        account_name: str = '',
+        state_path: Optional[str] = None,
+        low_water: int = DEFAULT_LOW_WATER,
+        refill_batch: int = DEFAULT_REFILL_BATCH,
+        background: bool = True,
+    ):
+        """
+        :param rpc_connection: RPC transport supporting ``batch``.
+        :param account_name: Account the addresses are generated for.
+        :param state_path: JSON file the unissued addresses are persisted to.
+        :param low_water: Refill when this many addresses or fewer remain.
+        :param refill_batch: Number of addresses generated per refill.
+        :param background: Refill in a daemon thread; otherwise ``pop`` refills inline when low.
+        """
+        if refill_batch < 1:
+            raise ValueError("refill_batch must be at least 1")
+        self.rpc_connection = rpc_connection
+        self.account_name = account_name
+        self.state_path = state_path
+        self.low_water = low_water
+        self.refill_batch = refill_batch
+        self.background = background
+        self._addresses: deque = deque()
+        self._lock = threading.Lock()
+        self._refill_lock = threading.Lock()
+        self._log_lock = threading.Lock()  # guards the issued log; taken after _lock, never before
+        self._log = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._load()
+        if background:
+            self._thread = threading.Thread(target=self._run, name=f"pepecoin-address-pool-{account_name}",
+                                            daemon=True)
+            self._thread.start()
+            self._wakeup.set()
+
+    def __len__(self) -> int:
+        return len(self._addresses)
+
+    # ------------------------- Issuing -------------------------
+
+    def pop(self) -> str:
+        """
+        Hand out an address that has never been issued before.
+
+        :raises JSONRPCException: If the pool is empty and the node cannot generate an address.
+        """
+        with self._lock:
+            if self._addresses:
+                address = self._addresses.popleft()
+                remaining = len(self._addresses)
+            else:
+                address = None
+                remaining = 0
+        if address is not None:
+            self._record_issued(address)
+
+        if remaining <= self.low_water:
+            if self.background:
+                self._wakeup.set()
+            elif address is not None:
+                self.refill()
+
+        if address is None:
+            logger.warning(f"Address pool for account '{self.account_name}' is empty; generating inline.")
+            try:
+                address = self.rpc_connection.getnewaddress(self.account_name)
+            except JSONRPCException as e:
+                logger.error(f"Failed to generate new address for account '{self.account_name}': {e}")
+                raise e
+        return address
+
+    def refill(self) -> int:
+        """
+        Generate addresses with batched ``getnewaddress`` until the pool is above the low-water mark.
+
+        :return: Number of addresses added.
+        """
+        added = 0
+        with self._refill_lock:
+            while len(self._addresses) <= self.low_water and not self._stop.is_set():
+                results = self.rpc_connection.batch([("getnewaddress", self.account_name)] * self.refill_batch)
+                new = [r.result for r in results if r.ok]
+                if not new:
+                    errors = [r.error for r in results if not r.ok]
+                    raise JSONRPCException(errors[0] if errors else {'code': -4, 'message': 'no addresses generated'})
+                self._add(new)
+                added += len(new)
+        if added:
+            logger.info(f"Added {added} addresses to the pool of account '{self.account_name}' "
+                        f"({len(self._addresses)} available).")
+        return added
+
+    def _add(self, addresses: List[str]) -> None:
+        with self._lock:
+            self._addresses.extend(addresses)
+            self._save()
+
+    # ------------------------- Background Refill -------------------------
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.refill()
+            except Exception as e:
+                logger.error(f"Failed to refill address pool for account '{self.account_name}': {e}")
+                self._stop.wait(5)
+                if len(self._addresses) <= self.low_water:
+                    self._wakeup.set()
+
+    def stop(self) -> None:
+        """
+        Stop the background refiller. Unissued addresses stay persisted for the next start.
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._log_lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    # ------------------------- Persistence -------------------------
+
+    def _load(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state.get('account', '') != self.account_name:
+            raise ValueError(f"Address pool file '{self.state_path}' belongs to account '{state.get('account')}'")
+        issued = set()
+        if os.path.exists(self._issued_path):
+            with open(self._issued_path) as f:
+                issued = {line.strip() for line in f if line.strip()}
+        self._addresses.extend(a for a in state.get('addresses', []) if a not in issued)
+        logger.info(f"Restored {len(self._addresses)} pooled addresses for account '{self.account_name}'.")
+
+    @property
+    def _issued_path(self) -> str:
+        return self.state_path + '.issued'
+
+    def _record_issued(self, address: str) -> None:
+        if not self.state_path:
+            return
+        with self._log_lock:
+            if self._log is None:
+                self._log = open(self._issued_path, 'a')
+            self._log.write(address + '\n')
+            self._log.flush()
+
+    def _save(self) -> None:
+        """
+        Rewrite the state file and empty the issued log. Called with ``_lock`` held.
+        """
+        if not self.state_path:
+            return
+        state = {'account': self.account_name, 'addresses': list(self._addresses)}
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+        # Addresses popped before the snapshot are no longer in it, so their log lines can go.
+        with self._log_lock:
+            if self._log is not None:
+                self._log.close()
+            self._log = open(self._issued_path, 'w')
@@ -0,0 +1,1050 @@
+# pepecoin/async_pepecoin.py
+
+import asyncio
+import base64
+import itertools
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from bitcoinrpc.authproxy import JSONRPCException
+
+from .codec import get_codec
+from .resilience import DeadlineExceeded, deadline_passed, request_timeout
+from .sync_gate import SyncState, DEFAULT_SYNC_CACHE_TTL
+from .transport import (
+    BatchResult,
+    DEFAULT_BATCH_CHUNK_SIZE,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_TIMEOUT,
+    IDEMPOTENT_METHODS,
+    USER_AGENT,
+    encode_batch,
+    encode_request,
+    is_idempotent,
+    parse_batch_response,
+    parse_response,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class _AsyncConnection:
+    __slots__ = ('reader', 'writer', 'released_at', 'reusable')
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.released_at = 0.0
+        self.reusable = True
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncRPCTransport:
+    """
+    Non-blocking JSON-RPC over HTTP/1.1 transport for a Pepecoin node.
+
+    At most ``max_concurrency`` requests are in flight at once; every other
+    caller waits on a semaphore. Keep-alive sockets are reused between requests,
+    so any number of concurrent coroutines multiplex over a handful of connections.
+    Attribute access returns coroutine functions (``await transport.getblockcount()``).
+    """
+
+    def __init__(
+        self,
+        rpc_user: str,
+        rpc_password: str,
+        host: str = '127.0.0.1',
+        port: int = 33873,
+        timeout: float = DEFAULT_TIMEOUT,
+        batch_chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        codec: Any = None,
+    ):
+        """
+        :param rpc_user: RPC username.
+        :param rpc_password: RPC password.
+        :param host: RPC host.
+        :param port: RPC port.
+        :param timeout: Seconds allowed for each HTTP request.
+        :param batch_chunk_size: Maximum number of calls sent in one batch request.
+        :param max_concurrency: Maximum number of requests (and sockets) in use at once.
+        :param idle_timeout: Seconds after which an idle connection is closed instead of reused.
+        :param codec: Response decoder (see ``pepecoin.codec``): None picks the fastest exact one installed.
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.batch_chunk_size = batch_chunk_size
+        self.max_concurrency = max_concurrency
+        self.codec = get_codec(codec)
+        self.idle_timeout = idle_timeout
+        authpair = f"{rpc_user}:{rpc_password}".encode('utf8')
+        self._auth_header = 'Basic ' + base64.b64encode(authpair).decode('ascii')
+        self._ids = itertools.count(1)
+        self._idle: List[_AsyncConnection] = []
+        # Created on first use so the transport can be built outside a running loop.
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        async def method(*params):
+            return await self.call(name, *params)
+
+        method.__name__ = name
+        return method
+
+    async def call(self, method: str, *params) -> Any:
+        """
+        Perform a single RPC call and return its result.
+
+        :raises JSONRPCException: If the node reports an error.
+        """
+        body = encode_request(method, params, next(self._ids))
+        return parse_response(await self._post(body, method in IDEMPOTENT_METHODS))
+
+    async def batch(self, calls: Sequence[Sequence], chunk_size: Optional[int] = None) -> List[BatchResult]:
+        """
+        Send many calls as JSON-RPC array requests. Chunks are sent concurrently.
+
+        :param calls: Sequence of ``(method, *params)`` tuples or lists.
+        :param chunk_size: Maximum calls per HTTP request; defaults to ``batch_chunk_size``.
+        :return: One ``BatchResult`` per call, in the order the calls were given.
+        """
+        chunk_size = chunk_size or self.batch_chunk_size
+        chunks = [calls[start:start + chunk_size] for start in range(0, len(calls), chunk_size)]
+        results: List[BatchResult] = []
+        for chunk_results in await asyncio.gather(*(self._batch_chunk(chunk) for chunk in chunks)):
+            results.extend(chunk_results)
+        return results
+
+    async def _batch_chunk(self, calls: Sequence[Sequence]) -> List[BatchResult]:
+        ids = [next(self._ids) for _ in calls]
+        return parse_batch_response(calls, ids, await self._post(encode_batch(calls, ids), is_idempotent(calls)))
+
+    async def close(self) -> None:
+        """
+        Close all idle connections.
+        """
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # ------------------------- HTTP -------------------------
+
+    async def _post(self, body: bytes, resend: bool) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            conn, reused = await self._acquire()
+            try:
+                try:
+                    data = await asyncio.wait_for(self._send(conn, body), request_timeout(self.timeout))
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    if not reused or not resend:
+                        raise
+                    # The node closed an idle keep-alive connection; retry once on a fresh socket.
+                    logger.debug("Pooled RPC connection was closed by the node; reconnecting.")
+                    conn.close()
+                    conn = await self._open()
+                    data = await asyncio.wait_for(self._send(conn, body), request_timeout(self.timeout))
+            except BaseException as e:
+                conn.close()
+                if isinstance(e, asyncio.TimeoutError) and deadline_passed():
+                    raise DeadlineExceeded() from e
+                raise
+            self._release(conn)
+        return self.codec.decode(data)
+
+    async def _acquire(self) -> tuple:
+        now = time.monotonic()
+        while self._idle:
+            conn = self._idle.pop()
+            if now - conn.released_at <= self.idle_timeout and not conn.reader.at_eof():
+                return conn, True
+            conn.close()
+        return await self._open(), False
+
+    async def _open(self) -> _AsyncConnection:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port),
+                                                      request_timeout(self.timeout))
+        return _AsyncConnection(reader, writer)
+
+    def _release(self, conn: _AsyncConnection) -> None:
+        if conn.reusable and len(self._idle) < self.max_concurrency:
+            conn.released_at = time.monotonic()
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    async def _send(self, conn: _AsyncConnection, body: bytes) -> bytes:
+        head = (
+            f"POST / HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            f"Authorization: {self._auth_header}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"\r\n"
+        ).encode('latin-1')
+        conn.writer.write(head + body)
+        await conn.writer.drain()
+
+        status_line = await conn.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by the node")
+        parts = status_line.decode('latin-1').split(' ', 2)
+        status = int(parts[1])
+        reason = parts[2].strip() if len(parts) > 2 else ''
+
+        headers = {}
+        while True:
+            line = await conn.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            data = await self._read_chunked(conn.reader)
+        elif 'content-length' in headers:
+            data = await conn.reader.readexactly(int(headers['content-length']))
+        else:
+            data = await conn.reader.read()
+            conn.reusable = False
+        if headers.get('connection', '').lower() == 'close':
+            conn.reusable = False
+
+        if headers.get('content-type') != 'application/json':
+            raise JSONRPCException({
+                'code': -342,
+                'message': f"non-JSON HTTP response with '{status} {reason}' from server",
+            })
+        return data
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await reader.readline()
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+
+
+class AsyncPepecoin:
+    """
+    asyncio-native counterpart of ``Pepecoin``.
+
+    Usage::
+
+        async with AsyncPepecoin(rpc_user, rpc_password) as node:
+            balances = await asyncio.gather(*(node.get_balance(a) for a in accounts))
+
+    The ``batched=`` payout paths of ``mass_transfer_from_accounts`` and
+    ``consolidate_accounts`` run on the blocking ``PayoutEngine`` and are only
+    available on ``Pepecoin``.
+    """
+
+    def __init__(
+        self,
+        rpc_user: str,
+        rpc_password: str,
+        host: str = '127.0.0.1',
+        port: int = 33873,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        sync_cache_ttl: Optional[float] = DEFAULT_SYNC_CACHE_TTL,
+        codec: Any = None,
+    ):
+        """
+        Initialize the client. No connection is made until ``connect()`` or the first call.
+
+        :param max_concurrency: Maximum number of RPC requests (and sockets) in use at once.
+        :param timeout: Seconds allowed for each RPC request.
+        :param sync_cache_ttl: Seconds a cached sync verdict guarding writes stays valid.
+                               None checks the node on every write.
+        :param codec: Response decoder, see ``pepecoin.codec``.
+        """
+        self.rpc_user = rpc_user
+        self.rpc_password = rpc_password
+        self.host = host
+        self.port = port
+        self.rpc_connection = AsyncRPCTransport(
+            rpc_user,
+            rpc_password,
+            host,
+            port,
+            timeout=timeout,
+            max_concurrency=max_concurrency,
+            codec=codec,
+        )
+        self.sync_cache_ttl = sync_cache_ttl
+        self._sync_state = SyncState()
+        logger.debug("Initialized async Pepecoin node RPC transport.")
+
+    async def connect(self) -> 'AsyncPepecoin':
+        """
+        Test the RPC connection to the Pepecoin node.
+        """
+        try:
+            await self.rpc_connection.getblockchaininfo()
+            logger.info("RPC connection to Pepecoin node established successfully.")
+            return self
+        except JSONRPCException as e:
+            logger.error(f"Failed to connect to Pepecoin node: {e}")
+            raise e
+
+    async def close(self) -> None:
+        """
+        Close all pooled connections to the node.
+        """
+        await self.rpc_connection.close()
+
+    async def __aenter__(self) -> 'AsyncPepecoin':
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+    # ------------------------- Batch Calls -------------------------
+
+    async def batch(self, calls: Sequence[Sequence], chunk_size: Optional[int] = None) -> List[BatchResult]:
+        """
+        Send many RPC calls as JSON-RPC array requests. See ``Pepecoin.batch``.
+        """
+        results = await self.rpc_connection.batch(calls, chunk_size)
+        failed = sum(1 for r in results if not r.ok)
+        logger.info(f"Executed batch of {len(results)} RPC calls ({failed} failed).")
+        return results
+
+    # ------------------------- Node Management -------------------------
+
+    async def check_node_connection(self) -> bool:
+        """
+        Check if the node is connected and reachable.
+        """
+        try:
+            await self.rpc_connection.getnetworkinfo()
+            logger.info("Node connection is active.")
+            return True
+        except JSONRPCException as e:
+            logger.error(f"Node connection failed: {e}")
+            return False
+
+    async def is_sync_needed(self) -> bool:
+        """
+        Check if the node is synchronized with the network. Returns True while syncing.
+        """
+        try:
+            blockchain_info = await self.rpc_connection.getblockchaininfo()
+            is_initial_download = blockchain_info.get('initialblockdownload', True)
+            verification_progress = blockchain_info.get('verificationprogress', 0)
+            if not is_initial_download and verification_progress >= 0.9999:
+                logger.info("Node is fully synchronized with the network.")
+                return False
+            logger.warning("Node is still syncing.")
+            logger.warning(f"Verification Progress: {verification_progress * 100:.2f}%")
+            return True
+        except Exception as e:
+            logger.error(f"Error checking synchronization status: {e}")
+            return True
+
+    async def _sync_needed_for_write(self) -> bool:
+        """
+        Sync check used in front of writes. Answers from the cached verdict while it is fresh.
+        """
+        if not self.sync_cache_ttl:
+            return await self.is_sync_needed()
+        state = self._sync_state
+        if not (state.synced and state.is_fresh(self.sync_cache_ttl)):
+            try:
+                state.update(await self.rpc_connection.getblockchaininfo())
+            except Exception as e:
+                logger.error(f"Error checking synchronization status: {e}")
+                state.invalidate()
+                return True
+        return not state.synced
+
+    async def get_blockchain_info(self) -> Dict:
+        """
+        Retrieve blockchain information using RPC.
+        """
+        try:
+            info = await self.rpc_connection.getblockchaininfo()
+            logger.info("Retrieved blockchain info.")
+            return info
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving blockchain info: {e}")
+            raise e
+
+    async def get_network_info(self) -> Dict:
+        """
+        Get information about the node's connection to the network.
+        """
+        try:
+            info = await self.rpc_connection.getnetworkinfo()
+            logger.info("Retrieved network info.")
+            return info
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving network info: {e}")
+            raise e
+
+    async def get_mempool_info(self) -> Dict:
+        """
+        Get information about the node's transaction memory pool.
+        """
+        try:
+            info = await self.rpc_connection.getmempoolinfo()
+            logger.info("Retrieved mempool info.")
+            return info
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving mempool info: {e}")
+            raise e
+
+    def monitor_node(self, interval: int = 60) -> 'asyncio.Task':
+        """
+        Continuously monitor the Pepecoin node status at specified intervals.
+
+        :return: The background task; cancel it to stop monitoring.
+        """
+
+        async def monitor():
+            while True:
+                try:
+                    info = await self.get_blockchain_info()
+                    print("=== Pepecoin Node Status ===")
+                    print(f"Chain: {info.get('chain')}")
+                    print(f"Blocks: {info.get('blocks')}")
+                    print(f"Headers: {info.get('headers')}")
+                    print(f"Verification Progress: {info.get('verificationprogress') * 100:.2f}%")
+                    print(f"Synced: {not info.get('initialblockdownload')}")
+                    print(f"Difficulty: {info.get('difficulty')}")
+                    print(f"Best Block Hash: {info.get('bestblockhash')}")
+                    print("============================\n")
+                except JSONRPCException as e:
+                    logger.error(f"Error during node monitoring: {e}")
+
+                await asyncio.sleep(interval)
+
+        return asyncio.ensure_future(monitor())
+
+    # ------------------------- Utility Methods -------------------------
+
+    async def stop_node(self) -> bool:
+        """
+        Stop the Pepecoin node.
+        """
+        try:
+            await self.rpc_connection.stop()
+            logger.info("Pepecoin node stopping...")
+            return True
+        except JSONRPCException as e:
+            logger.error(f"Error stopping node: {e}")
+            return False
+
+    async def restart_node(self) -> bool:
+        """
+        Restart the Pepecoin node.
+        """
+        try:
+            await self.stop_node()
+            logger.info("Waiting for node to shut down...")
+            await asyncio.sleep(10)  # Wait for the node to shut down
+            # Since we can't start the node via RPC, this would require system-level access
+            logger.info("Node restart functionality is system-dependent and needs to be implemented.")
+            return True
+        except Exception as e:
+            logger.error(f"Error restarting node: {e}")
+            return False
+
+    async def get_node_uptime(self) -> int:
+        """
+        Get the uptime of the Pepecoin node.
+        """
+        try:
+            uptime = await self.rpc_connection.uptime()
+            logger.info(f"Node uptime: {uptime} seconds.")
+            return uptime
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving node uptime: {e}")
+            raise e
+
+    async def add_node(self, node_address: str, command: str = 'add') -> bool:
+        """
+        Attempt to add or remove a node from the addnode list.
+        """
+        try:
+            await self.rpc_connection.addnode(node_address, command)
+            logger.info(f"Node '{node_address}' {command}ed successfully.")
+            return True
+        except JSONRPCException as e:
+            logger.error(f"Error executing addnode command: {e}")
+            return False
+
+    async def get_peer_info(self) -> List[Dict]:
+        """
+        Get information about connected peers.
+        """
+        try:
+            peers = await self.rpc_connection.getpeerinfo()
+            logger.info(f"Retrieved information on {len(peers)} peers.")
+            return peers
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving peer info: {e}")
+            raise e
+
+    # ------------------------- Account Management -------------------------
+
+    async def generate_new_address(self, account=None) -> Optional[str]:
+        if await self._sync_needed_for_write():
+            logger.error("Node is not synchronized. Cannot generate a new address.")
+            raise Exception("Node is not synchronized with the network.")
+
+        try:
+            if account:
+                address = await self.rpc_connection.getnewaddress(account)
+            else:
+                address = await self.rpc_connection.getnewaddress()
+            logger.info(f"Generated new address '{address}' for account '{account}'.")
+            return address
+        except JSONRPCException as e:
+            logger.error(f"Failed to generate new address: {e}")
+            return None
+
+    async def get_balance_of_address(self, address: str, minconf=1):
+        """
+        Get the current spendable balance for a specific address by summing its unspent outputs.
+        """
+        try:
+            unspents = await self.rpc_connection.listunspent(minconf, 9999999, [address])
+            total = sum(u['amount'] for u in unspents)
+            logger.info(f"Balance for address '{address}' is {total} $PEP")
+            return total
+        except JSONRPCException as e:
+            logger.error(f"Failed to get balance for address '{address}': {e}")
+            return 0.0
+
+    async def get_balance(self, account=None):
+        try:
+            if account:
+                balance = await self.rpc_connection.getbalance(account)
+                logger.info(f"Balance for account '{account}': {balance} $PEP")
+            else:
+                balance = await self.rpc_connection.getbalance()
+                logger.info(f"Total wallet balance: {balance} $PEP")
+            return balance
+        except JSONRPCException as e:
+            logger.error(f"Failed to get balance: {e}")
+            return None
+
+    async def send_from(self, from_account, to_address, amount, minconf=1, comment=None, comment_to=None):
+        """Send funds from a specific account to an external address."""
+        if await self._sync_needed_for_write():
+            logger.error("Node is not synchronized. Cannot proceed with sending funds.")
+            raise Exception("Node is not synchronized with the network.")
+
+        try:
+            tx_id = await self.rpc_connection.sendfrom(from_account, to_address, amount, minconf, comment, comment_to)
+            logger.info(f"Sent {amount} $PEP from '{from_account}' to '{to_address}'. Transaction ID: {tx_id}")
+            return tx_id
+        except JSONRPCException as e:
+            logger.error(f"Failed to send from '{from_account}': {e}")
+            return None
+
+    async def move(self, from_account, to_account, amount, minconf=1, comment=None):
+        try:
+            result = await self.rpc_connection.move(from_account, to_account, amount, minconf, comment)
+            if result:
+                logger.info(f"Moved {amount} $PEP from '{from_account}' to '{to_account}'.")
+            else:
+                logger.warning(f"Move operation returned False.")
+            return result
+        except JSONRPCException as e:
+            logger.error(f"Failed to move funds: {e}")
+            return False
+
+    async def list_accounts(self, minconf=1, include_watchonly=False):
+        try:
+            accounts = await self.rpc_connection.listaccounts(minconf, include_watchonly)
+            logger.info("Retrieved list of accounts.")
+            return accounts
+        except JSONRPCException as e:
+            logger.error(f"Failed to list accounts: {e}")
+            return {}
+
+    def get_account(self, account_name: str) -> 'AsyncAccount':
+        """
+        Retrieve an AsyncAccount for a given account name, sharing this client's transport.
+        """
+        return AsyncAccount(self.rpc_connection, account_name)
+
+    # ------------------------- Additional Methods Integrated with Account Class -------------------------
+
+    async def transfer_between_accounts(
+        self,
+        from_account_name: str,
+        to_account_name: str,
+        amount: float,
+        comment: str = ""
+    ) -> Optional[str]:
+        """
+        Transfer funds from one account to another.
+
+        :param from_account_name: The name of the account to send funds from.
+        :param to_account_name: The name of the account to send funds to.
+        :param amount: The amount to transfer.
+        :param comment: An optional comment for the transaction.
+        :return: The transaction ID if successful, None otherwise.
+        """
+        try:
+            to_address = await self.get_account(to_account_name).generate_address()
+            tx_id = await self.send_from(
+                from_account=from_account_name,
+                to_address=to_address,
+                amount=amount,
+                comment=comment
+            )
+            logger.info(f"Transferred {amount} $PEP from account '{from_account_name}' to account '{to_account_name}'. TXID: {tx_id}")
+            return tx_id
+        except JSONRPCException as e:
+            logger.error(f"Error transferring funds between accounts: {e}")
+            return None
+
+    async def mass_transfer_from_accounts(
+        self,
+        from_account_names: List[str],
+        to_address: str,
+        amounts: List[float]
+    ) -> List[Optional[str]]:
+        """
+        Transfer funds from multiple accounts to a single address. The sends run concurrently.
+
+        :param from_account_names: List of account names to transfer from.
+        :param to_address: The target Pepecoin address to transfer funds to.
+        :param amounts: List of amounts corresponding to each account.
+        :return: List of transaction IDs, one per source account (None where a send failed).
+        """
+        tx_ids = await asyncio.gather(*(
+            self.send_from(from_account=account_name, to_address=to_address, amount=amount)
+            for account_name, amount in zip(from_account_names, amounts)
+        ))
+        for account_name, amount, tx_id in zip(from_account_names, amounts, tx_ids):
+            logger.info(f"Transferred {amount} $PEP from account '{account_name}' to '{to_address}'. TXID: {tx_id}")
+        return list(tx_ids)
+
+    async def consolidate_accounts(
+        self,
+        source_account_names: List[str],
+        destination_account_name: str
+    ) -> List[Optional[str]]:
+        """
+        Consolidate funds from multiple accounts into a single account.
+
+        :param source_account_names: List of account names to transfer from.
+        :param destination_account_name: The account name to receive the funds.
+        :return: List of transaction IDs.
+        """
+        tx_ids = []
+        try:
+            destination_address = await self.get_account(destination_account_name).generate_address()
+            balances = await self.rpc_connection.batch([("getbalance", name) for name in source_account_names])
+            sources = [(name, balance.unwrap()) for name, balance in zip(source_account_names, balances)]
+            for account_name, balance in sources:
+                if balance <= 0:
+                    logger.info(f"No balance to transfer from account '{account_name}'.")
+            funded = [(name, balance) for name, balance in sources if balance > 0]
+            tx_ids = await asyncio.gather(*(
+                self.send_from(from_account=name, to_address=destination_address, amount=balance)
+                for name, balance in funded
+            ))
+            for (account_name, balance), tx_id in zip(funded, tx_ids):
+                logger.info(f"Consolidated {balance} $PEP from account '{account_name}' to '{destination_account_name}'. TXID: {tx_id}")
+            return list(tx_ids)
+        except JSONRPCException as e:
+            logger.error(f"Error consolidating accounts: {e}")
+            return list(tx_ids)
+
+    # ------------------------- Blockchain Methods -------------------------
+
+    async def get_block_count(self) -> int:
+        """
+        Get the number of blocks in the longest blockchain.
+        """
+        try:
+            count = await self.rpc_connection.getblockcount()
+            logger.info(f"Current block count: {count}")
+            return count
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving block count: {e}")
+            raise e
+
+    async def get_best_block_hash(self) -> str:
+        """
+        Get the hash of the best (tip) block in the longest blockchain.
+        """
+        try:
+            block_hash = await self.rpc_connection.getbestblockhash()
+            logger.info(f"Best block hash: {block_hash}")
+            return block_hash
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving best block hash: {e}")
+            raise e
+
+    async def get_block_hash(self, height: int) -> str:
+        """
+        Get the hash of the block at a given height.
+        """
+        try:
+            block_hash = await self.rpc_connection.getblockhash(height)
+            logger.info(f"Block hash at height {height}: {block_hash}")
+            return block_hash
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving block hash at height {height}: {e}")
+            raise e
+
+    async def get_block(self, block_hash: str) -> Dict:
+        """
+        Get detailed information about a block.
+        """
+        try:
+            block_info = await self.rpc_connection.getblock(block_hash)
+            logger.info(f"Retrieved block info for hash {block_hash}.")
+            return block_info
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving block info for hash {block_hash}: {e}")
+            raise e
+
+    async def get_block_hashes(self, heights: Iterable[int]) -> List[str]:
+        """
+        Get the hashes of the blocks at the given heights using batched RPC calls.
+        """
+        results = await self.rpc_connection.batch([("getblockhash", height) for height in heights])
+        try:
+            block_hashes = [r.unwrap() for r in results]
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving block hashes: {e}")
+            raise e
+        logger.info(f"Retrieved {len(block_hashes)} block hashes.")
+        return block_hashes
+
+    async def get_blocks(self, block_hashes: Iterable[str]) -> List[Dict]:
+        """
+        Get detailed information about many blocks using batched RPC calls.
+        """
+        results = await self.rpc_connection.batch([("getblock", block_hash) for block_hash in block_hashes])
+        try:
+            blocks = [r.unwrap() for r in results]
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving blocks: {e}")
+            raise e
+        logger.info(f"Retrieved info for {len(blocks)} blocks.")
+        return blocks
+
+    # ------------------------- Fee Estimation -------------------------
+
+    async def estimate_smart_fee(self, conf_target: int, estimate_mode: str = 'CONSERVATIVE') -> Dict:
+        """
+        Estimates the approximate fee per kilobyte needed for a transaction to begin
+        confirmation within conf_target blocks.
+        """
+        try:
+            fee_estimate = await self.rpc_connection.estimatesmartfee(conf_target, estimate_mode)
+            logger.info(f"Estimated fee: {fee_estimate}")
+            return fee_estimate
+        except JSONRPCException as e:
+            logger.error(f"Error estimating smart fee: {e}")
+            raise e
+
+    # ------------------------- Raw Transaction Handling -------------------------
+
+    async def send_raw_transaction(self, hex_string: str) -> str:
+        """
+        Submits raw transaction (serialized, hex-encoded) to local node and network.
+        """
+        try:
+            tx_id = await self.rpc_connection.sendrawtransaction(hex_string)
+            logger.info(f"Sent raw transaction. TXID: {tx_id}")
+            return tx_id
+        except JSONRPCException as e:
+            logger.error(f"Error sending raw transaction: {e}")
+            raise e
+
+    async def get_raw_transaction(self, txid: str, verbose: bool = True) -> Dict:
+        """
+        Return the raw transaction data.
+        """
+        try:
+            transaction = await self.rpc_connection.getrawtransaction(txid, verbose)
+            logger.info(f"Retrieved raw transaction for TXID: {txid}")
+            return transaction
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving raw transaction for TXID {txid}: {e}")
+            raise e
+
+    async def get_raw_transactions(self, txids: Iterable[str], verbose: bool = True) -> List[Dict]:
+        """
+        Return the raw transaction data for many transactions using batched RPC calls.
+        """
+        results = await self.rpc_connection.batch([("getrawtransaction", txid, verbose) for txid in txids])
+        try:
+            transactions = [r.unwrap() for r in results]
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving raw transactions: {e}")
+            raise e
+        logger.info(f"Retrieved {len(transactions)} raw transactions.")
+        return transactions
+
+
+class AsyncAccount:
+    """
+    asyncio-native counterpart of ``Account``. Obtain one with ``AsyncPepecoin.get_account``.
+    """
+
+    def __init__(self, transport: AsyncRPCTransport, account_name: str = ''):
+        """
+        :param transport: The async RPC transport to use.
+        :param account_name: The name of the account to manage.
+        """
+        self.account_name = account_name
+        self.rpc_connection = transport
+
+    # ------------------------- Balance Management -------------------------
+
+    async def get_balance(self, min_confirmations: int = 1, include_watchonly: bool = False):
+        """
+        Get the account's balance.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            balance = await self.rpc_connection.getbalance(self.account_name, min_confirmations, include_watchonly)
+            logger.info(f"Account '{self.account_name}' balance: {balance} PEPE.")
+            return balance
+        except JSONRPCException as e:
+            logger.error(f"Failed to get balance for account '{self.account_name}': {e}")
+            raise e
+
+    # ------------------------- Address Management -------------------------
+
+    async def generate_address(self) -> str:
+        """
+        Generate a new Pepecoin address for this account.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            address = await self.rpc_connection.getnewaddress(self.account_name)
+            logger.info(f"Generated new address '{address}' for account '{self.account_name}'.")
+            return address
+        except JSONRPCException as e:
+            logger.error(f"Failed to generate new address for account '{self.account_name}': {e}")
+            raise e
+
+    async def list_addresses(self) -> List[str]:
+        """
+        List all addresses associated with this account.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            addresses = await self.rpc_connection.getaddressesbyaccount(self.account_name)
+            logger.info(f"Retrieved addresses for account '{self.account_name}': {addresses}")
+            return addresses
+        except JSONRPCException as e:
+            logger.error(f"Failed to list addresses for account '{self.account_name}': {e}")
+            raise e
+
+    # ------------------------- Transaction Management -------------------------
+
+    async def list_transactions(self, count: int = 10, skip: int = 0, include_watchonly: bool = False) -> List[Dict]:
+        """
+        List recent transactions for this account.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            transactions = await self.rpc_connection.listtransactions(self.account_name, count, skip, include_watchonly)
+            logger.info(f"Retrieved {len(transactions)} transactions for account '{self.account_name}'.")
+            return transactions
+        except JSONRPCException as e:
+            logger.error(f"Failed to list transactions for account '{self.account_name}': {e}")
+            raise e
+
+    async def send_to_address(self, address: str, amount, comment: str = "", comment_to: str = "") -> str:
+        """
+        Send PEPE from this account to a specified address.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            tx_id = await self.rpc_connection.sendfrom(self.account_name, address, amount, 1, comment, comment_to)
+            logger.info(f"Sent {amount} PEPE from account '{self.account_name}' to '{address}'. Transaction ID: {tx_id}")
+            return tx_id
+        except JSONRPCException as e:
+            logger.error(f"Failed to send to address '{address}' from account '{self.account_name}': {e}")
+            raise e
+
+    async def move_to_account(self, to_account: str, amount, comment: str = "") -> bool:
+        """
+        Move funds internally between accounts without creating a transaction.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            result = await self.rpc_connection.move(self.account_name, to_account, amount, 1, comment)
+            if result:
+                logger.info(f"Moved {amount} PEPE from account '{self.account_name}' to account '{to_account}'.")
+            else:
+                logger.warning(f"Move operation returned False for moving from '{self.account_name}' to '{to_account}'.")
+            return result
+        except JSONRPCException as e:
+            logger.error(f"Failed to move funds from account '{self.account_name}' to '{to_account}': {e}")
+            raise e
+
+    # ------------------------- Key Management -------------------------
+
+    async def import_private_key(self, private_key: str, rescan: bool = True) -> None:
+        """
+        Import a private key into the account.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            await self.rpc_connection.importprivkey(private_key, self.account_name, rescan)
+            logger.info(f"Imported private key into account '{self.account_name}'. Rescan: {rescan}")
+        except JSONRPCException as e:
+            logger.error(f"Failed to import private key into account '{self.account_name}': {e}")
+            raise e
+
+    async def export_private_key(self, address: str) -> str:
+        """
+        Export the private key for a given address.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            private_key = await self.rpc_connection.dumpprivkey(address)
+            logger.info(f"Exported private key for address '{address}'.")
+            return private_key
+        except JSONRPCException as e:
+            logger.error(f"Failed to export private key for address '{address}': {e}")
+            raise e
+
+    # ------------------------- Label Management -------------------------
+
+    async def set_label(self, address: str, label: str) -> None:
+        """
+        Assign a label (account name) to an address.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            await self.rpc_connection.setaccount(address, label)
+            logger.info(f"Set label '{label}' for address '{address}'.")
+        except JSONRPCException as e:
+            logger.error(f"Failed to set label for address '{address}': {e}")
+            raise e
+
+    async def get_label(self, address: str) -> str:
+        """
+        Retrieve the label (account name) assigned to an address.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            label = await self.rpc_connection.getaccount(address)
+            logger.info(f"Retrieved label '{label}' for address '{address}'.")
+            return label
+        except JSONRPCException as e:
+            logger.error(f"Failed to get label for address '{address}': {e}")
+            raise e
+
+    # ------------------------- Payment Monitoring -------------------------
+
+    async def check_payment(self, address: str, expected_amount, min_confirmations: int = 1) -> bool:
+        """
+        Check if a payment has been received at a specified address.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            amount_received = await self.rpc_connection.getreceivedbyaddress(address, min_confirmations)
+            logger.info(f"Amount received at address '{address}': {amount_received} PEPE.")
+            return amount_received >= expected_amount
+        except JSONRPCException as e:
+            logger.error(f"Failed to check payment for address '{address}': {e}")
+            raise e
+
+    # ------------------------- Utility Methods -------------------------
+
+    async def get_account_info(self) -> Dict:
+        """
+        Get general information about the account.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            balance, addresses = await asyncio.gather(self.get_balance(), self.list_addresses())
+            info = {
+                'account_name': self.account_name,
+                'balance': balance,
+                'addresses': addresses
+            }
+            logger.info(f"Retrieved account info for '{self.account_name}'.")
+            return info
+        except Exception as e:
+            logger.error(f"Failed to get account info for '{self.account_name}': {e}")
+            raise e
+
+    async def validate_address(self, address: str) -> Dict:
+        """
+        Validate a Pepecoin address and retrieve its information.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            address_info = await self.rpc_connection.validateaddress(address)
+            logger.info(f"Validated address '{address}'.")
+            return address_info
+        except JSONRPCException as e:
+            logger.error(f"Failed to validate address '{address}': {e}")
+            raise e
+
+    async def get_received_by_account(self, min_confirmations: int = 1):
+        """
+        Get the total amount received by this account.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            amount_received = await self.rpc_connection.getreceivedbyaccount(self.account_name, min_confirmations)
+            logger.info(f"Total amount received by account '{self.account_name}': {amount_received} PEPE.")
+            return amount_received
+        except JSONRPCException as e:
+            logger.error(f"Failed to get received amount for account '{self.account_name}': {e}")
+            raise e
+
+    async def list_transactions_by_account(self, count: int = 10, skip: int = 0) -> List[Dict]:
+        """
+        List transactions for this account.
+
+        :raises JSONRPCException: If the RPC call fails.
+        """
+        try:
+            transactions = await self.rpc_connection.listtransactions(self.account_name, count, skip)
+            logger.info(f"Retrieved {len(transactions)} transactions for account '{self.account_name}'.")
+            return transactions
+        except JSONRPCException as e:
+            logger.error(f"Failed to list transactions for account '{self.account_name}': {e}")
+            raise e
@@ -0,0 +1,264 @@
+# pepecoin/balances.py
+
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from bitcoinrpc.authproxy import JSONRPCException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIERS = (0, 1, 6)
+DEFAULT_FULL_REFRESH_EVERY = 100
+MAX_CONFIRMATIONS = 9999999
+
+_ZERO = Decimal(0)
+
+UTXOKey = Tuple[str, int]
+
+
+class BalanceSnapshot:
+    """
+    Balances by account and by address at one chain tip, for several ``minconf`` tiers.
+
+    ``accounts`` and ``addresses`` map names to tuples of balances aligned with
+    ``tiers``; use ``account()`` / ``address()`` to read one tier. Account
+    balances are the wallet's own (``listaccounts``, so ``move`` is included);
+    address balances are the sum of the address's unspent outputs.
+    """
+
+    __slots__ = ('tiers', 'height', 'tip', 'accounts', 'addresses', 'taken_at')
+
+    def __init__(
+        self,
+        tiers: Tuple[int, ...],
+        height: int,
+        tip: str,
+        accounts: Dict[str, Tuple[Decimal, ...]],
+        addresses: Dict[str, Tuple[Decimal, ...]],
+    ):
+        self.tiers = tiers
+        self.height = height
+        self.tip = tip
+        self.accounts = accounts
+        self.addresses = addresses
+        self.taken_at = time.time()
+
+    def _tier(self, minconf: int) -> int:
+        try:
+            return self.tiers.index(minconf)
+        except ValueError:
+            raise ValueError(f"minconf {minconf} is not one of the snapshot's tiers {self.tiers}")
+
+    def account(self, name: str, minconf: int = 1) -> Decimal:
+        balances = self.accounts.get(name)
+        return balances[self._tier(minconf)] if balances is not None else _ZERO
+
+    def address(self, address: str, minconf: int = 1) -> Decimal:
+        balances = self.addresses.get(address)
+        return balances[self._tier(minconf)] if balances is not None else _ZERO
+
+    def account_balances(self, minconf: int = 1) -> Dict[str, Decimal]:
+        tier = self._tier(minconf)
+        return {name: balances[tier] for name, balances in self.accounts.items()}
+
+    def address_balances(self, minconf: int = 1) -> Dict[str, Decimal]:
+        tier = self._tier(minconf)
+        return {address: balances[tier] for address, balances in self.addresses.items() if balances[tier]}
+
+    def total(self, minconf: int = 1) -> Decimal:
+        """
+        Sum of all unspent outputs with at least ``minconf`` confirmations.
+        """
+        tier = self._tier(minconf)
+        return sum((balances[tier] for balances in self.addresses.values()), _ZERO)
+
+    def __repr__(self):
+        return (f"<BalanceSnapshot height={self.height} accounts={len(self.accounts)} "
+                f"addresses={len(self.addresses)} tiers={self.tiers}>")
+
+
+class BalanceTracker:
+    """
+    Builds ``BalanceSnapshot``s and keeps them current as the chain moves.
+
+    The first ``refresh()`` reads every unspent output with one ``listunspent``
+    call and the account balances of all tiers with ``listaccounts``, all in a
+    single batch request, and aggregates them locally. Later refreshes only ask
+    for what changed since the previous tip:
+
+    - wallet transactions from ``listsinceblock``; the inputs of our own sends,
+      decoded from ``gettransaction``, are the outputs we spent;
+    - outputs with at most as many confirmations as blocks have passed (which
+      also covers change, which ``listsinceblock`` does not list).
+
+    Confirmation tiers are recomputed from stored heights, so a new block costs
+    no extra RPC. A reorg, or every ``full_refresh_every`` refreshes (to drop
+    outputs of transactions that left the mempool unconfirmed), triggers a full
+    rebuild.
+    """
+
+    def __init__(
+        self,
+        rpc_connection,
+        tiers: Sequence[int] = DEFAULT_TIERS,
+        include_watchonly: bool = False,
+        full_refresh_every: int = DEFAULT_FULL_REFRESH_EVERY,
+    ):
+        """
+        :param rpc_connection: RPC transport used for the snapshot requests.
+        :param tiers: ``minconf`` values to compute balances for.
+        :param include_watchonly: Include watch-only addresses.
+        :param full_refresh_every: Rebuild from scratch after this many incremental refreshes.
+        """
+        self.rpc_connection = rpc_connection
+        self.tiers: Tuple[int, ...] = tuple(sorted(set(tiers)))
+        self.include_watchonly = include_watchonly
+        self.full_refresh_every = full_refresh_every
+        self.snapshot: Optional[BalanceSnapshot] = None
+        self._mature_at = max(self.tiers)  # confirmations after which an output counts in every tier
+        self._utxos: Dict[UTXOKey, Tuple[str, Decimal, Optional[int]]] = {}  # -> (address, amount, height)
+        self._settled: Dict[str, Decimal] = {}  # per address: outputs counted in every tier
+        self._young: Set[UTXOKey] = set()
+        self._sends: Set[str] = set()  # our sends already applied, while listsinceblock still lists them
+        self._incremental = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, full: bool = False) -> BalanceSnapshot:
+        """
+        Bring the snapshot up to date with the node and return it.
+
+        :param full: Rebuild from a full ``listunspent`` instead of applying changes.
+        :raises JSONRPCException: If the node rejects a request; the previous snapshot is kept.
+        """
+        with self._lock:
+            try:
+                if full or self.snapshot is None or self._incremental >= self.full_refresh_every:
+                    self._refresh_full()
+                else:
+                    self._refresh_incremental()
+            except JSONRPCException as e:
+                logger.error(f"Error refreshing balance snapshot: {e}")
+                raise e
+            return self.snapshot
+
+    # ------------------------- Refresh -------------------------
+
+    def _account_calls(self) -> List[tuple]:
+        return [('listaccounts', tier, self.include_watchonly) for tier in self.tiers]
+
+    def _refresh_full(self) -> None:
+        results = self.rpc_connection.batch(
+            [('getblockcount',), ('getbestblockhash',), ('listunspent', 0, MAX_CONFIRMATIONS)] + self._account_calls())
+        height, tip, unspent = (r.unwrap() for r in results[:3])
+        accounts = [r.unwrap() for r in results[3:]]
+
+        self._utxos.clear()
+        self._settled.clear()
+        self._young.clear()
+        self._sends.clear()
+        self._apply_unspent(unspent, height)
+        self._incremental = 0
+        self._publish(height, tip, accounts)
+        logger.info(f"Built balance snapshot at height {height}: {len(self._utxos)} outputs, "
+                    f"{len(self.snapshot.addresses)} addresses.")
+
+    def _refresh_incremental(self) -> None:
+        previous = self.snapshot
+        first = self.rpc_connection.batch([
+            ('getblockcount',),
+            ('getbestblockhash',),
+            ('getblockheader', previous.tip),
+            ('listsinceblock', previous.tip, 1, self.include_watchonly),
+        ])
+        height, tip, header, since = (r.unwrap() for r in first)
+        if header.get('confirmations', 0) < 0:
+            logger.warning(f"Block {previous.tip} was reorganized away; rebuilding the balance snapshot.")
+            self._refresh_full()
+            return
+
+        sends = {tx['txid'] for tx in since.get('transactions', ()) if tx.get('category') == 'send'}
+        new_sends = sorted(sends - self._sends)
+        # Every output created since the previous snapshot has at most this many confirmations
+        # (one spare in case a block arrives between the two requests).
+        max_confirmations = height - previous.height + 2
+        second = self.rpc_connection.batch(
+            [('listunspent', 0, max_confirmations)]
+            + [('gettransaction', txid, self.include_watchonly) for txid in new_sends]
+            + self._account_calls())
+        unspent = second[0].unwrap()
+        transactions = [r.unwrap() for r in second[1:1 + len(new_sends)]]
+        accounts = [r.unwrap() for r in second[1 + len(new_sends):]]
+
+        from .serialization import decode_transaction
+
+        spent = 0
+        for tx in transactions:
+            for tx_input in decode_transaction(tx['hex']).inputs:
+                spent += self._remove((tx_input.prev_txid, tx_input.prev_index))
+        self._sends = sends
+        self._apply_unspent(unspent, height)
+        self._incremental += 1
+        self._publish(height, tip, accounts)
+        logger.debug(f"Balance snapshot advanced to height {height}: {len(new_sends)} new sends, "
+                     f"{spent} outputs spent, {len(unspent)} recent outputs.")
+
+    # ------------------------- Aggregation -------------------------
+
+    def _apply_unspent(self, unspent: List[Dict], height: int) -> None:
+        utxos, settled, young = self._utxos, self._settled, self._young
+        mature_at = self._mature_at
+        for entry in unspent:
+            if not self.include_watchonly and not entry.get('spendable', True):
+                continue
+            key = (entry['txid'], entry['vout'])
+            if key in utxos:
+                self._remove(key)  # seen before, e.g. unconfirmed then; its height changed
+            address, amount, confirmations = entry['address'], _decimal(entry['amount']), entry['confirmations']
+            utxos[key] = (address, amount, height - confirmations + 1 if confirmations > 0 else None)
+            if confirmations > 0 and confirmations >= mature_at:
+                settled[address] = settled.get(address, _ZERO) + amount
+            else:
+                young.add(key)  # _publish() settles it once it counts in every tier
+
+    def _remove(self, key: UTXOKey) -> int:
+        entry = self._utxos.pop(key, None)
+        if entry is None:
+            return 0
+        if key in self._young:
+            self._young.discard(key)
+            return 1
+        address, amount, _ = entry
+        balance = self._settled[address] - amount
+        if balance:
+            self._settled[address] = balance
+        else:
+            del self._settled[address]
+        return 1
+
+    def _publish(self, height: int, tip: str, accounts: List[Dict[str, Decimal]]) -> None:
+        tiers = self.tiers
+        # Outputs deep enough to count in every tier move to the per-address totals.
+        matured = [key for key in self._young
+                   if self._utxos[key][2] is not None and height - self._utxos[key][2] + 1 >= self._mature_at]
+        for key in matured:
+            self._young.discard(key)
+            address, amount, _ = self._utxos[key]
+            self._settled[address] = self._settled.get(address, _ZERO) + amount
+
+        addresses: Dict[str, Tuple[Decimal, ...]] = {a: (total,) * len(tiers) for a, total in self._settled.items()}
+        for key in self._young:
+            address, amount, confirmed_at = self._utxos[key]
+            confirmations = 0 if confirmed_at is None else height - confirmed_at + 1
+            balances = addresses.get(address, (_ZERO,) * len(tiers))
+            addresses[address] = tuple(b + amount if confirmations >= t else b for b, t in zip(balances, tiers))
+
+        names = set().union(*accounts)
+        by_account = {name: tuple(_decimal(balances.get(name, 0)) for balances in accounts) for name in names}
+        self.snapshot = BalanceSnapshot(tiers, height, tip, by_account, addresses)
+
+
+def _decimal(value) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
@@ -0,0 +1,124 @@
+# pepecoin/block_iterator.py
+
+import logging
+import queue
+import threading
+from typing import Any, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFETCH = 64
+
+_DONE = object()
+
+
+class _Failure:
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class BlockPrefetcher:
+    """
+    Iterates blocks ``start_height..end_height`` (inclusive) in height order while a
+    background thread fetches ahead of the consumer.
+
+    Each round trip is one batch request that carries ``getblock`` for the current
+    window together with ``getblockhash`` for the next one, so hash lookups never
+    cost a round trip of their own. At most ``prefetch`` blocks are held in memory:
+    one window being fetched plus the queue of blocks waiting for the consumer.
+    """
+
+    def __init__(
+        self,
+        rpc_connection,
+        start_height: int,
+        end_height: int,
+        prefetch: int = DEFAULT_PREFETCH,
+        verbosity: Optional[Any] = None,
+    ):
+        """
+        :param rpc_connection: RPC transport supporting ``batch`` (shared safely across threads).
+        :param start_height: First block height to yield.
+        :param end_height: Last block height to yield (inclusive).
+        :param prefetch: Maximum number of blocks fetched ahead of the consumer.
+        :param verbosity: Optional second argument for ``getblock`` (e.g. False for hex).
+        """
+        if prefetch < 2:
+            raise ValueError("prefetch must be at least 2")
+        self.rpc_connection = rpc_connection
+        self.start_height = start_height
+        self.end_height = end_height
+        self.verbosity = verbosity
+        self.window = prefetch // 2
+        self._queue: queue.Queue = queue.Queue(maxsize=prefetch - self.window)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._thread is not None:
+            raise RuntimeError("BlockPrefetcher can only be iterated once")
+        self._thread = threading.Thread(target=self._produce, name="pepecoin-block-prefetch", daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Stop the background fetcher. Called automatically when iteration ends or is abandoned.
+        """
+        self._stop.set()
+
+    # ------------------------- Producer -------------------------
+
+    def _getblock_call(self, block_hash: str) -> tuple:
+        if self.verbosity is None:
+            return ("getblock", block_hash)
+        return ("getblock", block_hash, self.verbosity)
+
+    def _windows(self) -> Iterator[range]:
+        for start in range(self.start_height, self.end_height + 1, self.window):
+            yield range(start, min(start + self.window, self.end_height + 1))
+
+    def _produce(self) -> None:
+        try:
+            windows = self._windows()
+            current = next(windows, None)
+            hashes = self._unwrap(self.rpc_connection.batch([("getblockhash", h) for h in current])) if current else []
+            while current is not None and not self._stop.is_set():
+                upcoming = next(windows, None)
+                calls = [self._getblock_call(h) for h in hashes]
+                if upcoming is not None:
+                    calls.extend(("getblockhash", h) for h in upcoming)
+                results = self._unwrap(self.rpc_connection.batch(calls, len(calls)))
+                blocks, hashes = results[:len(hashes)], results[len(hashes):]
+                logger.debug(f"Prefetched blocks {current.start}..{current.stop - 1}.")
+                for block in blocks:
+                    if not self._put(block):
+                        return
+                current = upcoming
+            self._put(_DONE)
+        except BaseException as e:
+            self._put(_Failure(e))
+
+    @staticmethod
+    def _unwrap(results) -> List[Any]:
+        return [r.unwrap() for r in results]
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
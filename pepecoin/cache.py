@@ -0,0 +1,346 @@
+# pepecoin/cache.py
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_UNCONFIRMED_TTL = 5.0
+DEFAULT_MIN_CONFIRMATIONS = 6
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Serialize an RPC result, keeping ``Decimal`` amounts exact.
+    """
+    return json.dumps(value, default=_encode_decimal, separators=(',', ':')).encode('utf8')
+
+
+def decode_value(data: bytes) -> Any:
+    return json.loads(data, object_hook=_decode_decimal)
+
+
+def _encode_decimal(o):
+    if isinstance(o, Decimal):
+        return {'__decimal__': str(o)}
+    raise TypeError(repr(o) + " is not JSON serializable")
+
+
+def _decode_decimal(obj):
+    if len(obj) == 1 and '__decimal__' in obj:
+        return Decimal(obj['__decimal__'])
+    return obj
+
+
+class LRUCache:
+    """
+    Thread-safe LRU of encoded values bounded by their total size in bytes.
+    Entries may carry an expiry time.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (data, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes, ttl: Optional[float] = None) -> None:
+        if len(data) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (data, expires_at)
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+
+class SQLiteStore:
+    """
+    On-disk tier: one SQLite table of encoded values that survives restarts.
+    Each row remembers the block it belongs to, and a second table maps block
+    hashes to heights, so reorgs can be purged by height.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            " key TEXT PRIMARY KEY,"
+            " blockhash TEXT,"
+            " height INTEGER,"
+            " value BLOB NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS objects_blockhash ON objects (blockhash)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS objects_height ON objects (height)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS blocks ("
+            " blockhash TEXT PRIMARY KEY,"
+            " height INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS blocks_height ON blocks (height)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM objects WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, data: bytes, blockhash: Optional[str], height: Optional[int]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO objects (key, blockhash, height, value) VALUES (?, ?, ?, ?)",
+                (key, blockhash, height, data),
+            )
+            if blockhash is not None and height is not None:
+                self._db.execute("INSERT OR REPLACE INTO blocks (blockhash, height) VALUES (?, ?)", (blockhash, height))
+            self._db.commit()
+
+    def block_height(self, blockhash: str) -> Optional[int]:
+        """
+        Height recorded for ``blockhash``, or None if no row has told us yet.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT height FROM blocks WHERE blockhash = ?", (blockhash,)).fetchone()
+        return row[0] if row else None
+
+    def delete_block(self, blockhash: str) -> None:
+        """
+        Delete everything stored for ``blockhash``.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM objects WHERE blockhash = ?", (blockhash,))
+            self._db.execute("DELETE FROM blocks WHERE blockhash = ?", (blockhash,))
+            self._db.commit()
+
+    def delete_from_height(self, height: int) -> None:
+        """
+        Delete everything stored for blocks at or above ``height``.
+        """
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM objects WHERE height >= ?"
+                " OR blockhash IN (SELECT blockhash FROM blocks WHERE height >= ?)",
+                (height, height),
+            )
+            self._db.execute("DELETE FROM blocks WHERE height >= ?", (height,))
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM objects")
+            self._db.execute("DELETE FROM blocks")
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class ObjectCache:
+    """
+    Two-tier, content-addressed cache for blocks and transactions.
+
+    Reads hit an in-memory LRU (bounded in bytes) first and then an optional
+    SQLite store on disk. Only objects buried at least ``min_confirmations``
+    deep are written to disk; shallower blocks and mempool/unconfirmed
+    transactions stay in memory for ``unconfirmed_ttl`` seconds only.
+    Raw transaction hex is keyed by its own hash and never changes, so it is
+    always cached in both tiers.
+
+    Cached verbose objects keep the ``confirmations`` value they had when they
+    were cached. After a reorg, call ``purge_block`` or ``purge_from_height``.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        unconfirmed_ttl: float = DEFAULT_UNCONFIRMED_TTL,
+        min_confirmations: int = DEFAULT_MIN_CONFIRMATIONS,
+    ):
+        """
+        :param path: SQLite file for the disk tier, or None for a memory-only cache.
+        :param max_memory_bytes: Size bound of the in-memory tier.
+        :param unconfirmed_ttl: Seconds shallow blocks and unconfirmed transactions stay cached.
+        :param min_confirmations: Confirmations needed before an object is persisted to disk.
+        """
+        self.memory = LRUCache(max_memory_bytes)
+        self.disk = SQLiteStore(path) if path else None
+        self.unconfirmed_ttl = unconfirmed_ttl
+        self.min_confirmations = min_confirmations
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ------------------------- Blocks -------------------------
+
+    def get_block(self, block_hash: str, verbosity: Any = None) -> Any:
+        """
+        Return the cached block, or None on a miss.
+        """
+        return self._get(self._block_key(block_hash, verbosity))
+
+    def put_block(self, block_hash: str, block: Any, verbosity: Any = None, height: Optional[int] = None) -> None:
+        """
+        :param height: Height of the block; taken from ``block`` itself when it is a verbose dict.
+        """
+        if isinstance(block, dict):
+            deep = block.get('confirmations', 0) >= self.min_confirmations
+            self._put(self._block_key(block_hash, verbosity), block, deep, block_hash, block.get('height', height))
+        else:
+            # Serialized block hex is immutable for its hash.
+            self._put(self._block_key(block_hash, verbosity), block, True, block_hash, height)
+
+    def block_height(self, block_hash: str) -> Optional[int]:
+        """
+        Height of a block the disk tier has seen, or None if unknown (or there is no disk tier).
+        """
+        return self.disk.block_height(block_hash) if self.disk is not None else None
+
+    # ------------------------- Transactions -------------------------
+
+    def get_transaction(self, txid: str, verbose: bool = True) -> Any:
+        """
+        Return the cached transaction, or None on a miss.
+        """
+        return self._get(self._tx_key(txid, verbose))
+
+    def put_transaction(self, txid: str, transaction: Any, verbose: bool = True,
+                        height: Optional[int] = None) -> None:
+        """
+        :param height: Height of the block confirming the transaction. Verbose
+            transactions do not carry it, and without it (or the block being
+            cached) ``purge_from_height`` cannot find the transaction.
+        """
+        if isinstance(transaction, dict):
+            blockhash = transaction.get('blockhash')
+            deep = blockhash is not None and transaction.get('confirmations', 0) >= self.min_confirmations
+            self._put(self._tx_key(txid, verbose), transaction, deep, blockhash, height if blockhash else None)
+        else:
+            self._put(self._tx_key(txid, verbose), transaction, True, None, None)
+
+    def is_persistent(self, transaction: Any) -> bool:
+        """
+        Whether ``put_transaction`` would write this verbose transaction to disk.
+        """
+        return (self.disk is not None and isinstance(transaction, dict)
+                and transaction.get('blockhash') is not None
+                and transaction.get('confirmations', 0) >= self.min_confirmations)
+
+    # ------------------------- Purging -------------------------
+
+    def purge_block(self, block_hash: str) -> None:
+        """
+        Drop a block and every transaction cached as confirmed in it (e.g. after a reorg).
+        """
+        if self.disk:
+            self.disk.delete_block(block_hash)
+        # The memory tier is not indexed by block; drop it as a whole to be safe.
+        self.memory.clear()
+        logger.info(f"Purged cached objects for block {block_hash}.")
+
+    def purge_from_height(self, height: int) -> None:
+        """
+        Drop every cached block at or above ``height`` and the transactions confirmed in them.
+        """
+        if self.disk:
+            self.disk.delete_from_height(height)
+        self.memory.clear()
+        logger.info(f"Purged cached objects from height {height}.")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit and miss counters plus the current size of the memory tier.
+        """
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'memory_entries': len(self.memory),
+            'memory_bytes': self.memory.size,
+        }
+
+    def close(self) -> None:
+        if self.disk:
+            self.disk.close()
+
+    # ------------------------- Internals -------------------------
+
+    @staticmethod
+    def _block_key(block_hash: str, verbosity: Any) -> str:
+        return f"block:{block_hash}" if verbosity is None else f"block:{block_hash}:{verbosity}"
+
+    @staticmethod
+    def _tx_key(txid: str, verbose: bool) -> str:
+        return f"tx:{txid}:{int(bool(verbose))}"
+
+    def _get(self, key: str) -> Any:
+        data = self.memory.get(key)
+        if data is not None:
+            self.memory_hits += 1
+            return decode_value(data)
+        if self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                self.disk_hits += 1
+                self.memory.put(key, data)
+                return decode_value(data)
+        self.misses += 1
+        return None
+
+    def _put(self, key: str, value: Any, persistent: bool, blockhash: Optional[str], height: Optional[int]) -> None:
+        data = encode_value(value)
+        if persistent:
+            self.memory.put(key, data)
+            if self.disk is not None:
+                self.disk.put(key, data, blockhash, height)
+        else:
+            self.memory.put(key, data, ttl=self.unconfirmed_ttl)
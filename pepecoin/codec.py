@@ -0,0 +1,184 @@
+# pepecoin/codec.py
+
+import codecs
+import decimal
+import json
+import logging
+import re
+from typing import Any, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # optional: pip install pepecoin[fast]
+    orjson = None
+
+# orjson silently turns integers beyond 64 bits into floats; 20 digits always exceed them.
+_WIDE_INTEGER = re.compile(rb'[0-9]{20}')
+# A number literal with an exponent (1e5, 1E+5, 2e-8). Anchoring on the token
+# start keeps hex strings such as "3e5f..." from matching.
+_EXPONENT = re.compile(rb'[:,\[]\s*-?[0-9]+[eE]')
+
+
+class StdlibCodec:
+    """
+    Decodes responses with the standard library, turning every JSON number with
+    a fraction or exponent into an exact ``Decimal`` (what ``AuthServiceProxy`` does).
+    """
+
+    name = 'json'
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data, parse_float=decimal.Decimal)
+
+
+class OrjsonCodec(StdlibCodec):
+    """
+    Decodes responses with ``orjson`` when that cannot lose precision.
+
+    orjson has no ``parse_float`` hook, so a body containing floating-point
+    literals would come back as binary floats, and converting them to
+    ``Decimal`` afterwards costs more than the standard library parse saves.
+    Bodies without such literals (``getrawmempool``, ``getblock`` with a txid
+    list, ``listaccounts`` with integral balances, ...) are decoded by orjson;
+    everything else is decoded by ``StdlibCodec``, so amounts are always exact
+    ``Decimal`` values whichever path is taken.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires the 'orjson' package (pip install pepecoin[fast])")
+
+    def decode(self, data: bytes) -> Any:
+        # A false positive (a '.' in an account name, say) only costs the slower path.
+        if b'.' in data or _EXPONENT.search(data) or _WIDE_INTEGER.search(data):
+            return super().decode(data)
+        return orjson.loads(data)
+
+
+def default_codec() -> StdlibCodec:
+    """
+    The fastest exact codec available: ``OrjsonCodec`` if orjson is installed, else ``StdlibCodec``.
+    """
+    return OrjsonCodec() if orjson is not None else StdlibCodec()
+
+
+def get_codec(codec: Optional[Any] = None) -> StdlibCodec:
+    """
+    Resolve a codec argument: None or ``'auto'`` for ``default_codec()``, ``'json'``
+    or ``'orjson'`` by name, or any object with a ``decode(bytes)`` method.
+    """
+    if codec is None or codec == 'auto':
+        return default_codec()
+    if codec == 'json':
+        return StdlibCodec()
+    if codec == 'orjson':
+        return OrjsonCodec()
+    if not hasattr(codec, 'decode'):
+        raise TypeError(f"Unsupported codec: {codec!r}")
+    return codec
+
+
+def is_error_free(data: bytes) -> bool:
+    """
+    True if a single-call response body visibly carries ``"error":null``.
+
+    pepecoind writes ``{"result":...,"error":null,"id":...}`` without spaces,
+    so the marker sits at the end of the body; other layouts return False and
+    should be decoded to find out.
+    """
+    tail = data[-64:]
+    return b'"error":null' in tail or b'"error": null' in tail
+
+
+class ArrayStreamDecoder:
+    """
+    Decodes the elements of one array in a streamed JSON document one at a time.
+
+    Iterating yields the elements of the array stored under ``key`` (the first
+    occurrence, at any depth) as soon as each one is complete, holding no more
+    than one chunk plus one element in memory. Afterwards ``value(name)``
+    decodes the small scalars around the array, e.g. ``lastblock`` or ``error``
+    in a ``listsinceblock`` response.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], key: str):
+        """
+        :param chunks: Byte chunks of the document, e.g. from ``RPCTransport.stream``.
+        :param key: Object key of the array to stream.
+        """
+        self.chunks = iter(chunks)
+        self._key = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+        self._decoder = json.JSONDecoder(parse_float=decimal.Decimal)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._outside = ''  # document text before and after the array
+        self._exhausted = False
+
+    def _read(self) -> Optional[str]:
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            return None
+        return self._utf8.decode(chunk)
+
+    def __iter__(self) -> Iterator[Any]:
+        buffer = ''
+        while True:
+            match = self._key.search(buffer)
+            if match is not None:
+                self._outside = buffer[:match.start()]
+                buffer = buffer[match.end():]
+                break
+            text = self._read()
+            if text is None:
+                self._outside = buffer
+                return
+            buffer += text
+
+        decode = self._decoder.raw_decode
+        pos = 0
+        while True:
+            length = len(buffer)
+            while pos < length and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < length and buffer[pos] == ']':
+                break
+            try:
+                element, end = decode(buffer, pos)
+                # A scalar cut at the chunk boundary can still parse; only trust elements followed by more text.
+                complete = end < length or self._exhausted
+            except ValueError:
+                complete = False
+            if not complete:
+                text = self._read()
+                if text is None:
+                    raise ValueError(f"Unterminated JSON array in streamed response near: {buffer[pos:pos + 80]!r}")
+                buffer = buffer[pos:] + text
+                pos = 0
+                continue
+            pos = end
+            yield element
+        self._outside += buffer[pos + 1:] + ''.join(self._utf8.decode(c) for c in self.chunks)
+        self._exhausted = True
+
+    def close(self) -> None:
+        """
+        Stop reading; closes the chunk source if it supports that (releasing its connection).
+        """
+        close = getattr(self.chunks, 'close', None)
+        if close is not None:
+            close()
+
+    def value(self, name: str, default: Any = None) -> Any:
+        """
+        Decode the value stored under ``name`` outside the streamed array. Only valid after iterating.
+        """
+        if not self._exhausted:
+            raise RuntimeError("value() is only available once the array has been consumed")
+        match = re.search(r'"' + re.escape(name) + r'"\s*:\s*', self._outside)
+        if match is None:
+            return default
+        return self._decoder.raw_decode(self._outside, match.end())[0]
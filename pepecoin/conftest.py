@@ -0,0 +1,89 @@
+# pepecoin/conftest.py
+
+import decimal
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class FakeRPCServer:
+    """
+    Minimal JSON-RPC server for tests. ``handlers`` maps method names to
+    callables taking the params; raising ``FakeRPCError`` produces an error reply.
+    """
+
+    def __init__(self, handlers):
+        self.handlers = handlers
+        self.requests = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers['Content-Length'])
+                payload = json.loads(self.rfile.read(length), parse_float=decimal.Decimal)
+                with server.lock:
+                    server.requests += 1
+                if isinstance(payload, list):
+                    body = [server.dispatch(item) for item in payload]
+                    status = 200
+                else:
+                    body = server.dispatch(payload)
+                    status = 500 if body['error'] else 200
+                data = json.dumps(body, default=float).encode('utf8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def dispatch(self, request):
+        handler = self.handlers.get(request['method'])
+        if handler is None:
+            return {'result': None, 'error': {'code': -32601, 'message': 'Method not found'}, 'id': request['id']}
+        try:
+            return {'result': handler(*request['params']), 'error': None, 'id': request['id']}
+        except FakeRPCError as e:
+            return {'result': None, 'error': {'code': e.code, 'message': e.message}, 'id': request['id']}
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeRPCError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+@pytest.fixture
+def fake_rpc():
+    servers = []
+
+    def start(handlers):
+        server = FakeRPCServer(handlers).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
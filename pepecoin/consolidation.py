@@ -0,0 +1,243 @@
+# pepecoin/consolidation.py
+
+import logging
+import time
+from collections import OrderedDict
+from decimal import Decimal, ROUND_UP
+from typing import Dict, Iterable, List, Optional
+
+from bitcoinrpc.authproxy import JSONRPCException
+
+logger = logging.getLogger(__name__)
+
+# Serialized size model for P2PKH spends: ~148 bytes per signed input, 34 bytes
+# per output and 10 bytes of version/locktime/counts.
+INPUT_BYTES = 148
+OUTPUT_BYTES = 34
+TX_OVERHEAD_BYTES = 10
+
+# Largest transaction relayed as standard by the node.
+MAX_STANDARD_TX_BYTES = 100_000
+
+DEFAULT_FEE_RATE = Decimal('0.01')  # $PEP per 1000 bytes
+DEFAULT_MIN_INPUTS = 2
+DUST_THRESHOLD = Decimal('0.01')
+COIN_PRECISION = Decimal('0.00000001')
+
+GROUP_BY_ADDRESS = 'address'
+GROUP_BY_ACCOUNT = 'account'
+
+
+def estimate_size(input_count: int, output_count: int = 1) -> int:
+    """
+    Estimated serialized size in bytes of a transaction spending ``input_count`` P2PKH outputs.
+    """
+    return TX_OVERHEAD_BYTES + INPUT_BYTES * input_count + OUTPUT_BYTES * output_count
+
+
+def fee_for_size(size: int, fee_rate: Decimal) -> Decimal:
+    """
+    Fee for ``size`` bytes at ``fee_rate`` $PEP per 1000 bytes, rounded up to the satoshi.
+    """
+    return (Decimal(size) * fee_rate / 1000).quantize(COIN_PRECISION, rounding=ROUND_UP)
+
+
+class ConsolidationTx:
+    """
+    One planned consolidation transaction: spends ``inputs`` into a single output to ``destination``.
+    """
+
+    __slots__ = ('group', 'destination', 'inputs', 'size', 'fee', 'txid', 'error')
+
+    def __init__(self, group: str, destination: str, inputs: List[Dict], fee_rate: Decimal):
+        self.group = group
+        self.destination = destination
+        self.inputs = inputs
+        self.size = estimate_size(len(inputs))
+        self.fee = fee_for_size(self.size, fee_rate)
+        self.txid: Optional[str] = None
+        self.error: Optional[Exception] = None
+
+    @property
+    def input_total(self) -> Decimal:
+        return sum((Decimal(str(utxo['amount'])) for utxo in self.inputs), Decimal(0))
+
+    @property
+    def output_amount(self) -> Decimal:
+        return self.input_total - self.fee
+
+    def __repr__(self):
+        state = self.txid or (f"error={self.error}" if self.error else "planned")
+        return (f"<ConsolidationTx {self.group} {len(self.inputs)} inputs {self.size}B "
+                f"fee={self.fee} -> {self.destination} {state}>")
+
+
+class ConsolidationReport:
+    """
+    Planned (and, unless it was a dry run, broadcast) consolidation transactions with totals.
+    """
+
+    def __init__(self, transactions: List[ConsolidationTx], dry_run: bool):
+        self.transactions = transactions
+        self.dry_run = dry_run
+
+    @property
+    def input_count(self) -> int:
+        return sum(len(tx.inputs) for tx in self.transactions)
+
+    @property
+    def total_size(self) -> int:
+        return sum(tx.size for tx in self.transactions)
+
+    @property
+    def total_fees(self) -> Decimal:
+        return sum((tx.fee for tx in self.transactions), Decimal(0))
+
+    @property
+    def txids(self) -> List[str]:
+        return [tx.txid for tx in self.transactions if tx.txid]
+
+    @property
+    def failed(self) -> List[ConsolidationTx]:
+        return [tx for tx in self.transactions if tx.error is not None]
+
+    def __repr__(self):
+        mode = "projected" if self.dry_run else "sent"
+        return (f"<ConsolidationReport {mode}: {len(self.transactions)} transactions, {self.input_count} inputs, "
+                f"{self.total_size} bytes, fees {self.total_fees}, {len(self.failed)} failed>")
+
+
+class UTXOConsolidator:
+    """
+    Merges many small unspent outputs into few large ones.
+
+    Unspent outputs from ``listunspent`` are grouped by address (each address is
+    consolidated back into itself) or by account (consolidated into the
+    account's first address). Each group is split into raw transactions that
+    stay under ``max_tx_bytes`` and pay ``fee_rate`` per 1000 bytes. Inputs that
+    cost more in fees than they are worth are left alone. Transactions are
+    signed by the wallet and broadcast ``pace`` seconds apart so a large run
+    does not flood the mempool.
+    """
+
+    def __init__(
+        self,
+        rpc_connection,
+        fee_rate: Decimal = DEFAULT_FEE_RATE,
+        max_tx_bytes: int = MAX_STANDARD_TX_BYTES,
+        min_inputs: int = DEFAULT_MIN_INPUTS,
+        minconf: int = 1,
+        pace: float = 0.0,
+    ):
+        """
+        :param rpc_connection: RPC transport.
+        :param fee_rate: Fee in $PEP per 1000 bytes.
+        :param max_tx_bytes: Size limit of each consolidation transaction.
+        :param min_inputs: Groups with fewer spendable outputs than this are skipped.
+        :param minconf: Only consolidate outputs with at least this many confirmations.
+        :param pace: Seconds to wait between broadcasts.
+        """
+        self.rpc_connection = rpc_connection
+        self.fee_rate = Decimal(str(fee_rate))
+        self.max_inputs = (max_tx_bytes - estimate_size(0)) // INPUT_BYTES
+        if self.max_inputs < 1:
+            raise ValueError("max_tx_bytes is too small for a single input")
+        self.min_inputs = max(1, min_inputs)
+        self.minconf = minconf
+        self.pace = pace
+
+    def plan(
+        self,
+        group_by: str = GROUP_BY_ADDRESS,
+        addresses: Optional[Iterable[str]] = None,
+        max_utxo_amount: Optional[Decimal] = None,
+    ) -> List[ConsolidationTx]:
+        """
+        Work out the consolidation transactions without touching the wallet.
+
+        :param group_by: ``'address'`` or ``'account'``.
+        :param addresses: Only consider outputs paying these addresses.
+        :param max_utxo_amount: Only consolidate outputs no larger than this (e.g. dust).
+        :return: Planned transactions, largest input sets first.
+        """
+        if group_by not in (GROUP_BY_ADDRESS, GROUP_BY_ACCOUNT):
+            raise ValueError(f"group_by must be '{GROUP_BY_ADDRESS}' or '{GROUP_BY_ACCOUNT}'")
+        try:
+            if addresses is not None:
+                unspent = self.rpc_connection.listunspent(self.minconf, 9999999, list(addresses))
+            else:
+                unspent = self.rpc_connection.listunspent(self.minconf)
+        except JSONRPCException as e:
+            logger.error(f"Error listing unspent outputs: {e}")
+            raise e
+
+        input_fee = fee_for_size(INPUT_BYTES, self.fee_rate)
+        groups: Dict[str, List[Dict]] = OrderedDict()
+        skipped = 0
+        for utxo in unspent:
+            amount = Decimal(str(utxo['amount']))
+            if not utxo.get('spendable', True) or amount <= input_fee:
+                skipped += 1
+                continue
+            if max_utxo_amount is not None and amount > max_utxo_amount:
+                continue
+            key = utxo.get('address') if group_by == GROUP_BY_ADDRESS else utxo.get('account', utxo.get('label', ''))
+            groups.setdefault(key, []).append(utxo)
+        if skipped:
+            logger.info(f"Skipping {skipped} unspendable or uneconomic outputs.")
+
+        planned = []
+        for key, utxos in groups.items():
+            if len(utxos) < self.min_inputs:
+                continue
+            utxos.sort(key=lambda u: Decimal(str(u['amount'])))
+            destination = key if group_by == GROUP_BY_ADDRESS else utxos[-1]['address']
+            for start in range(0, len(utxos), self.max_inputs):
+                chunk = utxos[start:start + self.max_inputs]
+                if len(chunk) < self.min_inputs:
+                    break
+                tx = ConsolidationTx(key, destination, chunk, self.fee_rate)
+                if tx.output_amount < DUST_THRESHOLD:
+                    continue
+                planned.append(tx)
+        planned.sort(key=lambda tx: len(tx.inputs), reverse=True)
+        return planned
+
+    def run(
+        self,
+        group_by: str = GROUP_BY_ADDRESS,
+        addresses: Optional[Iterable[str]] = None,
+        max_utxo_amount: Optional[Decimal] = None,
+        dry_run: bool = False,
+    ) -> ConsolidationReport:
+        """
+        Plan, sign and broadcast consolidation transactions.
+
+        :param dry_run: Only report the projected input count, size and fees.
+        :return: A ``ConsolidationReport``. Failures are recorded per transaction rather than raised.
+        """
+        report = ConsolidationReport(self.plan(group_by, addresses, max_utxo_amount), dry_run)
+        if dry_run:
+            logger.info(f"Consolidation dry run: {report}.")
+            return report
+
+        for i, tx in enumerate(report.transactions):
+            if i and self.pace:
+                time.sleep(self.pace)
+            try:
+                tx.txid = self._send(tx)
+                logger.info(f"Consolidated {len(tx.inputs)} outputs of '{tx.group}' into {tx.destination}. "
+                            f"TXID: {tx.txid}")
+            except JSONRPCException as e:
+                logger.error(f"Failed to consolidate {len(tx.inputs)} outputs of '{tx.group}': {e}")
+                tx.error = e
+        logger.info(f"Consolidation finished: {report}.")
+        return report
+
+    def _send(self, tx: ConsolidationTx) -> str:
+        inputs = [{'txid': utxo['txid'], 'vout': utxo['vout']} for utxo in tx.inputs]
+        raw = self.rpc_connection.createrawtransaction(inputs, {tx.destination: tx.output_amount})
+        signed = self.rpc_connection.signrawtransaction(raw)
+        if not signed.get('complete'):
+            raise JSONRPCException({'code': -4, 'message': f"Wallet could not sign all inputs: {signed.get('errors')}"})
+        return self.rpc_connection.sendrawtransaction(signed['hex'])
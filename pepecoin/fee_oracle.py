@@ -0,0 +1,190 @@
+# pepecoin/fee_oracle.py
+
+import bisect
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEE_TARGETS = (1, 2, 3, 6, 12, 24)
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+class FeeEstimate(NamedTuple):
+    """
+    ``estimatesmartfee`` answer for one confirmation target, as of block ``height``.
+
+    ``stale`` is True when the node could not produce a fresh estimate for the
+    current tip; ``feerate`` is then the last known value (or None if there never was one).
+    """
+
+    conf_target: int
+    feerate: Optional[Decimal]
+    blocks: Optional[int]
+    height: Optional[int]
+    stale: bool = False
+    errors: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict:
+        """
+        The estimate in the shape ``estimatesmartfee`` returns, plus the ``stale`` flag.
+        """
+        result = {'blocks': self.blocks, 'stale': self.stale}
+        if self.feerate is not None:
+            result['feerate'] = self.feerate
+        if self.errors:
+            result['errors'] = list(self.errors)
+        return result
+
+
+class FeeOracle:
+    """
+    In-memory fee estimates for a fixed set of confirmation targets.
+
+    The node only updates its estimates when a block connects, so the oracle
+    polls ``getbestblockhash`` every ``poll_interval`` seconds and, when the tip
+    moves, fetches ``estimatesmartfee`` for every target in one batch request.
+    ``estimate()`` is then a dictionary lookup. A target that is not in the set
+    is answered with the nearest smaller one (a slightly higher fee).
+
+    If the node errors, or has no estimate for a target, the last known value
+    is kept and marked ``stale``; calls that failed are retried on the next poll.
+    """
+
+    def __init__(
+        self,
+        rpc_connection,
+        targets: Sequence[int] = DEFAULT_FEE_TARGETS,
+        estimate_mode: str = 'CONSERVATIVE',
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        background: bool = True,
+    ):
+        """
+        :param rpc_connection: RPC transport used for the tip checks and estimate batches.
+        :param targets: Confirmation targets to precompute on every new tip.
+        :param estimate_mode: ``estimate_mode`` passed to ``estimatesmartfee``.
+        :param poll_interval: Seconds between chain tip checks.
+        :param background: Poll in a daemon thread; otherwise ``estimate()`` polls when the last check is too old.
+        """
+        if not targets:
+            raise ValueError("At least one confirmation target is required.")
+        self.rpc_connection = rpc_connection
+        self.targets: Tuple[int, ...] = tuple(sorted(set(targets)))
+        self.estimate_mode = estimate_mode
+        self.poll_interval = poll_interval
+        self.background = background
+        self.tip: Optional[str] = None
+        self.height: Optional[int] = None
+        self.checked_at: Optional[float] = None
+        self.updated_at: Optional[float] = None
+        self._estimates: Dict[int, FeeEstimate] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def estimate(self, conf_target: int) -> FeeEstimate:
+        """
+        Return the cached estimate for ``conf_target``, without an RPC once the oracle is warm.
+        """
+        self._start_poller()
+        checked_at = self.checked_at
+        if checked_at is None or not self.background and time.monotonic() - checked_at >= self.poll_interval:
+            with self._lock:
+                if self.checked_at == checked_at:
+                    self._poll()
+        index = bisect.bisect_right(self.targets, conf_target)
+        target = self.targets[max(index - 1, 0)]
+        estimate = self._estimates.get(target)
+        if estimate is None:
+            return FeeEstimate(conf_target, None, None, self.height, True, ('no estimate available',))
+        return estimate
+
+    def estimates(self) -> Dict[int, FeeEstimate]:
+        """
+        All cached estimates, keyed by confirmation target.
+        """
+        return dict(self._estimates)
+
+    def refresh(self, force: bool = False) -> Dict[int, FeeEstimate]:
+        """
+        Check the tip now and recompute the estimates if it moved (or always, with ``force``).
+        """
+        with self._lock:
+            if force:
+                self.tip = None
+            self._poll()
+        return self.estimates()
+
+    def _poll(self) -> None:
+        self.checked_at = time.monotonic()
+        try:
+            tip = self.rpc_connection.getbestblockhash()
+        except Exception as e:
+            logger.error(f"Error checking the chain tip for fee estimates: {e}")
+            self._mark_stale(str(e))
+            return
+        if tip != self.tip:
+            self._recompute(tip)
+
+    def _recompute(self, tip: str) -> None:
+        calls = [('getblockcount',)] + [('estimatesmartfee', t, self.estimate_mode) for t in self.targets]
+        try:
+            results = self.rpc_connection.batch(calls)
+        except Exception as e:
+            logger.error(f"Error fetching fee estimates: {e}")
+            self._mark_stale(str(e))
+            return
+
+        height = results[0].result if results[0].ok else self.height
+        estimates: Dict[int, FeeEstimate] = {}
+        failed = False
+        for target, result in zip(self.targets, results[1:]):
+            answer = result.result if result.ok else {}
+            feerate = answer.get('feerate')
+            if feerate is not None:
+                estimates[target] = FeeEstimate(target, Decimal(str(feerate)), answer.get('blocks'), height)
+                continue
+            # No data for this target at this tip, or the call failed: keep the last known value.
+            failed = failed or not result.ok
+            errors = tuple(answer.get('errors', ())) if result.ok else (str(result.error),)
+            previous = self._estimates.get(target)
+            if previous is not None:
+                estimates[target] = previous._replace(stale=True, errors=errors)
+            else:
+                estimates[target] = FeeEstimate(target, None, answer.get('blocks'), height, True, errors)
+
+        self._estimates = estimates
+        self.height = height
+        self.updated_at = time.monotonic()
+        if failed:
+            logger.warning(f"Some fee estimates failed at height {height}; serving the last known values.")
+        else:
+            # Only move on once every target got the node's answer for this tip.
+            self.tip = tip
+        logger.debug(f"Fee estimates refreshed at height {height}.")
+
+    def _mark_stale(self, error: str) -> None:
+        self._estimates = {t: e._replace(stale=True, errors=(error,)) for t, e in self._estimates.items()}
+        self.tip = None  # so the next successful poll recomputes even if the tip has not moved
+
+    def _start_poller(self) -> None:
+        if not self.background or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pepecoin-fee-oracle", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            with self._lock:
+                self._poll()
+
+    def stop(self) -> None:
+        """
+        Stop the background poller.
+        """
+        self._stop.set()
@@ -0,0 +1,204 @@
+# pepecoin/history.py
+
+import json
+import logging
+import os
+from decimal import Decimal
+from typing import Dict, Generator, Iterator, NamedTuple, Optional
+
+from bitcoinrpc.authproxy import JSONRPCException
+
+from .codec import ArrayStreamDecoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_EVERY = 10_000
+
+
+class HistoryRecord(NamedTuple):
+    """
+    One wallet transaction entry, as reported by ``listsinceblock``.
+
+    ``vout`` is None for sends to several outputs reported as one entry, ``fee``
+    is None for receives and ``blockhash`` is None while unconfirmed.
+    """
+    txid: str
+    vout: Optional[int]
+    category: str
+    account: str
+    address: Optional[str]
+    amount: Decimal
+    fee: Optional[Decimal]
+    confirmations: int
+    blockhash: Optional[str]
+    time: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.txid}:{self.vout}:{self.category}"
+
+
+class HistoryCursor(NamedTuple):
+    """
+    Position in the wallet history.
+
+    ``since`` is the block hash the current pass starts after ('' for the whole
+    history), ``position`` how many entries of that pass were already delivered
+    and ``last_key`` the key of the last one, used to detect that the node's
+    answer changed underneath a saved position.
+    """
+    since: str = ''
+    position: int = 0
+    last_key: str = ''
+
+
+def _amount(value) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def to_record(entry: Dict) -> HistoryRecord:
+    get = entry.get
+    fee = get('fee')
+    return HistoryRecord(
+        entry['txid'],
+        get('vout'),
+        get('category', ''),
+        get('account', ''),
+        get('address'),
+        _amount(get('amount', 0)),
+        None if fee is None else _amount(fee),
+        get('confirmations', 0),
+        get('blockhash'),
+        get('blocktime') or get('time', 0),
+    )
+
+
+class WalletHistory:
+    """
+    Streams the wallet's transaction history with ``listsinceblock``.
+
+    Unlike ``listtransactions`` with ``count``/``skip``, where every page walks
+    the history from the newest entry again, one pass asks the node once for
+    everything after the cursor block and decodes the response while it
+    streams in. Reading any amount of history is therefore linear in time and
+    constant in memory (one HTTP chunk plus one entry).
+
+    Iterating runs one pass and yields ``HistoryRecord``s. ``cursor`` always
+    reflects the entries the consumer has finished with; it can be saved and
+    passed back in, and with ``state_path`` it is saved every
+    ``checkpoint_every`` entries and at the end of the pass. A finished pass
+    moves the cursor to ``lastblock``, which trails the tip by
+    ``target_confirmations - 1`` blocks, so entries that were still unconfirmed
+    are reported again (with their new confirmation count) by the next pass.
+
+    Delivery is at-least-once: if the node's answer changed before a saved
+    position (e.g. a reorg), the pass starts over and repeats entries, so
+    consumers should be idempotent on ``HistoryRecord.key``. Account moves
+    (``move``) are not part of ``listsinceblock`` output.
+    """
+
+    def __init__(
+        self,
+        rpc_connection,
+        cursor: Optional[HistoryCursor] = None,
+        state_path: Optional[str] = None,
+        account: Optional[str] = None,
+        target_confirmations: int = 1,
+        include_watchonly: bool = False,
+        checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    ):
+        """
+        :param rpc_connection: RPC transport; ``RPCTransport.stream`` is used when available.
+        :param cursor: Where to resume. Defaults to the saved cursor, or the start of the history.
+        :param state_path: JSON file the cursor is persisted to.
+        :param account: Only yield entries of this account.
+        :param target_confirmations: Confirmations after which entries are not reported again.
+        :param include_watchonly: Include watch-only addresses.
+        :param checkpoint_every: Entries between cursor saves.
+        """
+        self.rpc_connection = rpc_connection
+        self.state_path = state_path
+        self.account = account
+        self.target_confirmations = target_confirmations
+        self.include_watchonly = include_watchonly
+        self.checkpoint_every = checkpoint_every
+        self.cursor = cursor if cursor is not None else self._load()
+
+    def __iter__(self) -> Iterator[HistoryRecord]:
+        # A restarted pass begins at position 0, so it cannot need another restart.
+        while (yield from self._read_pass()):
+            pass
+
+    def _read_pass(self) -> Generator[HistoryRecord, None, bool]:
+        """
+        Yield one pass of records. Returns True if the pass must be read again from the start.
+        """
+        cursor = self.cursor
+        params = (cursor.since, self.target_confirmations, self.include_watchonly)
+        stream = None
+        if callable(getattr(type(self.rpc_connection), 'stream', None)):
+            stream = ArrayStreamDecoder(self.rpc_connection.stream('listsinceblock', *params), 'transactions')
+        position = 0
+        restart = False
+        try:
+            if stream is not None:
+                entries = stream
+            else:
+                result = self.rpc_connection.listsinceblock(*params)
+                entries = result.get('transactions', [])
+            for entry in entries:
+                record = to_record(entry)
+                position += 1
+                if position <= cursor.position:
+                    if position == cursor.position and record.key != cursor.last_key:
+                        restart = True
+                        break
+                    continue
+                if self.account is None or record.account == self.account:
+                    yield record
+                self.cursor = HistoryCursor(cursor.since, position, record.key)
+                if position % self.checkpoint_every == 0:
+                    self._save()
+            if restart:
+                lastblock = None
+            elif stream is not None:
+                if stream.value('error') is not None:
+                    raise JSONRPCException(stream.value('error'))
+                lastblock = stream.value('lastblock')
+            else:
+                lastblock = result.get('lastblock')
+        except JSONRPCException as e:
+            logger.error(f"Failed to list wallet history since block '{cursor.since}': {e}")
+            raise e
+        finally:
+            if stream is not None:
+                stream.close()
+
+        if restart or position < cursor.position:
+            # The node's answer changed underneath the saved position (e.g. a reorg):
+            # deliver the whole pass again rather than risk skipping entries.
+            logger.warning(f"Wallet history since block '{cursor.since}' changed; restarting the pass.")
+            self.cursor = HistoryCursor(cursor.since)
+            return True
+        self.cursor = HistoryCursor(lastblock or cursor.since)
+        self._save()
+        logger.info(f"Read {position - cursor.position} wallet history entries; cursor at block '{self.cursor.since}'.")
+        return False
+
+    # ------------------------- Persistence -------------------------
+
+    def _load(self) -> HistoryCursor:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return HistoryCursor()
+        with open(self.state_path) as f:
+            cursor = HistoryCursor(**json.load(f))
+        logger.info(f"Restored wallet history cursor at block '{cursor.since}', entry {cursor.position}.")
+        return cursor
+
+    def _save(self) -> None:
+        if not self.state_path:
+            return
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.cursor._asdict(), f)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,240 @@
+# pepecoin/instrumentation.py
+
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Latency bucket upper bounds in seconds.
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RPCEvent(NamedTuple):
+    """
+    One finished HTTP round trip to the node.
+
+    ``method`` is the RPC method, or ``batch:<method>[+<method>...]`` for array
+    requests (``calls`` then holds the number of calls in it). ``errors`` lists
+    the JSON-RPC error code of every failed call, or the exception class name
+    for transport failures; it is empty on success.
+    """
+    method: str
+    calls: int
+    duration: float
+    request_bytes: int
+    response_bytes: int
+    errors: Tuple[Union[int, str], ...]
+
+
+class RPCObserver:
+    """
+    Base class for transport observers. Override either hook.
+
+    Hooks run on the calling thread, so they should be cheap; exceptions they
+    raise are logged and otherwise ignored.
+    """
+
+    def rpc_started(self, method: str) -> None:
+        pass
+
+    def rpc_finished(self, event: RPCEvent) -> None:
+        pass
+
+
+class CallbackObserver(RPCObserver):
+    """
+    Calls ``callback(event)`` for every finished request.
+    """
+
+    def __init__(self, callback: Callable[[RPCEvent], None]):
+        self.callback = callback
+
+    def rpc_finished(self, event: RPCEvent) -> None:
+        self.callback(event)
+
+
+class _MethodStats:
+    __slots__ = ('buckets', 'count', 'total_seconds', 'request_bytes', 'response_bytes', 'in_flight', 'errors')
+
+    def __init__(self, bucket_count: int):
+        self.buckets = [0] * (bucket_count + 1)  # the last slot is +Inf
+        self.count = 0
+        self.total_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.in_flight = 0
+        self.errors: Dict[Union[int, str], int] = {}
+
+
+class RPCMetrics(RPCObserver):
+    """
+    Aggregates per-method latency histograms, byte counts, error counts by
+    code and in-flight gauges. Read them with ``snapshot()`` or export them in
+    Prometheus text format with ``render_prometheus()`` / ``serve()``.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.bucket_bounds = tuple(sorted(buckets))
+        self._methods: Dict[str, _MethodStats] = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _stats(self, method: str) -> _MethodStats:
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = self._methods[method] = _MethodStats(len(self.bucket_bounds))
+        return stats
+
+    def rpc_started(self, method: str) -> None:
+        with self._lock:
+            self._stats(method).in_flight += 1
+
+    def rpc_finished(self, event: RPCEvent) -> None:
+        index = bisect.bisect_left(self.bucket_bounds, event.duration)
+        with self._lock:
+            stats = self._stats(event.method)
+            stats.in_flight -= 1
+            stats.buckets[index] += 1
+            stats.count += 1
+            stats.total_seconds += event.duration
+            stats.request_bytes += event.request_bytes
+            stats.response_bytes += event.response_bytes
+            for code in event.errors:
+                stats.errors[code] = stats.errors.get(code, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+
+    # ------------------------- Export -------------------------
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Current values per method: ``count``, ``total_seconds``, cumulative ``buckets``
+        as ``[(upper_bound, count), ...]``, byte totals, ``in_flight`` and ``errors`` by code.
+        """
+        with self._lock:
+            snapshot = {}
+            for method, stats in self._methods.items():
+                cumulative, running = [], 0
+                for bound, count in zip(self.bucket_bounds + (float('inf'),), stats.buckets):
+                    running += count
+                    cumulative.append((bound, running))
+                snapshot[method] = {
+                    'count': stats.count,
+                    'total_seconds': stats.total_seconds,
+                    'buckets': cumulative,
+                    'request_bytes': stats.request_bytes,
+                    'response_bytes': stats.response_bytes,
+                    'in_flight': stats.in_flight,
+                    'errors': dict(stats.errors),
+                }
+            return snapshot
+
+    def render_prometheus(self, prefix: str = 'pepecoin_rpc') -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines: List[str] = [
+            f"# HELP {prefix}_duration_seconds RPC round-trip latency.",
+            f"# TYPE {prefix}_duration_seconds histogram",
+        ]
+        for method, stats in snapshot.items():
+            for bound, count in stats['buckets']:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_duration_seconds_bucket{{method="{method}",le="{le}"}} {count}')
+            lines.append(f'{prefix}_duration_seconds_sum{{method="{method}"}} {stats["total_seconds"]}')
+            lines.append(f'{prefix}_duration_seconds_count{{method="{method}"}} {stats["count"]}')
+        for name, key, help_text in (
+            ('request_bytes_total', 'request_bytes', 'Bytes sent in RPC request bodies.'),
+            ('response_bytes_total', 'response_bytes', 'Bytes received in RPC response bodies.'),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for method, stats in snapshot.items():
+                lines.append(f'{prefix}_{name}{{method="{method}"}} {stats[key]}')
+        lines.append(f"# HELP {prefix}_errors_total RPC errors by JSON-RPC error code.")
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        for method, stats in snapshot.items():
+            for code, count in stats['errors'].items():
+                lines.append(f'{prefix}_errors_total{{method="{method}",code="{code}"}} {count}')
+        lines.append(f"# HELP {prefix}_in_flight RPC requests currently waiting for the node.")
+        lines.append(f"# TYPE {prefix}_in_flight gauge")
+        for method, stats in snapshot.items():
+            lines.append(f'{prefix}_in_flight{{method="{method}"}} {stats["in_flight"]}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int = 9464, host: str = '127.0.0.1'):
+        """
+        Serve ``render_prometheus()`` over HTTP from a daemon thread.
+
+        :return: The running ``ThreadingHTTPServer``; its ``server_address`` holds the bound port.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                data = metrics.render_prometheus().encode('utf8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="pepecoin-metrics", daemon=True).start()
+        self._server = server
+        logger.info(f"Serving RPC metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+    def stop_serving(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def notify_started(observers: Sequence[RPCObserver], method: str) -> None:
+    for observer in observers:
+        try:
+            observer.rpc_started(method)
+        except Exception as e:
+            logger.error(f"RPC observer {observer!r} failed: {e}")
+
+
+def notify_finished(observers: Sequence[RPCObserver], event: RPCEvent) -> None:
+    for observer in observers:
+        try:
+            observer.rpc_finished(event)
+        except Exception as e:
+            logger.error(f"RPC observer {observer!r} failed: {e}")
+
+
+def batch_label(calls: Sequence[Sequence]) -> str:
+    """
+    Metric label for an array request: ``batch:`` followed by its distinct methods,
+    sorted and joined with ``+`` (``batch:getblock+getblockhash``).
+    """
+    return 'batch:' + '+'.join(sorted({call[0] for call in calls}))
+
+
+def error_code(error: BaseException) -> Union[int, str]:
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return code
+    info = getattr(error, 'error', None)
+    if isinstance(info, dict) and 'code' in info:
+        return info['code']
+    return type(error).__name__
@@ -0,0 +1,265 @@
+# pepecoin/mempool.py
+
+import logging
+import queue
+import threading
+import time
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from bitcoinrpc.authproxy import JSONRPCException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_MAX_ENTRIES = 50_000
+
+ADDED = 'added'
+REMOVED = 'removed'
+
+
+class MempoolEntry:
+    """
+    What the tracker keeps of an unconfirmed transaction: its outputs and when it was first seen.
+    """
+
+    __slots__ = ('txid', 'outputs', 'size', 'first_seen')
+
+    def __init__(self, txid: str, outputs: Tuple[Tuple[str, Decimal], ...], size: int, first_seen: float):
+        self.txid = txid
+        self.outputs = outputs  # (address, amount) pairs
+        self.size = size
+        self.first_seen = first_seen
+
+    @property
+    def addresses(self) -> Set[str]:
+        return {address for address, _ in self.outputs}
+
+    def amount_to(self, address: str) -> Decimal:
+        return sum((amount for a, amount in self.outputs if a == address), Decimal(0))
+
+    @classmethod
+    def from_transaction(cls, tx: Dict) -> 'MempoolEntry':
+        """
+        Build an entry from a verbose ``getrawtransaction`` result.
+        """
+        outputs = []
+        for vout in tx.get('vout', ()):
+            script = vout.get('scriptPubKey', {})
+            addresses = script.get('addresses') or ([script['address']] if 'address' in script else ())
+            for address in addresses:
+                outputs.append((address, Decimal(str(vout['value']))))
+        return cls(tx['txid'], tuple(outputs), tx.get('size', 0), time.time())
+
+    def __repr__(self):
+        return f"<MempoolEntry {self.txid} outputs={len(self.outputs)}>"
+
+
+class MempoolEvent(NamedTuple):
+    """
+    Emitted when a transaction enters (``'added'``) or leaves (``'removed'``, confirmed
+    or dropped) the mempool.
+    """
+    kind: str
+    txid: str
+    entry: MempoolEntry
+
+
+class MempoolTracker:
+    """
+    Follows the node's mempool incrementally.
+
+    Each poll asks for the non-verbose ``getrawmempool`` txid list, diffs it
+    against the previous one, fetches only the new transactions (batched
+    ``getrawtransaction``) and forgets the ones that left, so poll cost depends
+    on mempool churn rather than mempool size. Outputs are indexed by address
+    for ``entries_for()``.
+
+    Memory is bounded: with ``watch_addresses`` only transactions paying those
+    addresses are kept, and at most ``max_entries`` transactions are kept in
+    any case (later ones are skipped until they leave the mempool). Other
+    transactions only cost their txid.
+
+    Events are returned by ``poll()``, delivered to ``on_event`` and/or put on
+    ``event_queue``, or can be consumed with ``events()``.
+    """
+
+    def __init__(
+        self,
+        rpc_connection,
+        watch_addresses: Optional[Iterable[str]] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        on_event: Optional[Callable[[MempoolEvent], None]] = None,
+        event_queue: Optional[queue.Queue] = None,
+    ):
+        """
+        :param rpc_connection: RPC transport used for ``getrawmempool`` and ``getrawtransaction``.
+        :param watch_addresses: Only keep transactions paying these addresses; None keeps all.
+        :param max_entries: Maximum number of transactions kept with their outputs.
+        :param on_event: Callback invoked with each ``MempoolEvent``.
+        :param event_queue: Queue each ``MempoolEvent`` is put on.
+        """
+        self.rpc_connection = rpc_connection
+        self.watch_addresses: Optional[Set[str]] = set(watch_addresses) if watch_addresses is not None else None
+        self.max_entries = max_entries
+        self.on_event = on_event
+        self.event_queue = event_queue
+        self.entries: Dict[str, MempoolEntry] = {}
+        self.skipped = 0
+        self._seen: Set[str] = set()  # every txid of the last poll, kept or not
+        self._by_address: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------- Queries -------------------------
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, txid: str) -> bool:
+        return txid in self.entries
+
+    def txids_for(self, address: str) -> Set[str]:
+        """
+        Txids of kept mempool transactions paying ``address``.
+        """
+        return set(self._by_address.get(address, ()))
+
+    def entries_for(self, address: str) -> List[MempoolEntry]:
+        entries = self.entries
+        return [entries[txid] for txid in self._by_address.get(address, ()) if txid in entries]
+
+    def watch(self, address: str) -> None:
+        """
+        Also keep transactions paying ``address`` (from the next one that arrives).
+        """
+        if self.watch_addresses is not None:
+            self.watch_addresses.add(address)
+
+    # ------------------------- Polling -------------------------
+
+    def poll(self) -> List[MempoolEvent]:
+        """
+        Diff the mempool against the previous poll and return the resulting events.
+
+        :raises JSONRPCException: If ``getrawmempool`` fails; the tracked state is left unchanged.
+        """
+        with self._lock:
+            try:
+                current = set(self.rpc_connection.getrawmempool())
+            except JSONRPCException as e:
+                logger.error(f"Failed to poll the mempool: {e}")
+                raise e
+
+            gone = self._seen - current
+            new = [txid for txid in current if txid not in self._seen]
+            # Fetch before changing anything, so a failed batch leaves the state as it was.
+            fetched = self._fetch(new, room=self.max_entries - len(self.entries) + len(gone & self.entries.keys()))
+            events = [MempoolEvent(REMOVED, txid, entry) for txid, entry in self._remove(gone)]
+            events.extend(MempoolEvent(ADDED, entry.txid, entry) for entry in self._add(fetched))
+
+        if events:
+            logger.info(f"Mempool poll: {len(current)} transactions, {len(events)} events.")
+        for event in events:
+            self._emit(event)
+        return events
+
+    def _remove(self, gone: Set[str]) -> List[Tuple[str, MempoolEntry]]:
+        removed = []
+        for txid in gone:
+            self._seen.discard(txid)
+            entry = self.entries.pop(txid, None)
+            if entry is None:
+                continue
+            for address in entry.addresses:
+                txids = self._by_address.get(address)
+                if txids is not None:
+                    txids.discard(txid)
+                    if not txids:
+                        del self._by_address[address]
+            removed.append((txid, entry))
+        return removed
+
+    def _fetch(self, new: List[str], room: int) -> List[Dict]:
+        if len(new) > room and self.watch_addresses is None:
+            logger.warning(f"Mempool tracker is full ({self.max_entries} entries); "
+                           f"skipping {len(new) - room} new transactions.")
+            self.skipped += len(new) - room
+            self._seen.update(new[room:])
+            new = new[:room]
+        if not new:
+            return []
+        transactions = []
+        for txid, result in zip(new, self.rpc_connection.batch([('getrawtransaction', txid, True) for txid in new])):
+            if result.ok:
+                transactions.append(result.result)
+            else:
+                # Usually confirmed or evicted since getrawmempool; left unseen so it is retried if still there.
+                logger.debug(f"Could not fetch mempool transaction {txid}: {result.error}")
+        return transactions
+
+    def _add(self, transactions: List[Dict]) -> List[MempoolEntry]:
+        added = []
+        watched = self.watch_addresses
+        for tx in transactions:
+            entry = MempoolEntry.from_transaction(tx)
+            self._seen.add(entry.txid)
+            if watched is not None and not any(address in watched for address, _ in entry.outputs):
+                continue
+            if len(self.entries) >= self.max_entries:
+                self.skipped += 1
+                continue
+            self.entries[entry.txid] = entry
+            for address in entry.addresses:
+                self._by_address.setdefault(address, set()).add(entry.txid)
+            added.append(entry)
+        return added
+
+    def _emit(self, event: MempoolEvent) -> None:
+        if self.event_queue is not None:
+            self.event_queue.put(event)
+        if self.on_event is not None:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                logger.error(f"Mempool event callback failed for transaction '{event.txid}': {e}")
+
+    # ------------------------- Background Polling -------------------------
+
+    def events(self, interval: float = DEFAULT_POLL_INTERVAL) -> Iterator[MempoolEvent]:
+        """
+        Poll every ``interval`` seconds and yield events as they happen, until ``stop()`` is called.
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            try:
+                yield from self.poll()
+            except Exception as e:
+                logger.error(f"Error during mempool polling: {e}")
+            self._stop.wait(interval)
+
+    def start(self, interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        """
+        Poll every ``interval`` seconds in a daemon thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f"Error during mempool polling: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name="pepecoin-mempool-tracker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,284 @@
+# pepecoin/multinode.py
+
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from bitcoinrpc.authproxy import JSONRPCException
+
+from .instrumentation import RPCObserver
+from .transport import READ_METHODS, BatchResult, RPCTransport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEALTH_INTERVAL = 5.0
+DEFAULT_MAX_LAG = 2
+
+# Reads that differ from node to node. They always go to the primary, so consecutive calls
+# (e.g. MempoolTracker polls) see one mempool instead of diffing several.
+PRIMARY_READ_METHODS = frozenset(('getrawmempool', 'getmempoolentry', 'getmempoolinfo'))
+
+# Errors that say "this node cannot answer right now", as opposed to "the request is wrong".
+_UNAVAILABLE_CODES = (-28, -342, -344)  # warming up, non-JSON reply, no free connection
+# Block or transaction not found (-5), height out of range (-8): a replica that is behind may
+# not have what the caller learned from the primary yet, so the primary is asked instead.
+_NOT_FOUND_CODES = (-5, -8)
+
+
+class Endpoint:
+    """
+    One node behind a ``MultiNodeTransport`` and what the health checks know about it.
+    """
+
+    __slots__ = ('name', 'transport', 'outstanding', 'height', 'healthy', 'checked_at', 'error')
+
+    def __init__(self, name: str, transport: RPCTransport):
+        self.name = name
+        self.transport = transport
+        self.outstanding = 0
+        self.height: Optional[int] = None
+        self.healthy = True  # until a check says otherwise
+        self.checked_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def __repr__(self):
+        state = 'healthy' if self.healthy else 'out'
+        return f"<Endpoint {self.name} {state} height={self.height} outstanding={self.outstanding}>"
+
+
+class MultiNodeTransport:
+    """
+    Spreads read-only RPCs over several nodes and sends everything else to a primary.
+
+    Reads (``READ_METHODS``) go to the healthy endpoint with the fewest requests
+    in flight, so a slow node automatically receives less traffic. Wallet and
+    write calls, and any batch containing one, always go to the primary, which
+    holds the wallet; so do mempool queries (``PRIMARY_READ_METHODS``), whose
+    answers differ between nodes. A daemon thread polls ``getblockcount`` on
+    every node every ``health_interval`` seconds; a node that fails the check or
+    is more than ``max_lag`` blocks behind the best tip is taken out of read
+    rotation until it catches up. A read that fails because its node is
+    unreachable or warming up is retried once on another endpoint, and a read
+    a replica answers with "not found" (a block or transaction it has not seen
+    yet) is asked of the primary.
+
+    Exposes the ``RPCTransport`` interface, so it can replace one anywhere
+    (``Pepecoin(..., read_endpoints=[...])`` builds one).
+    """
+
+    def __init__(
+        self,
+        primary: RPCTransport,
+        replicas: Sequence[RPCTransport],
+        health_interval: float = DEFAULT_HEALTH_INTERVAL,
+        max_lag: int = DEFAULT_MAX_LAG,
+        read_from_primary: bool = True,
+        background: bool = True,
+    ):
+        """
+        :param primary: Transport of the node holding the wallet; receives all non-read calls.
+        :param replicas: Transports of additional nodes serving reads.
+        :param health_interval: Seconds between health checks.
+        :param max_lag: Blocks a node may trail the best known tip before it is taken out of rotation.
+        :param read_from_primary: Also send reads to the primary.
+        :param background: Run health checks in a daemon thread; otherwise call ``check_health()`` yourself.
+        """
+        self.primary = Endpoint(f"{primary.host}:{primary.port}", primary)
+        self.replicas = [Endpoint(f"{t.host}:{t.port}", t) for t in replicas]
+        self.endpoints = [self.primary] + self.replicas
+        self.readers = self.endpoints if read_from_primary else self.replicas
+        self.health_interval = health_interval
+        self.max_lag = max_lag
+        self.background = background
+        self.batch_chunk_size = primary.batch_chunk_size
+        self._rotation = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *params: self.call(name, *params)
+
+    # ------------------------- Routing -------------------------
+
+    def _pick_reader(self, exclude: Optional[Endpoint] = None) -> Endpoint:
+        candidates = [e for e in self.readers if e.healthy and e is not exclude]
+        if not candidates:
+            return self.primary
+        # Start the scan at a rotating offset so ties do not always favour the first node.
+        start = next(self._rotation) % len(candidates)
+        best = None
+        for i in range(len(candidates)):
+            endpoint = candidates[(start + i) % len(candidates)]
+            if best is None or endpoint.outstanding < best.outstanding:
+                best = endpoint
+        return best
+
+    def _route(self, method: str) -> Endpoint:
+        if method not in READ_METHODS or method in PRIMARY_READ_METHODS:
+            return self.primary
+        self._start_health_checks()
+        return self._pick_reader()
+
+    def _send(self, endpoint: Endpoint, send, *args) -> Any:
+        with self._lock:
+            endpoint.outstanding += 1
+        try:
+            return send(endpoint.transport, *args)
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+
+    def _with_failover(self, endpoint: Endpoint, read: bool, send, *args) -> Any:
+        try:
+            return self._send(endpoint, send, *args)
+        except (OSError, JSONRPCException) as e:
+            if read and endpoint is not self.primary and _error_code(e) in _NOT_FOUND_CODES:
+                logger.debug(f"Node {endpoint.name} has not seen it yet ({e}); asking the primary.")
+                return self._send(self.primary, send, *args)
+            if not read or not _is_unavailable(e):
+                raise
+            self._mark_down(endpoint, e)
+            fallback = self._pick_reader(exclude=endpoint)
+            if fallback is endpoint:
+                raise
+            logger.warning(f"Node {endpoint.name} unavailable ({e}); retrying on {fallback.name}.")
+            return self._send(fallback, send, *args)
+
+    def call(self, method: str, *params) -> Any:
+        return self._with_failover(self._route(method), method in READ_METHODS,
+                                   lambda transport: transport.call(method, *params))
+
+    def call_raw(self, method: str, *params) -> bytes:
+        return self._with_failover(self._route(method), method in READ_METHODS,
+                                   lambda transport: transport.call_raw(method, *params))
+
+    def stream(self, method: str, *params, **kwargs) -> Iterator[bytes]:
+        # Streams are not retried: part of the body may already have been consumed.
+        return self._route(method).transport.stream(method, *params, **kwargs)
+
+    def batch(self, calls: Sequence[Sequence], chunk_size: Optional[int] = None) -> List[BatchResult]:
+        """
+        Send a batch to one node: a reader if every call is a read, otherwise the primary.
+        """
+        read = bool(calls) and all(call[0] in READ_METHODS for call in calls)
+        if read and not any(call[0] in PRIMARY_READ_METHODS for call in calls):
+            endpoint = self._route(calls[0][0])
+        else:
+            endpoint = self.primary
+
+        def send(transport: RPCTransport) -> List[BatchResult]:
+            results = transport.batch(calls, chunk_size)
+            if transport is self.primary.transport:
+                return results
+            missing = [i for i, r in enumerate(results)
+                       if r.error is not None and _error_code(r.error) in _NOT_FOUND_CODES]
+            if missing:
+                again = self._send(self.primary, lambda t: t.batch([calls[i] for i in missing], chunk_size))
+                for i, result in zip(missing, again):
+                    results[i] = result
+            return results
+
+        return self._with_failover(endpoint, read, send)
+
+    # ------------------------- Health -------------------------
+
+    def check_health(self) -> List[Endpoint]:
+        """
+        Query every node's height now and update which ones serve reads.
+
+        :return: The endpoints, with fresh ``height`` / ``healthy`` values.
+        """
+        for endpoint in self.endpoints:
+            try:
+                endpoint.height = endpoint.transport.call('getblockcount')
+                endpoint.error = None
+            except Exception as e:
+                endpoint.height = None
+                endpoint.error = str(e)
+            endpoint.checked_at = time.monotonic()
+
+        heights = [e.height for e in self.endpoints if e.height is not None]
+        tip = max(heights) if heights else None
+        for endpoint in self.endpoints:
+            healthy = endpoint.height is not None and tip - endpoint.height <= self.max_lag
+            if healthy != endpoint.healthy:
+                if healthy:
+                    logger.info(f"Node {endpoint.name} is back in rotation at height {endpoint.height}.")
+                elif endpoint.height is None:
+                    logger.warning(f"Node {endpoint.name} failed its health check: {endpoint.error}")
+                else:
+                    logger.warning(f"Node {endpoint.name} is {tip - endpoint.height} blocks behind; "
+                                   f"taking it out of rotation.")
+            endpoint.healthy = healthy
+        return self.endpoints
+
+    def _mark_down(self, endpoint: Endpoint, error: BaseException) -> None:
+        if endpoint.healthy:
+            logger.warning(f"Node {endpoint.name} failed a request ({error}); taking it out of rotation.")
+        endpoint.healthy = False
+        endpoint.error = str(error)
+
+    def status(self) -> List[Dict]:
+        """
+        Current view of every node: name, height, healthy, outstanding requests and last error.
+        """
+        return [{'name': e.name, 'primary': e is self.primary, 'height': e.height, 'healthy': e.healthy,
+                 'outstanding': e.outstanding, 'error': e.error} for e in self.endpoints]
+
+    def _start_health_checks(self) -> None:
+        if not self.background or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pepecoin-health-check", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.error(f"Error during node health check: {e}")
+            if self._stop.wait(self.health_interval):
+                return
+
+    # ------------------------- Transport Interface -------------------------
+
+    @property
+    def primary_transport(self) -> RPCTransport:
+        return self.primary.transport
+
+    def add_observer(self, observer: RPCObserver) -> None:
+        for endpoint in self.endpoints:
+            endpoint.transport.add_observer(observer)
+
+    def remove_observer(self, observer: RPCObserver) -> None:
+        for endpoint in self.endpoints:
+            endpoint.transport.remove_observer(observer)
+
+    def close(self) -> None:
+        """
+        Stop health checks and close every node's pooled connections.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stop.clear()
+        for endpoint in self.endpoints:
+            endpoint.transport.close()
+
+
+def _error_code(error: BaseException) -> Optional[int]:
+    return error.error.get('code') if isinstance(getattr(error, 'error', None), dict) else None
+
+
+def _is_unavailable(error: BaseException) -> bool:
+    if isinstance(error, OSError):
+        return True
+    return _error_code(error) in _UNAVAILABLE_CODES
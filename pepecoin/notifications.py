@@ -0,0 +1,302 @@
+# pepecoin/notifications.py
+
+import logging
+import struct
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+try:
+    import zmq
+except ImportError:  # optional: pip install pepecoin[zmq]
+    zmq = None
+
+logger = logging.getLogger(__name__)
+
+HASHBLOCK = 'hashblock'
+HASHTX = 'hashtx'
+RAWBLOCK = 'rawblock'
+RAWTX = 'rawtx'
+DEFAULT_TOPICS = (HASHBLOCK, HASHTX)
+BLOCK_TOPICS = (HASHBLOCK, RAWBLOCK)
+
+DEFAULT_RECENT_TXIDS = 50_000
+_RECEIVE_TIMEOUT_MS = 500
+
+_unpack_sequence = struct.Struct('<I').unpack
+
+
+class Notification(NamedTuple):
+    """
+    One message from pepecoind's ZMQ interface (``-zmqpub<topic>=<endpoint>``).
+
+    ``body`` is the 32-byte hash for ``hash*`` topics and the serialized block or
+    transaction for ``raw*`` topics. Notifications recovered through RPC after a
+    sequence gap have ``caught_up`` set and no ``sequence``.
+    """
+    topic: str
+    body: bytes
+    sequence: Optional[int] = None
+    caught_up: bool = False
+
+    @property
+    def hash(self) -> str:
+        """
+        Block hash or txid, in RPC (hex) form.
+        """
+        if self.topic == RAWTX:
+            from .serialization import decode_transaction
+            return decode_transaction(self.body).txid
+        if self.topic == RAWBLOCK:
+            from .serialization import decode_block
+            return decode_block(self.body).hash
+        return self.body.hex()  # pepecoind publishes hashes already byte-reversed
+
+    @property
+    def is_block(self) -> bool:
+        return self.topic in BLOCK_TOPICS
+
+
+class NotificationSubscriber:
+    """
+    Push-based block and transaction notifications from pepecoind over ZMQ.
+
+    Subscribes to ``hashblock``, ``hashtx``, ``rawblock`` and/or ``rawtx`` and
+    hands every message to ``on_notification``, ``event_queue``, iteration or
+    ``async for``. pepecoind numbers the messages of each topic; when a number
+    is skipped (the subscriber was slow, or reconnected) the gap is logged and,
+    given an ``rpc_connection``, filled in before the message that revealed it:
+    missed blocks from the chain, missed transactions from the mempool.
+    Transactions that were missed and are already confirmed are not replayed;
+    they arrive with their block.
+
+    Needs ``pyzmq`` (``pip install pepecoin[zmq]``) and pepecoind started with
+    e.g. ``-zmqpubhashblock=tcp://127.0.0.1:28332 -zmqpubhashtx=tcp://127.0.0.1:28332``.
+    """
+
+    def __init__(
+        self,
+        endpoint: Union[str, Dict[str, str]],
+        rpc_connection=None,
+        topics: Sequence[str] = DEFAULT_TOPICS,
+        on_notification: Optional[Callable[[Notification], None]] = None,
+        event_queue=None,
+        recent_txids: int = DEFAULT_RECENT_TXIDS,
+        context=None,
+    ):
+        """
+        :param endpoint: ZMQ endpoint publishing all ``topics``, or a ``{topic: endpoint}`` mapping.
+        :param rpc_connection: RPC transport used to catch up after a sequence gap; None only logs gaps.
+        :param topics: Topics to subscribe to.
+        :param on_notification: Callback invoked with each ``Notification``.
+        :param event_queue: Queue each ``Notification`` is put on.
+        :param recent_txids: How many recently delivered txids to remember, so catch-up does not repeat them.
+        :param context: ``zmq.Context`` to use; defaults to the shared instance.
+        """
+        if isinstance(endpoint, str):
+            self.endpoints = {topic: endpoint for topic in topics}
+        else:
+            self.endpoints = {topic: endpoint[topic] for topic in topics}
+        self.rpc_connection = rpc_connection
+        self.topics = tuple(topics)
+        self.on_notification = on_notification
+        self.event_queue = event_queue
+        self.context = context
+        self.missed: Dict[str, int] = {topic: 0 for topic in self.topics}
+        self._sequences: Dict[str, int] = {}
+        self._last_block: Optional[str] = None
+        self._recent = deque(maxlen=recent_txids)
+        self._recent_set = set()
+        self._listeners: List[Callable[[Notification], None]] = []
+        self._socket = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------- Socket -------------------------
+
+    def connect(self) -> 'NotificationSubscriber':
+        """
+        Open the SUB socket. Called automatically on first receive.
+        """
+        if self._socket is not None:
+            return self
+        if zmq is None:
+            raise ImportError("NotificationSubscriber requires the 'pyzmq' package (pip install pepecoin[zmq])")
+        context = self.context or zmq.Context.instance()
+        socket = context.socket(zmq.SUB)
+        for endpoint in sorted(set(self.endpoints.values())):
+            socket.connect(endpoint)
+        for topic in self.topics:
+            socket.setsockopt(zmq.SUBSCRIBE, topic.encode())
+        self._socket = socket
+        logger.info(f"Subscribed to {', '.join(self.topics)} notifications.")
+        return self
+
+    def close(self) -> None:
+        self.stop()
+        if self._socket is not None:
+            self._socket.close(linger=0)
+            self._socket = None
+
+    def receive(self, timeout: Optional[float] = None) -> List[Notification]:
+        """
+        Wait for the next message and return it, preceded by anything recovered for a gap it revealed.
+
+        :param timeout: Seconds to wait; None waits indefinitely.
+        :return: The notifications, or an empty list on timeout.
+        """
+        self.connect()
+        if timeout is not None and not self._socket.poll(int(timeout * 1000)):
+            return []
+        return self._process(self._socket.recv_multipart())
+
+    # ------------------------- Processing -------------------------
+
+    def _process(self, frames: List[bytes]) -> List[Notification]:
+        topic = frames[0].decode()
+        sequence = _unpack_sequence(frames[2])[0] if len(frames) > 2 and len(frames[2]) == 4 else None
+        notification = Notification(topic, bytes(frames[1]), sequence)
+
+        notifications: List[Notification] = []
+        if sequence is not None:
+            previous = self._sequences.get(topic)
+            self._sequences[topic] = sequence
+            if previous is not None and sequence != (previous + 1) & 0xffffffff:
+                missed = (sequence - previous - 1) & 0xffffffff
+                self.missed[topic] = self.missed.get(topic, 0) + missed
+                logger.warning(f"Missed {missed} '{topic}' notifications (sequence {previous} -> {sequence}).")
+                notifications.extend(self._catch_up(notification))
+
+        notifications.append(notification)
+        self._remember(notifications)
+        for n in notifications:
+            self._emit(n)
+        return notifications
+
+    def _remember(self, notifications: List[Notification]) -> None:
+        for notification in notifications:
+            if notification.is_block:
+                self._last_block = notification.hash
+                continue
+            txid = notification.hash
+            if txid in self._recent_set:
+                continue
+            if len(self._recent) == self._recent.maxlen:
+                self._recent_set.discard(self._recent[0])
+            self._recent.append(txid)
+            self._recent_set.add(txid)
+
+    def _catch_up(self, notification: Notification) -> List[Notification]:
+        if self.rpc_connection is None:
+            return []
+        try:
+            if notification.is_block:
+                return self._missed_blocks(notification)
+            return self._missed_transactions(notification)
+        except Exception as e:
+            logger.error(f"Error catching up on missed '{notification.topic}' notifications: {e}")
+            return []
+
+    def _missed_blocks(self, notification: Notification) -> List[Notification]:
+        if self._last_block is None:
+            return []
+        rpc = self.rpc_connection
+        new_height = rpc.getblockheader(notification.hash)['height']
+        # Walk back from the last delivered block until it is on the active chain (a reorg happened if not).
+        header = rpc.getblockheader(self._last_block)
+        while header.get('confirmations', 0) < 0 and 'previousblockhash' in header:
+            header = rpc.getblockheader(header['previousblockhash'])
+        heights = range(header['height'] + 1, new_height)
+        if not heights:
+            return []
+        hashes = [r.unwrap() for r in rpc.batch([('getblockhash', h) for h in heights])]
+        if notification.topic == RAWBLOCK:
+            bodies = [bytes.fromhex(r.unwrap()) for r in rpc.batch([('getblock', h, False) for h in hashes])]
+        else:
+            bodies = [bytes.fromhex(h) for h in hashes]
+        logger.info(f"Recovered {len(bodies)} missed blocks through RPC.")
+        return [Notification(notification.topic, body, None, True) for body in bodies]
+
+    def _missed_transactions(self, notification: Notification) -> List[Notification]:
+        rpc = self.rpc_connection
+        current = notification.hash
+        txids = [txid for txid in rpc.getrawmempool() if txid not in self._recent_set and txid != current]
+        if not txids:
+            return []
+        if notification.topic == RAWTX:
+            results = rpc.batch([('getrawtransaction', txid, False) for txid in txids])
+            bodies = [bytes.fromhex(r.result) for r in results if r.ok]  # some may have confirmed meanwhile
+        else:
+            bodies = [bytes.fromhex(txid) for txid in txids]
+        logger.info(f"Recovered {len(bodies)} missed mempool transactions through RPC.")
+        return [Notification(notification.topic, body, None, True) for body in bodies]
+
+    def _emit(self, notification: Notification) -> None:
+        if self.event_queue is not None:
+            self.event_queue.put(notification)
+        # Copied: async iterators add and remove themselves from other threads.
+        for listener in list(self._listeners):
+            try:
+                listener(notification)
+            except Exception as e:
+                logger.error(f"Notification listener failed for '{notification.topic}': {e}")
+        if self.on_notification is not None:
+            try:
+                self.on_notification(notification)
+            except Exception as e:
+                logger.error(f"Notification callback failed for '{notification.topic}': {e}")
+
+    # ------------------------- Consumption -------------------------
+
+    def __iter__(self) -> Iterator[Notification]:
+        """
+        Receive on the calling thread and yield notifications until ``stop()`` is called.
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            yield from self.receive(_RECEIVE_TIMEOUT_MS / 1000)
+
+    async def __aiter__(self):
+        """
+        ``async for`` over notifications; receiving happens on the background thread (see ``start()``).
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        received: asyncio.Queue = asyncio.Queue()
+
+        def listener(notification: Notification) -> None:
+            loop.call_soon_threadsafe(received.put_nowait, notification)
+
+        self._listeners.append(listener)
+        self.start()
+        try:
+            while True:
+                yield await received.get()
+        finally:
+            self._listeners.remove(listener)
+
+    def start(self) -> None:
+        """
+        Receive in a daemon thread and deliver to ``on_notification``, ``event_queue`` and async iterators.
+        """
+        if self._thread is not None:
+            return
+        self.connect()
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.receive(_RECEIVE_TIMEOUT_MS / 1000)
+                except Exception as e:
+                    logger.error(f"Error receiving notifications: {e}")
+
+        self._thread = threading.Thread(target=run, name="pepecoin-notifications", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
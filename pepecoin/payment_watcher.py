@@ -0,0 +1,277 @@
+# pepecoin/payment_watcher.py
+
+import json
+import logging
+import os
+import queue
+import threading
+from decimal import Decimal
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from bitcoinrpc.authproxy import JSONRPCException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 10.0
+
+PENDING = 'pending'
+UNDERPAID = 'underpaid'
+PAID = 'paid'
+CONFIRMED = 'confirmed'
+
+
+class Invoice:
+    """
+    An expected payment to a single address and what has been seen for it so far.
+    """
+
+    __slots__ = ('invoice_id', 'address', 'expected_amount', 'min_confirmations', 'status', 'payments')
+
+    def __init__(self, invoice_id: str, address: str, expected_amount: Decimal, min_confirmations: int = 1):
+        self.invoice_id = invoice_id
+        self.address = address
+        self.expected_amount = Decimal(str(expected_amount))
+        self.min_confirmations = min_confirmations
+        self.status = PENDING
+        self.payments: Dict[str, list] = {}  # "txid:vout" -> [amount, confirmations]
+
+    @property
+    def received(self) -> Decimal:
+        return sum((amount for amount, confirmations in self.payments.values() if confirmations >= 0), Decimal(0))
+
+    @property
+    def confirmed_amount(self) -> Decimal:
+        return sum((amount for amount, confirmations in self.payments.values()
+                    if confirmations >= self.min_confirmations), Decimal(0))
+
+    def to_dict(self) -> Dict:
+        return {
+            'address': self.address,
+            'expected_amount': str(self.expected_amount),
+            'min_confirmations': self.min_confirmations,
+            'status': self.status,
+            'payments': {key: [str(amount), confs] for key, (amount, confs) in self.payments.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, invoice_id: str, data: Dict) -> 'Invoice':
+        invoice = cls(invoice_id, data['address'], Decimal(data['expected_amount']), data['min_confirmations'])
+        invoice.status = data['status']
+        invoice.payments = {key: [Decimal(amount), confs] for key, (amount, confs) in data['payments'].items()}
+        return invoice
+
+    def __repr__(self):
+        return f"<Invoice {self.invoice_id} {self.address} {self.status} {self.received}/{self.expected_amount}>"
+
+
+class PaymentEvent(NamedTuple):
+    """
+    Emitted when an invoice changes status: ``kind`` is one of
+    ``'underpaid'``, ``'paid'`` or ``'confirmed'``.
+    """
+    kind: str
+    invoice: Invoice
+    txid: str
+
+
+class PaymentWatcher:
+    """
+    Watches many open invoices with a single ``listsinceblock`` cursor.
+
+    Each poll asks the node only for wallet activity since the cursor, matches
+    incoming outputs against an in-memory address index and updates confirmation
+    counts. The cursor trails the tip by the largest ``min_confirmations`` of the
+    open invoices, so transactions that still need confirmations are reported
+    again on the next poll and everything else is never rescanned. Poll cost
+    therefore depends on new wallet activity, not on the number of open invoices.
+
+    Events are delivered to ``on_event`` and/or put on ``event_queue``. If
+    ``state_path`` is given, the cursor and open invoices are saved there
+    whenever a poll changes them and restored on start-up.
+    """
+
+    def __init__(
+        self,
+        rpc_connection,
+        state_path: Optional[str] = None,
+        on_event: Optional[Callable[[PaymentEvent], None]] = None,
+        event_queue: Optional[queue.Queue] = None,
+        default_min_confirmations: int = 1,
+    ):
+        """
+        :param rpc_connection: RPC transport used for ``listsinceblock``.
+        :param state_path: JSON file the cursor and open invoices are persisted to.
+        :param on_event: Callback invoked with each ``PaymentEvent``.
+        :param event_queue: Queue each ``PaymentEvent`` is put on.
+        :param default_min_confirmations: Confirmations required when an invoice does not say.
+        """
+        self.rpc_connection = rpc_connection
+        self.state_path = state_path
+        self.on_event = on_event
+        self.event_queue = event_queue
+        self.default_min_confirmations = default_min_confirmations
+        self.cursor = ''
+        self.invoices: Dict[str, Invoice] = {}
+        self._by_address: Dict[str, Invoice] = {}
+        # How far the cursor trails the tip: the deepest requirement of the open invoices.
+        self._target_confirmations = 1
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._load()
+
+    # ------------------------- Invoices -------------------------
+
+    def add_invoice(self, invoice_id: str, address: str, expected_amount,
+                    min_confirmations: Optional[int] = None) -> Invoice:
+        """
+        Start watching ``address`` for ``expected_amount``. Re-adding a restored invoice keeps its progress.
+        """
+        with self._lock:
+            invoice = self.invoices.get(invoice_id)
+            if invoice is None or invoice.address != address:
+                if min_confirmations is None:
+                    min_confirmations = self.default_min_confirmations
+                invoice = Invoice(invoice_id, address, expected_amount, min_confirmations)
+                self.invoices[invoice_id] = invoice
+                self._by_address[address] = invoice
+            self._update_target()
+            logger.debug(f"Watching address '{address}' for invoice '{invoice_id}'.")
+            return invoice
+
+    def remove_invoice(self, invoice_id: str) -> None:
+        with self._lock:
+            invoice = self.invoices.pop(invoice_id, None)
+            if invoice is not None:
+                self._by_address.pop(invoice.address, None)
+                self._update_target()
+
+    def _update_target(self) -> None:
+        self._target_confirmations = max([1] + [i.min_confirmations for i in self.invoices.values()])
+
+    # ------------------------- Polling -------------------------
+
+    def poll(self) -> List[PaymentEvent]:
+        """
+        Fetch wallet activity since the cursor and return the resulting events.
+
+        :raises JSONRPCException: If ``listsinceblock`` fails; the cursor is left unchanged.
+        """
+        with self._lock:
+            try:
+                result = self.rpc_connection.listsinceblock(self.cursor, self._target_confirmations, True)
+            except JSONRPCException as e:
+                logger.error(f"Failed to poll payments since block '{self.cursor}': {e}")
+                raise e
+
+            touched: Dict[str, tuple] = {}
+            for tx in result.get('transactions', []):
+                if tx.get('category') != 'receive':
+                    continue
+                invoice = self._by_address.get(tx.get('address'))
+                if invoice is None:
+                    continue
+                key = f"{tx['txid']}:{tx.get('vout', 0)}"
+                invoice.payments[key] = [Decimal(str(tx['amount'])), tx.get('confirmations', 0)]
+                touched[invoice.invoice_id] = (invoice, tx['txid'])
+
+            events = []
+            for invoice, txid in touched.values():
+                event = self._advance(invoice, txid)
+                if event is not None:
+                    events.append(event)
+
+            lastblock = result.get('lastblock', self.cursor)
+            if touched or lastblock != self.cursor:
+                self.cursor = lastblock
+                self._save()
+
+        if events:
+            logger.info(f"Payment poll produced {len(events)} invoice events.")
+        for event in events:
+            self._emit(event)
+        return events
+
+    def _advance(self, invoice: Invoice, txid: str) -> Optional[PaymentEvent]:
+        if invoice.confirmed_amount >= invoice.expected_amount:
+            status = CONFIRMED
+        elif invoice.received >= invoice.expected_amount:
+            status = PAID
+        elif invoice.received > 0:
+            status = UNDERPAID
+        else:
+            status = PENDING
+        if status == invoice.status:
+            return None
+        invoice.status = status
+        if status == CONFIRMED:
+            # Fully settled: stop matching it.
+            del self.invoices[invoice.invoice_id]
+            self._by_address.pop(invoice.address, None)
+            self._update_target()
+        if status == PENDING:
+            return None
+        return PaymentEvent(status, invoice, txid)
+
+    def _emit(self, event: PaymentEvent) -> None:
+        if self.event_queue is not None:
+            self.event_queue.put(event)
+        if self.on_event is not None:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                logger.error(f"Payment event callback failed for invoice '{event.invoice.invoice_id}': {e}")
+
+    # ------------------------- Background Polling -------------------------
+
+    def start(self, interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        """
+        Poll every ``interval`` seconds in a daemon thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f"Error during payment polling: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name="pepecoin-payment-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # ------------------------- Persistence -------------------------
+
+    def _load(self) -> None:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path) as f:
+            state = json.load(f)
+        self.cursor = state.get('cursor', '')
+        for invoice_id, data in state.get('invoices', {}).items():
+            invoice = Invoice.from_dict(invoice_id, data)
+            self.invoices[invoice_id] = invoice
+            self._by_address[invoice.address] = invoice
+        self._update_target()
+        logger.info(f"Restored payment watcher at block '{self.cursor}' with {len(self.invoices)} open invoices.")
+
+    def _save(self) -> None:
+        if not self.state_path:
+            return
+        state = {
+            'cursor': self.cursor,
+            'invoices': {invoice_id: invoice.to_dict() for invoice_id, invoice in self.invoices.items()},
+        }
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,332 @@
+# pepecoin/payouts.py
+
+import logging
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from bitcoinrpc.authproxy import JSONRPCException
+
+from .consolidation import MAX_STANDARD_TX_BYTES, OUTPUT_BYTES, estimate_size
+from .resilience import DEADLINE_EXCEEDED_CODE
+
+logger = logging.getLogger(__name__)
+
+# Inputs reserved in each transaction's size budget. The node does coin selection, so the
+# real count is unknown when planning; a transaction it still rejects as too large is split.
+DEFAULT_INPUT_BUDGET = 100
+
+# Errors raised by the client rather than reported by the node (non-JSON reply, unexpected
+# response, deadline passed): the node may still have executed the request.
+_OUTCOME_UNKNOWN_CODES = (-342, -343, DEADLINE_EXCEEDED_CODE)
+
+
+def outcome_unknown(error: BaseException) -> bool:
+    """
+    True if ``error`` does not tell whether the node executed the request (transport failure or timeout).
+    """
+    if isinstance(error, OSError):
+        return True
+    info = getattr(error, 'error', None)
+    return isinstance(info, dict) and info.get('code') in _OUTCOME_UNKNOWN_CODES
+
+
+class Payment(NamedTuple):
+    """
+    A single requested payment from a wallet account to an address.
+    """
+    from_account: str
+    to_address: str
+    amount: Decimal
+
+
+class PaymentResult:
+    """
+    Where a requested payment ended up: the transaction and output index that pay it,
+    or the error that prevented it.
+
+    ``unknown`` is set when the ``sendmany`` carrying the payment failed in transport
+    (connection lost, timeout, deadline): the node may have sent it, so check the
+    wallet (e.g. ``listtransactions``) before paying it again.
+    """
+
+    __slots__ = ('payment', 'txid', 'vout', 'error', 'unknown')
+
+    def __init__(self, payment: Payment, txid: Optional[str] = None, vout: Optional[int] = None,
+                 error: Optional[Exception] = None, unknown: bool = False):
+        self.payment = payment
+        self.txid = txid
+        self.vout = vout
+        self.error = error
+        self.unknown = unknown
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.txid is not None
+
+    def __repr__(self):
+        if self.ok:
+            return f"<PaymentResult {self.payment.to_address} {self.payment.amount} -> {self.txid}:{self.vout}>"
+        state = 'outcome unknown' if self.unknown else 'error'
+        return f"<PaymentResult {self.payment.to_address} {self.payment.amount} {state}={self.error}>"
+
+
+class Move(NamedTuple):
+    """
+    An off-chain ``move`` between wallet accounts made by a payout run, and its error if it failed
+    (``outcome_unknown(error)`` tells whether the node may have made it anyway).
+    """
+    from_account: str
+    to_account: str
+    amount: Decimal
+    error: Optional[Exception] = None
+
+
+class PayoutReport:
+    """
+    Outcome of a payout run, with one ``PaymentResult`` per requested payment, in request order.
+
+    ``moves`` lists the account moves made with ``merge_sources_into``, including the
+    moves returning the amounts of failed payments to their source accounts. Payments
+    whose outcome is ``unknown`` are neither ``failed`` nor returned.
+    """
+
+    def __init__(self, results: List[PaymentResult], moves: Optional[List[Move]] = None):
+        self.results = results
+        self.moves = moves or []
+
+    @property
+    def txids(self) -> List[str]:
+        """
+        Distinct transaction ids created, in creation order.
+        """
+        return list(OrderedDict.fromkeys(r.txid for r in self.results if r.txid))
+
+    @property
+    def failed(self) -> List[PaymentResult]:
+        """
+        Payments the node definitely did not send.
+        """
+        return [r for r in self.results if not r.ok and not r.unknown]
+
+    @property
+    def unknown(self) -> List[PaymentResult]:
+        """
+        Payments that may or may not have been sent; see ``PaymentResult.unknown``.
+        """
+        return [r for r in self.results if r.unknown]
+
+    def __repr__(self):
+        return (f"<PayoutReport {len(self.results)} payments in {len(self.txids)} transactions, "
+                f"{len(self.failed)} failed, {len(self.unknown)} unknown>")
+
+
+class _PlannedTx:
+    __slots__ = ('from_account', 'outputs', 'indices')
+
+    def __init__(self, from_account: str):
+        self.from_account = from_account
+        self.outputs: Dict[str, Decimal] = {}
+        self.indices: List[int] = []
+
+    def add(self, index: int, payment: Payment) -> None:
+        self.outputs[payment.to_address] = self.outputs.get(payment.to_address, Decimal(0)) + payment.amount
+        self.indices.append(index)
+
+    def split(self, payments: List[Payment]) -> List['_PlannedTx']:
+        """
+        Two transactions with half of the outputs each.
+        """
+        first_half = set(list(self.outputs)[:len(self.outputs) // 2])
+        halves = [_PlannedTx(self.from_account), _PlannedTx(self.from_account)]
+        for i in self.indices:
+            halves[payments[i].to_address not in first_half].add(i, payments[i])
+        return halves
+
+
+class PayoutEngine:
+    """
+    Pays many recipients with as few ``sendmany`` transactions as possible.
+
+    Payments are grouped by source account, payments to the same address are
+    merged into one output, and transactions are filled with outputs until their
+    estimated size, with ``input_budget`` inputs and a change output, reaches
+    ``max_tx_bytes`` (the node's standard size limit by default; the fee grows
+    with the size). A transaction the node still rejects as too large, because
+    it selected more inputs, is split in two and sent again.
+
+    With ``merge_sources_into`` the source balances are first moved (off-chain,
+    no fee, in one batch request) into one account, so payments from many
+    accounts share transactions. The amounts of payments that then fail are
+    moved back to their source accounts; every move is listed in
+    ``PayoutReport.moves``.
+    """
+
+    def __init__(
+        self,
+        rpc_connection,
+        max_tx_bytes: int = MAX_STANDARD_TX_BYTES,
+        input_budget: int = DEFAULT_INPUT_BUDGET,
+        minconf: int = 1,
+        comment: Optional[str] = None,
+        max_outputs_per_tx: Optional[int] = None,
+    ):
+        """
+        :param rpc_connection: RPC transport.
+        :param max_tx_bytes: Estimated size limit of each transaction.
+        :param input_budget: Inputs assumed per transaction when estimating its size.
+        :param minconf: Only use funds with at least this many confirmations.
+        :param comment: Optional wallet comment stored with each transaction.
+        :param max_outputs_per_tx: Lower the number of outputs per transaction below what the size allows.
+        """
+        fits = (max_tx_bytes - estimate_size(input_budget, 1)) // OUTPUT_BYTES  # one output is change
+        if fits < 1:
+            raise ValueError("max_tx_bytes is too small for one payment with input_budget inputs")
+        self.rpc_connection = rpc_connection
+        self.max_outputs_per_tx = min(fits, max_outputs_per_tx) if max_outputs_per_tx else fits
+        self.minconf = minconf
+        self.comment = comment
+
+    def pay(self, payments: Iterable[Payment], merge_sources_into: Optional[str] = None) -> PayoutReport:
+        """
+        Send all payments and report which transaction output pays each of them.
+
+        :param payments: Payments to make.
+        :param merge_sources_into: Account to move all source balances into before sending.
+        :return: A ``PayoutReport``. Failures are reported per payment rather than raised.
+        """
+        payments = [Payment(p.from_account, p.to_address, Decimal(str(p.amount))) for p in payments]
+        results = [PaymentResult(p) for p in payments]
+
+        sources = [p.from_account for p in payments]
+        moves: List[Move] = []
+        if merge_sources_into is not None:
+            sources, moves = self._merge_sources(payments, results, merge_sources_into)
+
+        for planned in self._plan(payments, sources, results):
+            self._send(planned, payments, results)
+
+        if moves:
+            moves.extend(self._return_failed(payments, sources, results, merge_sources_into))
+        self._resolve_vouts(results)
+        report = PayoutReport(results, moves)
+        logger.info(f"Payout finished: {report}.")
+        return report
+
+    def _send(self, planned: _PlannedTx, payments: List[Payment], results: List[PaymentResult]) -> None:
+        try:
+            txid = self.rpc_connection.sendmany(planned.from_account, planned.outputs, self.minconf, self.comment)
+        except (OSError, JSONRPCException) as e:
+            if outcome_unknown(e):
+                logger.error(f"Outcome of sending {len(planned.outputs)} outputs from '{planned.from_account}' "
+                             f"is unknown; check the wallet before retrying: {e}")
+                for i in planned.indices:
+                    results[i].error = e
+                    results[i].unknown = True
+                return
+            if len(planned.outputs) > 1 and 'too large' in str(e).lower():
+                logger.warning(f"Transaction with {len(planned.outputs)} outputs from '{planned.from_account}' "
+                               f"is too large; splitting it in two.")
+                for half in planned.split(payments):
+                    self._send(half, payments, results)
+                return
+            logger.error(f"Failed to send {len(planned.outputs)} outputs from '{planned.from_account}': {e}")
+            for i in planned.indices:
+                results[i].error = e
+            return
+        logger.info(f"Sent {len(planned.indices)} payments in {len(planned.outputs)} outputs "
+                    f"from '{planned.from_account}'. TXID: {txid}")
+        for i in planned.indices:
+            results[i].txid = txid
+
+    def _merge_sources(self, payments: List[Payment], results: List[PaymentResult],
+                       target: str) -> Tuple[List[str], List[Move]]:
+        totals: Dict[str, Decimal] = OrderedDict()
+        for payment in payments:
+            if payment.from_account != target:
+                totals[payment.from_account] = totals.get(payment.from_account, Decimal(0)) + payment.amount
+
+        moves = self._move([(account, target, amount) for account, amount in totals.items()])
+        failed = set()
+        for move in moves:
+            if move.error is None:
+                logger.info(f"Moved {move.amount} $PEP from '{move.from_account}' to '{target}' for batched payout.")
+                continue
+            logger.error(f"Failed to move funds from '{move.from_account}' to '{target}': {move.error}")
+            failed.add(move.from_account)
+            for result in results:
+                if result.payment.from_account == move.from_account:
+                    result.error = move.error
+        sources = [target if p.from_account not in failed else p.from_account for p in payments]
+        return sources, moves
+
+    def _return_failed(self, payments: List[Payment], sources: List[str], results: List[PaymentResult],
+                       target: str) -> List[Move]:
+        """
+        Move the amounts of payments that were merged into ``target`` but not sent back to their source accounts.
+        """
+        unsent: Dict[str, Decimal] = OrderedDict()
+        for payment, source, result in zip(payments, sources, results):
+            if payment.from_account != target and source == target and result.txid is None and not result.unknown:
+                unsent[payment.from_account] = unsent.get(payment.from_account, Decimal(0)) + payment.amount
+        if not unsent:
+            return []
+        moves = self._move([(target, account, amount) for account, amount in unsent.items()])
+        for move in moves:
+            if move.error is None:
+                logger.info(f"Returned {move.amount} $PEP of failed payments from '{target}' to '{move.to_account}'.")
+            else:
+                logger.error(f"Failed to return {move.amount} $PEP of failed payments from '{target}' "
+                             f"to '{move.to_account}': {move.error}")
+        return moves
+
+    def _move(self, transfers: List[Tuple[str, str, Decimal]]) -> List[Move]:
+        if not transfers:
+            return []
+        comment = self.comment or ""
+        calls = [("move", source, target, amount, self.minconf, comment) for source, target, amount in transfers]
+        try:
+            replies = self.rpc_connection.batch(calls)
+        except (OSError, JSONRPCException) as e:
+            return [Move(source, target, amount, e) for source, target, amount in transfers]
+        moves = []
+        for (source, target, amount), reply in zip(transfers, replies):
+            error = reply.error
+            if error is None and not reply.result:
+                error = JSONRPCException({'code': -4, 'message': 'move returned False'})
+            moves.append(Move(source, target, amount, error))
+        return moves
+
+    def _plan(self, payments: List[Payment], sources: List[str], results: List[PaymentResult]) -> List[_PlannedTx]:
+        open_txs: Dict[str, _PlannedTx] = {}
+        planned: List[_PlannedTx] = []
+        for i, (payment, source) in enumerate(zip(payments, sources)):
+            if results[i].error is not None:
+                continue
+            tx = open_txs.get(source)
+            if tx is None or (payment.to_address not in tx.outputs and len(tx.outputs) >= self.max_outputs_per_tx):
+                tx = open_txs[source] = _PlannedTx(source)
+                planned.append(tx)
+            tx.add(i, payment)
+        return planned
+
+    def _resolve_vouts(self, results: List[PaymentResult]) -> None:
+        txids = list(OrderedDict.fromkeys(r.txid for r in results if r.txid))
+        if not txids:
+            return
+        try:
+            transactions = self.rpc_connection.batch([("gettransaction", txid) for txid in txids])
+        except (OSError, JSONRPCException) as e:
+            logger.warning(f"Could not look up the outputs of {len(txids)} payout transactions: {e}")
+            return
+        vouts: Dict[tuple, int] = {}
+        for txid, tx in zip(txids, transactions):
+            if not tx.ok:
+                logger.warning(f"Could not look up outputs of transaction {txid}: {tx.error}")
+                continue
+            for detail in tx.result.get('details', []):
+                if detail.get('category') == 'send':
+                    vouts[(txid, detail.get('address'))] = detail.get('vout')
+        for result in results:
+            if result.txid:
+                result.vout = vouts.get((result.txid, result.payment.to_address))
@@ -1,19 +1,50 @@
 # pepecoin/pepecoin.py
 
-from indented_logger import setup_logging
 import logging
-setup_logging(level=logging.INFO, include_func=False, include_module=False)
 logger = logging.getLogger(__name__)
 
 
-from bitcoinrpc.authproxy import AuthServiceProxy, JSONRPCException
-from typing import Optional, Dict, List
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Install the package's default (indented) log format on the root logger.
+
+    ``Pepecoin`` calls this on construction when the application has not
+    configured logging itself; it is no longer done at import time.
+    """
+    from indented_logger import setup_logging
+
+    setup_logging(level=level, include_func=False, include_module=False)
+
+
+from bitcoinrpc.authproxy import JSONRPCException
+from typing import TYPE_CHECKING, Optional, Dict, List, Iterable, Iterator, Sequence, Tuple, Any
 import logging
 import threading
 import time
+from decimal import Decimal
 
 # Import the Account class
 from .account import Account
+from .transport import RPCTransport, RPCBatch, BatchResult, DEFAULT_POOL_SIZE, DEFAULT_IDLE_TIMEOUT, DEFAULT_TIMEOUT
+from .resilience import deadline
+from .sync_gate import SyncGate, DEFAULT_SYNC_CACHE_TTL
+from .instrumentation import RPCMetrics, RPCObserver
+
+# Optional features are imported where they are used, to keep `import pepecoin` fast.
+if TYPE_CHECKING:
+    from .address_pool import AddressPool
+    from .balances import BalanceSnapshot, BalanceTracker
+    from .cache import ObjectCache
+    from .consolidation import ConsolidationReport
+    from .fee_oracle import FeeOracle
+    from .history import HistoryCursor, WalletHistory
+    from .mempool import MempoolTracker
+    from .multinode import MultiNodeTransport
+    from .notifications import NotificationSubscriber
+    from .payment_watcher import PaymentWatcher
+    from .payouts import Payment, PayoutReport
+    from .resilience import HedgePolicy, RetryPolicy
+    from .serialization import Block, Tx
 
 
 
@@ -24,24 +55,109 @@ class Pepecoin:
         rpc_password: str,
         host: str = '127.0.0.1',
         port: int = 33873,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_connections: Optional[int] = None,
+        sync_cache_ttl: Optional[float] = DEFAULT_SYNC_CACHE_TTL,
+        cache: Optional['ObjectCache'] = None,
+        lazy: bool = False,
+        setup_logging: bool = True,
+        codec: Any = None,
+        read_endpoints: Optional[Sequence[Tuple[str, int]]] = None,
+        max_read_lag: Optional[int] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        retry: Optional['RetryPolicy'] = None,
+        hedge: Optional['HedgePolicy'] = None,
     ):
         """
         Initialize the Pepecoin node RPC connection.
+
+        The instance is safe to share between threads: every RPC call checks out
+        its own pooled connection.
+
+        :param pool_size: Maximum number of idle keep-alive connections kept open to the node.
+        :param idle_timeout: Seconds after which an idle pooled connection is closed.
+        :param max_connections: Maximum number of concurrent RPC requests. Set it to the
+                                node's ``-rpcthreads`` value to bound load on the node.
+        :param sync_cache_ttl: Seconds between background refreshes of the cached sync state that
+                               guards ``send_from`` and ``generate_new_address``. None checks the
+                               node on every write, like ``is_sync_needed()``.
+        :param cache: Optional ``ObjectCache`` consulted by ``get_block(s)`` and
+                      ``get_raw_transaction(s)`` before going to the node.
+        :param lazy: Do not contact the node until the first call. Use ``connect()`` to
+                     check the connection explicitly.
+        :param setup_logging: Install the default log format if the root logger has no handlers yet.
+        :param codec: Response decoder, see ``pepecoin.codec``. None uses orjson where that is
+                      installed and exact, the standard library otherwise.
+        :param read_endpoints: ``(host, port)`` of additional nodes (same RPC credentials) to spread
+                               chain reads over; ``host:port`` stays the primary for wallet and write
+                               calls. See ``pepecoin.multinode.MultiNodeTransport``.
+        :param max_read_lag: Blocks a read node may trail the best tip before it is taken out of rotation
+                             (``multinode.DEFAULT_MAX_LAG`` if None).
+        :param timeout: Socket timeout in seconds for each request. Use ``deadline()`` to bound a
+                        whole operation instead.
+        :param retry: ``pepecoin.resilience.RetryPolicy`` for idempotent reads (e.g. when the node
+                      answers ``-28`` while warming up). None sends every call once.
+        :param hedge: ``pepecoin.resilience.HedgePolicy``: duplicate reads that run past the recent p95
+                      latency on a second connection (or node) and take the first answer.
         """
+        if setup_logging and not logging.getLogger().handlers:
+            configure_logging()
         self.rpc_user = rpc_user
         self.rpc_password = rpc_password
         self.host = host
         self.port = port
-        self.rpc_connection = self.init_rpc()
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.cache = cache
+        self.codec = codec
+        self.read_endpoints = list(read_endpoints or [])
+        self.max_read_lag = max_read_lag
+        self.timeout = timeout
+        self.retry = retry
+        self.hedge = hedge
+        self.address_pools: Dict[str, 'AddressPool'] = {}
+        self.fee_oracle: Optional['FeeOracle'] = None
+        self.balance_tracker: Optional['BalanceTracker'] = None
+        self.rpc_connection = self._create_transport() if lazy else self.init_rpc()
+        # Writes go to the primary, so its own sync state is what guards them.
+        self.sync_gate = SyncGate(self.rpc_connection.primary_transport, ttl=sync_cache_ttl) if sync_cache_ttl else None
         logger.debug("Initialized Pepecoin node RPC connection.")
 
-    def init_rpc(self) -> AuthServiceProxy:
+    def _create_transport(self) -> RPCTransport:
+        transport = self._node_transport(self.host, self.port)
+        if self.read_endpoints:
+            from .multinode import DEFAULT_MAX_LAG, MultiNodeTransport
+
+            replicas = [self._node_transport(host, port) for host, port in self.read_endpoints]
+            max_lag = DEFAULT_MAX_LAG if self.max_read_lag is None else self.max_read_lag
+            transport = MultiNodeTransport(transport, replicas, max_lag=max_lag)
+        if self.retry is not None or self.hedge is not None:
+            from .resilience import ResilientTransport
+
+            transport = ResilientTransport(transport, retry=self.retry, hedge=self.hedge)
+        return transport
+
+    def _node_transport(self, host: str, port: int) -> RPCTransport:
+        return RPCTransport(
+            self.rpc_user,
+            self.rpc_password,
+            host,
+            port,
+            timeout=self.timeout,
+            pool_size=self.pool_size,
+            idle_timeout=self.idle_timeout,
+            max_connections=self.max_connections,
+            codec=self.codec,
+        )
+
+    def init_rpc(self) -> RPCTransport:
         """
         Initialize the RPC connection to the Pepecoin node.
         """
         try:
-            rpc_url = f"http://{self.rpc_user}:{self.rpc_password}@{self.host}:{self.port}"
-            connection = AuthServiceProxy(rpc_url)
+            connection = self._create_transport()
             # Test the connection
             connection.getblockchaininfo()
             logger.info("RPC connection to Pepecoin node established successfully.")
@@ -50,6 +166,83 @@ class Pepecoin:
             logger.error(f"Failed to connect to Pepecoin node: {e}")
             raise e
 
+    def connect(self) -> 'Pepecoin':
+        """
+        Check the connection to the node now (e.g. after ``lazy=True``) and fail fast if it is unreachable.
+
+        :return: This instance, so it can be chained: ``node = Pepecoin(..., lazy=True).connect()``.
+        :raises JSONRPCException: If the node rejects the call.
+        :raises OSError: If the node cannot be reached.
+        """
+        try:
+            self.rpc_connection.getblockchaininfo()
+            logger.info("RPC connection to Pepecoin node established successfully.")
+            return self
+        except JSONRPCException as e:
+            logger.error(f"Failed to connect to Pepecoin node: {e}")
+            raise e
+
+    @staticmethod
+    def deadline(seconds: float):
+        """
+        Bound every RPC made inside the ``with`` block to ``seconds`` in total, however many
+        calls (and retries) the methods used make::
+
+            with pepecoin.deadline(2.0):
+                info = pepecoin.get_blockchain_info()
+
+        Calls that would start after the deadline raise ``pepecoin.resilience.DeadlineExceeded``.
+        """
+        return deadline(seconds)
+
+    # ------------------------- Batch Calls -------------------------
+
+    def batch(self, calls: Sequence[Sequence], chunk_size: Optional[int] = None) -> List[BatchResult]:
+        """
+        Send many RPC calls as JSON-RPC array requests instead of one round trip each.
+
+        :param calls: Sequence of ``(method, *params)`` tuples, e.g. ``[("getblockhash", 1), ("getblockhash", 2)]``.
+        :param chunk_size: Maximum number of calls per HTTP request. Larger batches are split automatically.
+        :return: One ``BatchResult`` per call, in order. Failed calls carry their error instead of a result.
+        """
+        results = self.rpc_connection.batch(calls, chunk_size)
+        failed = sum(1 for r in results if not r.ok)
+        logger.info(f"Executed batch of {len(results)} RPC calls ({failed} failed).")
+        return results
+
+    def new_batch(self, chunk_size: Optional[int] = None) -> RPCBatch:
+        """
+        Return an ``RPCBatch`` that collects calls and sends them together, e.g.::
+
+            with pepecoin.new_batch() as batch:
+                batch.getblockhash(1)
+                batch.getblockhash(2)
+            hashes = [r.unwrap() for r in batch.results]
+        """
+        return RPCBatch(self.rpc_connection, chunk_size)
+
+    # ------------------------- Instrumentation -------------------------
+
+    def add_rpc_observer(self, observer: RPCObserver) -> None:
+        """
+        Report every RPC round trip made by this instance and its accounts to ``observer``.
+        """
+        self.rpc_connection.add_observer(observer)
+
+    def enable_metrics(self, serve_port: Optional[int] = None, serve_host: str = '127.0.0.1') -> RPCMetrics:
+        """
+        Record per-method latency histograms, byte sizes, error codes and in-flight gauges.
+
+        :param serve_port: If given, also serve the metrics in Prometheus text format on this port.
+        :param serve_host: Interface for the metrics endpoint.
+        :return: The ``RPCMetrics`` observer.
+        """
+        metrics = RPCMetrics()
+        self.add_rpc_observer(metrics)
+        if serve_port is not None:
+            metrics.serve(serve_port, serve_host)
+        return metrics
+
     # ------------------------- Node Management -------------------------
 
     def check_node_connection(self) -> bool:
@@ -93,6 +286,14 @@ class Pepecoin:
             return True  # Assume sync is needed if there's an error
 
 
+    def _sync_needed_for_write(self) -> bool:
+        """
+        Sync check used in front of writes. Answers from the cached sync gate when enabled.
+        """
+        if self.sync_gate is None:
+            return self.is_sync_needed()
+        return not self.sync_gate.is_synced()
+
     def is_sync_needed_old(self):
         """Check if the node is synchronized with the network using internal information."""
         try:
@@ -149,10 +350,26 @@ class Pepecoin:
         # Run the monitor in a separate thread to avoid blocking
         threading.Thread(target=monitor, daemon=True).start()
 
+    def subscribe_notifications(self, endpoint, topics: Optional[Sequence[str]] = None,
+                                **kwargs) -> 'NotificationSubscriber':
+        """
+        Subscribe to the node's ZMQ block and transaction notifications instead of polling.
+
+        Gaps in the notification sequence are filled in through this instance's RPC connection.
+        Requires ``pyzmq`` (``pip install pepecoin[zmq]``).
+
+        :param endpoint: ZMQ endpoint (e.g. ``tcp://127.0.0.1:28332``) or a ``{topic: endpoint}`` mapping.
+        :param topics: Any of ``hashblock``, ``hashtx``, ``rawblock``, ``rawtx``; defaults to the hash topics.
+        :param kwargs: Passed to ``NotificationSubscriber`` (``on_notification``, ``event_queue``, ...).
+        """
+        from .notifications import DEFAULT_TOPICS, NotificationSubscriber
+
+        return NotificationSubscriber(endpoint, self.rpc_connection, topics or DEFAULT_TOPICS, **kwargs)
+
     # ------------------------- Account Management -------------------------
 
     def generate_new_address(self, account=None):
-        if self.is_sync_needed():
+        if self._sync_needed_for_write():
             logger.error("Node is not synchronized. Cannot generate a new address.")
             raise Exception("Node is not synchronized with the network.")
         
@@ -195,7 +412,7 @@ class Pepecoin:
 
     def send_from(self, from_account, to_address, amount, minconf=1, comment=None, comment_to=None):
         """Send funds from a specific account to an external address."""
-        if self.is_sync_needed():
+        if self._sync_needed_for_write():
             logger.error("Node is not synchronized. Cannot proceed with sending funds.")
             raise Exception("Node is not synchronized with the network.")
 
@@ -228,18 +445,116 @@ class Pepecoin:
             logger.error(f"Failed to list accounts: {e}")
             return {}
 
+    def get_balance_snapshot(self, tiers: Optional[Sequence[int]] = None, full: bool = False,
+                             **kwargs) -> 'BalanceSnapshot':
+        """
+        Balances of every account and address for several ``minconf`` tiers, built from one
+        ``listunspent`` / ``listaccounts`` batch instead of a ``getbalance`` call per account.
+
+        Later calls update the same snapshot incrementally from what changed since the previous tip::
+
+            snapshot = pepecoin.get_balance_snapshot()
+            snapshot.account('shop', minconf=6), snapshot.address(address, minconf=0)
+
+        :param tiers: ``minconf`` values to compute, on the first call; defaults to ``(0, 1, 6)``.
+        :param full: Rebuild from scratch instead of updating.
+        :param kwargs: Passed to ``BalanceTracker`` on the first call (``include_watchonly``, ...).
+        """
+        from .balances import DEFAULT_TIERS, BalanceTracker
+
+        if self.balance_tracker is None:
+            self.balance_tracker = BalanceTracker(self.rpc_connection, tiers or DEFAULT_TIERS, **kwargs)
+        return self.balance_tracker.refresh(full=full)
+
     def get_account(self, account_name: str) -> Account:
         """
         Retrieve an Account instance for a given account name.
+
+        The account shares this instance's pooled RPC transport, so creating
+        accounts does not open new connections.
         """
         return Account(
             rpc_user=self.rpc_user,
             rpc_password=self.rpc_password,
             host=self.host,
             port=self.port,
-            account_name=account_name
+            account_name=account_name,
+            transport=self.rpc_connection,
+            address_pool=self.address_pools.get(account_name)
         )
 
+    def get_address_pool(
+        self,
+        account_name: str,
+        state_path: Optional[str] = None,
+        low_water: Optional[int] = None,
+        refill_batch: Optional[int] = None
+    ) -> 'AddressPool':
+        """
+        Create (or return the existing) pre-generated address pool for an account.
+
+        Accounts returned by ``get_account`` afterwards hand out addresses from the pool.
+
+        :param account_name: The account to pool addresses for.
+        :param state_path: JSON file the unissued addresses are persisted to.
+        :param low_water: Refill in the background when this many addresses or fewer remain
+                          (``DEFAULT_LOW_WATER`` if None).
+        :param refill_batch: Number of addresses generated per refill (``DEFAULT_REFILL_BATCH`` if None).
+        """
+        from .address_pool import DEFAULT_LOW_WATER, DEFAULT_REFILL_BATCH, AddressPool
+
+        pool = self.address_pools.get(account_name)
+        if pool is None:
+            pool = AddressPool(self.rpc_connection, account_name, state_path=state_path,
+                               low_water=DEFAULT_LOW_WATER if low_water is None else low_water,
+                               refill_batch=DEFAULT_REFILL_BATCH if refill_batch is None else refill_batch)
+            self.address_pools[account_name] = pool
+        return pool
+
+    def get_payment_watcher(self, state_path: Optional[str] = None, **kwargs) -> 'PaymentWatcher':
+        """
+        Create a ``PaymentWatcher`` that tracks many invoices with one ``listsinceblock`` cursor.
+
+        :param state_path: Optional JSON file used to persist the cursor and open invoices.
+        :param kwargs: Passed to ``PaymentWatcher`` (``on_event``, ``event_queue``, ...).
+        """
+        from .payment_watcher import PaymentWatcher
+
+        return PaymentWatcher(self.rpc_connection, state_path=state_path, **kwargs)
+
+    def get_wallet_history(
+        self,
+        state_path: Optional[str] = None,
+        cursor: Optional['HistoryCursor'] = None,
+        account: Optional[str] = None,
+        **kwargs
+    ) -> 'WalletHistory':
+        """
+        Stream the wallet's transaction history with ``listsinceblock`` instead of ``count``/``skip`` pages.
+
+        Iterate the result for ``HistoryRecord``s; iterating again later continues where it stopped.
+
+        :param state_path: Optional JSON file used to persist the cursor between runs.
+        :param cursor: Explicit ``HistoryCursor`` to resume from.
+        :param account: Only yield entries of this account.
+        :param kwargs: Passed to ``WalletHistory`` (``target_confirmations``, ``checkpoint_every``, ...).
+        """
+        from .history import WalletHistory
+
+        return WalletHistory(self.rpc_connection, cursor=cursor, state_path=state_path, account=account, **kwargs)
+
+    def get_mempool_tracker(self, watch_addresses: Optional[Iterable[str]] = None, **kwargs) -> 'MempoolTracker':
+        """
+        Create a ``MempoolTracker`` that follows the mempool by diffing txid sets and fetching only new
+        transactions, with an address index and added/removed events.
+
+        :param watch_addresses: Only keep transactions paying these addresses; None keeps all (up to ``max_entries``).
+        :param kwargs: Passed to ``MempoolTracker`` (``max_entries``, ``on_event``, ``event_queue``).
+        """
+        from .mempool import MempoolTracker
+
+        return MempoolTracker(self.rpc_connection, watch_addresses=watch_addresses, **kwargs)
+
     # ------------------------- Network Information -------------------------
 
     def get_network_info(self) -> Dict:
@@ -358,21 +673,103 @@ class Pepecoin:
         """
         Get detailed information about a block.
         """
+        if self.cache is not None:
+            block_info = self.cache.get_block(block_hash)
+            if block_info is not None:
+                logger.debug(f"Retrieved cached block info for hash {block_hash}.")
+                return block_info
         try:
             block_info = self.rpc_connection.getblock(block_hash)
             logger.info(f"Retrieved block info for hash {block_hash}.")
+            if self.cache is not None:
+                self.cache.put_block(block_hash, block_info)
             return block_info
         except JSONRPCException as e:
             logger.error(f"Error retrieving block info for hash {block_hash}: {e}")
             raise e
 
+    def get_block_hashes(self, heights: Iterable[int]) -> List[str]:
+        """
+        Get the hashes of the blocks at the given heights using batched RPC calls.
+
+        :param heights: Block heights, e.g. ``range(1000, 2000)``.
+        :return: Block hashes in the same order as ``heights``.
+        :raises JSONRPCException: If any height could not be resolved.
+        """
+        results = self.rpc_connection.batch([("getblockhash", height) for height in heights])
+        try:
+            block_hashes = [r.unwrap() for r in results]
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving block hashes: {e}")
+            raise e
+        logger.info(f"Retrieved {len(block_hashes)} block hashes.")
+        return block_hashes
+
+    def get_blocks(self, block_hashes: Iterable[str]) -> List[Dict]:
+        """
+        Get detailed information about many blocks using batched RPC calls.
+
+        :param block_hashes: Block hashes to fetch.
+        :return: Block info dicts in the same order as ``block_hashes``.
+        :raises JSONRPCException: If any block could not be retrieved.
+        """
+        block_hashes = list(block_hashes)
+        blocks = [self.cache.get_block(h) for h in block_hashes] if self.cache is not None else [None] * len(block_hashes)
+        missing = [i for i, block in enumerate(blocks) if block is None]
+        results = self.rpc_connection.batch([("getblock", block_hashes[i]) for i in missing])
+        try:
+            for i, result in zip(missing, results):
+                blocks[i] = result.unwrap()
+                if self.cache is not None:
+                    self.cache.put_block(block_hashes[i], blocks[i])
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving blocks: {e}")
+            raise e
+        logger.info(f"Retrieved info for {len(blocks)} blocks ({len(blocks) - len(missing)} cached).")
+        return blocks
+
+    def iter_blocks(
+        self,
+        start_height: int,
+        end_height: Optional[int] = None,
+        prefetch: Optional[int] = None,
+        verbosity: Optional[Any] = None
+    ) -> Iterator[Dict]:
+        """
+        Iterate over the blocks from ``start_height`` to ``end_height`` (inclusive) in height order.
+
+        Block hashes and bodies are fetched in batches by a background thread that stays up to
+        ``prefetch`` blocks ahead of the consumer, so RPC round trips overlap with processing.
+
+        :param start_height: First block height to yield.
+        :param end_height: Last block height to yield. Defaults to the current tip.
+        :param prefetch: Maximum number of blocks fetched ahead (bounds memory use; ``DEFAULT_PREFETCH`` if None).
+        :param verbosity: Optional second argument passed to ``getblock`` (e.g. False for raw hex).
+        :return: Iterator of blocks as returned by ``getblock``.
+        """
+        from .block_iterator import DEFAULT_PREFETCH, BlockPrefetcher
+
+        if end_height is None:
+            end_height = self.get_block_count()
+        if prefetch is None:
+            prefetch = DEFAULT_PREFETCH
+        logger.info(f"Iterating blocks {start_height}..{end_height} (prefetch={prefetch}).")
+
+        return iter(BlockPrefetcher(self.rpc_connection, start_height, end_height, prefetch, verbosity))
+
     # ------------------------- Fee Estimation -------------------------
 
     def estimate_smart_fee(self, conf_target: int, estimate_mode: str = 'CONSERVATIVE') -> Dict:
         """
         Estimates the approximate fee per kilobyte needed for a transaction to begin
         confirmation within conf_target blocks.
+
+        Once ``get_fee_oracle()`` has been called, targets it precomputes are answered
+        from memory; the result then also carries a ``stale`` flag.
         """
+        oracle = self.fee_oracle
+        if oracle is not None and conf_target in oracle.targets and estimate_mode == oracle.estimate_mode:
+            return oracle.estimate(conf_target).to_dict()
         try:
             fee_estimate = self.rpc_connection.estimatesmartfee(conf_target, estimate_mode)
             logger.info(f"Estimated fee: {fee_estimate}")
@@ -381,6 +778,29 @@ class Pepecoin:
             logger.error(f"Error estimating smart fee: {e}")
             raise e
 
+    def get_fee_oracle(self, targets: Optional[Sequence[int]] = None, **kwargs) -> 'FeeOracle':
+        """
+        Create (or return the existing) ``FeeOracle``, which fetches estimates for all ``targets``
+        in one batch per new block and serves them from memory, also to ``estimate_smart_fee``.
+
+        :param targets: Confirmation targets to precompute; defaults to ``DEFAULT_FEE_TARGETS``.
+        :param kwargs: Passed to ``FeeOracle`` (``estimate_mode``, ``poll_interval``, ...).
+        :raises ValueError: If an oracle already exists with different ``targets`` or settings.
+        """
+        from .fee_oracle import DEFAULT_FEE_TARGETS, FeeOracle
+
+        oracle = self.fee_oracle
+        if oracle is None:
+            self.fee_oracle = FeeOracle(self.rpc_connection, targets or DEFAULT_FEE_TARGETS, **kwargs)
+            return self.fee_oracle
+        if targets is not None and tuple(sorted(set(targets))) != oracle.targets:
+            raise ValueError(f"The fee oracle already precomputes targets {oracle.targets}; "
+                             f"close() it before asking for {tuple(targets)}.")
+        changed = [name for name, value in kwargs.items() if getattr(oracle, name) != value]
+        if changed:
+            raise ValueError(f"The fee oracle already exists with different {', '.join(changed)}.")
+        return oracle
+
     # ------------------------- Raw Transaction Handling -------------------------
 
     def send_raw_transaction(self, hex_string: str) -> str:
@@ -399,14 +819,125 @@ class Pepecoin:
         """
         Return the raw transaction data.
         """
+        if self.cache is not None:
+            transaction = self.cache.get_transaction(txid, verbose)
+            if transaction is not None:
+                logger.debug(f"Retrieved cached raw transaction for TXID: {txid}")
+                return transaction
         try:
             transaction = self.rpc_connection.getrawtransaction(txid, verbose)
             logger.info(f"Retrieved raw transaction for TXID: {txid}")
+            if self.cache is not None:
+                self._cache_transactions([txid], [transaction], verbose)
             return transaction
         except JSONRPCException as e:
             logger.error(f"Error retrieving raw transaction for TXID {txid}: {e}")
             raise e
 
+    def get_raw_transactions(self, txids: Iterable[str], verbose: bool = True) -> List[Dict]:
+        """
+        Return the raw transaction data for many transactions using batched RPC calls.
+
+        :param txids: Transaction IDs to fetch.
+        :param verbose: Return decoded JSON objects instead of hex strings.
+        :return: Transactions in the same order as ``txids``.
+        :raises JSONRPCException: If any transaction could not be retrieved.
+        """
+        txids = list(txids)
+        if self.cache is not None:
+            transactions = [self.cache.get_transaction(txid, verbose) for txid in txids]
+        else:
+            transactions = [None] * len(txids)
+        missing = [i for i, tx in enumerate(transactions) if tx is None]
+        results = self.rpc_connection.batch([("getrawtransaction", txids[i], verbose) for i in missing])
+        try:
+            for i, result in zip(missing, results):
+                transactions[i] = result.unwrap()
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving raw transactions: {e}")
+            raise e
+        if self.cache is not None:
+            self._cache_transactions([txids[i] for i in missing], [transactions[i] for i in missing], verbose)
+        logger.info(f"Retrieved {len(transactions)} raw transactions ({len(transactions) - len(missing)} cached).")
+        return transactions
+
+    def _cache_transactions(self, txids: List[str], transactions: List[Any], verbose: bool) -> None:
+        """
+        Cache fetched transactions together with the heights of their blocks,
+        which verbose transactions do not carry but ``purge_from_height`` needs.
+        Unknown heights are looked up with one batch of ``getblockheader`` calls.
+        """
+        heights = {tx['blockhash']: self.cache.block_height(tx['blockhash'])
+                   for tx in transactions if self.cache.is_persistent(tx)}
+        unknown = [block_hash for block_hash, height in heights.items() if height is None]
+        if unknown:
+            results = self.rpc_connection.batch([("getblockheader", block_hash) for block_hash in unknown])
+            for block_hash, result in zip(unknown, results):
+                if result.ok:
+                    heights[block_hash] = result.result['height']
+                else:
+                    logger.warning(f"Could not resolve the height of block {block_hash}: {result.error}")
+        for txid, transaction in zip(txids, transactions):
+            height = heights.get(transaction.get('blockhash')) if isinstance(transaction, dict) else None
+            self.cache.put_transaction(txid, transaction, verbose, height)
+
+    # ------------------------- Binary Decoding -------------------------
+
+    def get_decoded_block(self, block_hash: str) -> 'Block':
+        """
+        Fetch a block in serialized form and decode it locally.
+
+        Much cheaper for the node than verbose ``getblock``; fields are parsed lazily on access.
+
+        :param block_hash: Hash of the block to fetch.
+        :return: A ``pepecoin.serialization.Block`` (AuxPoW blocks included).
+        """
+        from .serialization import decode_block
+
+        try:
+            block = decode_block(self.rpc_connection.getblock(block_hash, False))
+            logger.info(f"Retrieved serialized block {block_hash} ({block.size} bytes).")
+            return block
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving serialized block {block_hash}: {e}")
+            raise e
+
+    def get_decoded_blocks(self, block_hashes: Iterable[str]) -> List['Block']:
+        """
+        Fetch many serialized blocks with batched RPC calls and decode them locally.
+
+        :param block_hashes: Hashes of the blocks to fetch.
+        :return: ``Block`` objects in the same order as ``block_hashes``.
+        :raises JSONRPCException: If any block could not be retrieved.
+        """
+        from .serialization import decode_block
+
+        results = self.rpc_connection.batch([("getblock", block_hash, False) for block_hash in block_hashes])
+        try:
+            blocks = [decode_block(r.unwrap()) for r in results]
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving serialized blocks: {e}")
+            raise e
+        logger.info(f"Retrieved {len(blocks)} serialized blocks.")
+        return blocks
+
+    def get_decoded_transaction(self, txid: str) -> 'Tx':
+        """
+        Fetch a transaction in serialized form and decode it locally.
+
+        :param txid: ID of the transaction to fetch.
+        :return: A ``pepecoin.serialization.Tx``.
+        """
+        from .serialization import decode_transaction
+
+        try:
+            transaction = decode_transaction(self.rpc_connection.getrawtransaction(txid, False))
+            logger.info(f"Retrieved serialized transaction {txid}.")
+            return transaction
+        except JSONRPCException as e:
+            logger.error(f"Error retrieving serialized transaction {txid}: {e}")
+            raise e
+
     # ------------------------- Additional Methods Integrated with Account Class -------------------------
 
     def transfer_between_accounts(
@@ -450,7 +981,8 @@ class Pepecoin:
         self,
         from_account_names: List[str],
         to_address: str,
-        amounts: List[float]
+        amounts: List[float],
+        batched: bool = False
     ) -> List[str]:
         """
         Transfer funds from multiple accounts to a single address.
@@ -458,13 +990,21 @@ class Pepecoin:
         :param from_account_names: List of account names to transfer from.
         :param to_address: The target Pepecoin address to transfer funds to.
         :param amounts: List of amounts corresponding to each account.
-        :return: List of transaction IDs.
+        :param batched: Move the amounts into the first account and pay them with a single
+                        transaction instead of one transaction per account.
+        :return: List of transaction IDs, one per source account.
         """
+        if batched:
+            from .payouts import Payment
+
+            payments = [Payment(name, to_address, amount) for name, amount in zip(from_account_names, amounts)]
+            report = self.send_payouts(payments, merge_sources_into=from_account_names[0] if payments else None)
+            return [r.txid for r in report.results]
+
         tx_ids = []
         try:
             for idx, account_name in enumerate(from_account_names):
                 amount = amounts[idx]
-                from_account = self.get_account(account_name)
 
                 tx_id = self.send_from(
                     from_account=account_name,
@@ -482,13 +1022,16 @@ class Pepecoin:
     def consolidate_accounts(
         self,
         source_account_names: List[str],
-        destination_account_name: str
+        destination_account_name: str,
+        batched: bool = False
     ) -> List[str]:
         """
         Consolidate funds from multiple accounts into a single account.
 
         :param source_account_names: List of account names to transfer from.
         :param destination_account_name: The account name to receive the funds.
+        :param batched: Read all balances in one batch and send them in a single transaction
+                        instead of one transaction per account.
         :return: List of transaction IDs.
         """
         tx_ids = []
@@ -496,8 +1039,22 @@ class Pepecoin:
             destination_account = self.get_account(destination_account_name)
             destination_address = destination_account.generate_address()
 
+            if batched:
+                from .payouts import Payment
+
+                balances = self.rpc_connection.batch([("getbalance", name) for name in source_account_names])
+                payments = [
+                    Payment(name, destination_address, balance.unwrap())
+                    for name, balance in zip(source_account_names, balances)
+                    if balance.unwrap() > 0
+                ]
+                if not payments:
+                    logger.info("No balance to transfer from the source accounts.")
+                    return tx_ids
+                report = self.send_payouts(payments, merge_sources_into=payments[0].from_account)
+                return [r.txid for r in report.results]
+
             for account_name in source_account_names:
-                source_account = self.get_account(account_name)
                 balance = self.get_balance(account_name)
                 if balance > 0:
                     tx_id = self.send_from(
@@ -515,8 +1072,98 @@ class Pepecoin:
             logger.error(f"Error consolidating accounts: {e}")
             return tx_ids
 
+    def send_payouts(
+        self,
+        payments: Iterable['Payment'],
+        merge_sources_into: Optional[str] = None,
+        max_tx_bytes: Optional[int] = None,
+        minconf: int = 1,
+        comment: Optional[str] = None,
+        max_outputs_per_tx: Optional[int] = None,
+    ) -> 'PayoutReport':
+        """
+        Pay many recipients with as few ``sendmany`` transactions as size limits allow.
+
+        :param payments: ``Payment(from_account, to_address, amount)`` entries.
+        :param merge_sources_into: Move all source balances into this account first so that
+                                   payments from different accounts share transactions. Amounts
+                                   of payments that fail are moved back (see ``PayoutReport.moves``).
+        :param max_tx_bytes: Estimated size limit of each transaction (``MAX_STANDARD_TX_BYTES`` if None).
+        :param minconf: Only use funds with at least this many confirmations.
+        :param comment: Optional wallet comment stored with each transaction.
+        :param max_outputs_per_tx: Lower the number of outputs per transaction below what the size allows.
+        :return: A ``PayoutReport`` mapping each payment to its txid and output index.
+        """
+        if self._sync_needed_for_write():
+            logger.error("Node is not synchronized. Cannot proceed with sending funds.")
+            raise Exception("Node is not synchronized with the network.")
+
+        from .payouts import MAX_STANDARD_TX_BYTES, PayoutEngine
+
+        engine = PayoutEngine(self.rpc_connection,
+                              max_tx_bytes=MAX_STANDARD_TX_BYTES if max_tx_bytes is None else max_tx_bytes,
+                              minconf=minconf, comment=comment, max_outputs_per_tx=max_outputs_per_tx)
+        return engine.pay(payments, merge_sources_into=merge_sources_into)
+
+    def consolidate_utxos(
+        self,
+        group_by: str = 'address',
+        fee_rate: Optional[Decimal] = None,
+        max_tx_bytes: Optional[int] = None,
+        min_inputs: Optional[int] = None,
+        minconf: int = 1,
+        max_utxo_amount=None,
+        addresses: Optional[Iterable[str]] = None,
+        pace: float = 0.0,
+        dry_run: bool = False
+    ) -> 'ConsolidationReport':
+        """
+        Merge the wallet's small unspent outputs into fewer, larger ones with raw transactions.
+
+        :param group_by: ``'address'`` to consolidate each address into itself, or ``'account'``
+                         to consolidate each account into one of its addresses.
+        :param fee_rate: Fee in $PEP per 1000 bytes (``DEFAULT_FEE_RATE`` if None).
+        :param max_tx_bytes: Size limit of each consolidation transaction (``MAX_STANDARD_TX_BYTES`` if None).
+        :param min_inputs: Skip groups with fewer spendable outputs than this (``DEFAULT_MIN_INPUTS`` if None).
+        :param minconf: Only consolidate outputs with at least this many confirmations.
+        :param max_utxo_amount: Only consolidate outputs no larger than this.
+        :param addresses: Only consolidate outputs paying these addresses.
+        :param pace: Seconds to wait between broadcasts.
+        :param dry_run: Only report the projected input count, size and fees.
+        :return: A ``ConsolidationReport``.
+        """
+        if not dry_run and self._sync_needed_for_write():
+            logger.error("Node is not synchronized. Cannot proceed with consolidation.")
+            raise Exception("Node is not synchronized with the network.")
+
+        from .consolidation import DEFAULT_FEE_RATE, DEFAULT_MIN_INPUTS, MAX_STANDARD_TX_BYTES, UTXOConsolidator
+
+        consolidator = UTXOConsolidator(
+            self.rpc_connection,
+            fee_rate=DEFAULT_FEE_RATE if fee_rate is None else fee_rate,
+            max_tx_bytes=MAX_STANDARD_TX_BYTES if max_tx_bytes is None else max_tx_bytes,
+            min_inputs=DEFAULT_MIN_INPUTS if min_inputs is None else min_inputs,
+            minconf=minconf,
+            pace=pace,
+        )
+        return consolidator.run(group_by, addresses, max_utxo_amount, dry_run=dry_run)
+
     # ------------------------- Node Control Methods -------------------------
 
+    def close(self) -> None:
+        """
+        Close all pooled connections to the node. They are reopened on the next call.
+        """
+        if self.sync_gate is not None:
+            self.sync_gate.stop()
+        for pool in self.address_pools.values():
+            pool.stop()
+        if self.fee_oracle is not None:
+            self.fee_oracle.stop()
+            self.fee_oracle = None
+        self.rpc_connection.close()
+        logger.debug("Closed pooled RPC connections.")
+
     def restart_node(self) -> bool:
         """
         Restart the Pepecoin node.
@@ -46,6 +46,12 @@ class PepecoinRPC:
             print(f"Error listing transactions: {e}")
             return None
 
+    def iter_history(self, state_path=None, cursor=None, **kwargs):
+        # Each pass is one listsinceblock call from the cursor block; AuthServiceProxy cannot stream,
+        # so the whole answer is decoded in memory.
+        from .history import WalletHistory
+        return WalletHistory(self.rpc_connection, cursor=cursor, state_path=state_path, **kwargs)
+
     def get_blockchain_info(self):
         try:
             info = self.rpc_connection.getblockchaininfo()
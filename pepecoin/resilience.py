@@ -0,0 +1,386 @@
+# pepecoin/resilience.py
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence
+
+from bitcoinrpc.authproxy import JSONRPCException
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_EXCEEDED_CODE = -345
+# Node warming up (-28), non-JSON reply (-342), no free pooled connection (-344).
+DEFAULT_RETRY_CODES = (-28, -342, -344)
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar('pepecoin_deadline', default=None)
+
+
+class DeadlineExceeded(JSONRPCException):
+    """
+    Raised instead of sending (or waiting for) a request once the current deadline has passed.
+    """
+
+    def __init__(self, message: str = 'deadline exceeded'):
+        super().__init__({'code': DEADLINE_EXCEEDED_CODE, 'message': message})
+
+
+# ------------------------- Deadlines -------------------------
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Bound every RPC made inside the block (on this thread or task) to ``seconds`` in total.
+
+    Deadlines nest: an inner block can only shorten the outer one. Each request's
+    socket timeout is cut to the time left, and requests started after the
+    deadline fail at once with ``DeadlineExceeded``::
+
+        with deadline(2.0):
+            block = node.get_block(node.get_best_block_hash())
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None and current < at:
+        at = current
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left before the current deadline, or None if there is none.
+    """
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def request_timeout(default: float) -> float:
+    """
+    Timeout for the next request: ``default`` cut to the time left before the deadline.
+
+    :raises DeadlineExceeded: If the deadline has already passed.
+    """
+    at = _deadline.get()
+    if at is None:
+        return default
+    left = at - time.monotonic()
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(default, left)
+
+
+def deadline_passed() -> bool:
+    at = _deadline.get()
+    return at is not None and time.monotonic() >= at
+
+
+# ------------------------- Policies -------------------------
+
+class RetryPolicy:
+    """
+    Bounded retries with full-jitter exponential backoff.
+
+    Only idempotent reads are retried, and only after transport failures or the
+    error codes in ``retry_codes`` (by default the node warming up, ``-28``).
+    Retries never outlast the current deadline.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.05,
+        max_delay: float = 1.0,
+        retry_codes: Sequence[int] = DEFAULT_RETRY_CODES,
+    ):
+        """
+        :param attempts: Total tries per call, including the first.
+        :param base_delay: Backoff cap before the first retry; doubles each retry.
+        :param max_delay: Upper bound of the backoff cap.
+        :param retry_codes: JSON-RPC error codes worth retrying.
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_codes = frozenset(retry_codes)
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, DeadlineExceeded):
+            return False
+        if isinstance(error, OSError):
+            return True
+        info = getattr(error, 'error', None)
+        return isinstance(info, dict) and info.get('code') in self.retry_codes
+
+
+class HedgePolicy:
+    """
+    When a read has been outstanding longer than the ``quantile`` latency of
+    recent calls of the same method, send a duplicate and use whichever answer
+    arrives first.
+
+    Hedges are limited to ``max_ratio`` of all reads so a slow node does not
+    double the load on it.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        min_samples: int = 20,
+        window: int = 256,
+        max_ratio: float = 0.1,
+        workers: int = 16,
+    ):
+        """
+        :param quantile: Latency quantile after which a duplicate is sent.
+        :param min_samples: Calls of a method observed before it is hedged at all.
+        :param window: Recent latencies kept per method.
+        :param max_ratio: Maximum fraction of reads that may be hedged.
+        :param workers: Threads available for running reads and their duplicates. When all
+            are busy, further reads run on the caller's thread without a duplicate.
+        """
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.window = window
+        self.max_ratio = max_ratio
+        self.workers = workers
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent latencies per method with a cached quantile.
+    """
+
+    _REFRESH_EVERY = 16
+
+    def __init__(self, quantile: float, window: int, min_samples: int):
+        self.quantile = quantile
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+        self._thresholds: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(method)
+            if samples is None:
+                samples = self._samples[method] = deque(maxlen=self.window)
+            samples.append(seconds)
+            count = self._counts[method] = self._counts.get(method, 0) + 1
+            if len(samples) >= self.min_samples and count % self._REFRESH_EVERY == 0 \
+                    or len(samples) == self.min_samples:
+                ordered = sorted(samples)
+                self._thresholds[method] = ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))]
+
+    def threshold(self, method: str) -> Optional[float]:
+        return self._thresholds.get(method)
+
+
+# ------------------------- Transport -------------------------
+
+class ResilientTransport:
+    """
+    Adds retries and hedging for idempotent reads on top of another transport
+    (``RPCTransport`` or ``MultiNodeTransport``), keeping its interface.
+
+    Reads are the methods in ``pepecoin.multinode.READ_METHODS`` (and batches
+    made only of them); everything else is passed straight through, exactly once.
+    Hedged duplicates use another pooled connection, or with a
+    ``MultiNodeTransport`` the least busy other node.
+    """
+
+    def __init__(
+        self,
+        inner,
+        retry: Optional[RetryPolicy] = None,
+        hedge: Optional[HedgePolicy] = None,
+        read_methods: Optional[FrozenSet[str]] = None,
+    ):
+        """
+        :param inner: Transport to wrap.
+        :param retry: Retry policy for reads, or None for no retries.
+        :param hedge: Hedging policy for reads, or None for no hedging.
+        :param read_methods: Methods safe to retry and duplicate. Defaults to ``READ_METHODS``.
+        """
+        if read_methods is None:
+            from .multinode import READ_METHODS
+            read_methods = READ_METHODS
+        self.inner = inner
+        self.retry = retry
+        self.hedge = hedge
+        self.read_methods = read_methods
+        self.batch_chunk_size = inner.batch_chunk_size
+        self.hedged = 0
+        self.reads = 0
+        self._latencies = None
+        self._executor = None
+        self._busy = 0
+        self._lock = threading.Lock()  # guards the counters and the executor
+        if hedge is not None:
+            self._latencies = LatencyTracker(hedge.quantile, hedge.window, hedge.min_samples)
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *params: self.call(name, *params)
+
+    # ------------------------- Calls -------------------------
+
+    def call(self, method: str, *params) -> Any:
+        if method not in self.read_methods:
+            return self.inner.call(method, *params)
+        if self.hedge is not None:
+            return self._retrying(method, lambda: self._hedged(method, lambda: self.inner.call(method, *params)))
+        return self._retrying(method, lambda: self.inner.call(method, *params))
+
+    def call_raw(self, method: str, *params) -> bytes:
+        if method not in self.read_methods:
+            return self.inner.call_raw(method, *params)
+        return self._retrying(method, lambda: self.inner.call_raw(method, *params))
+
+    def stream(self, method: str, *params, **kwargs) -> Iterator[bytes]:
+        return self.inner.stream(method, *params, **kwargs)
+
+    def batch(self, calls: Sequence[Sequence], chunk_size: Optional[int] = None) -> List:
+        if not calls or any(call[0] not in self.read_methods for call in calls):
+            return self.inner.batch(calls, chunk_size)
+        return self._retrying('batch', lambda: self.inner.batch(calls, chunk_size))
+
+    def _retrying(self, method: str, send: Callable[[], Any]) -> Any:
+        policy = self.retry
+        if policy is None:
+            return send()
+        attempt = 0
+        while True:
+            try:
+                return send()
+            except (OSError, JSONRPCException) as e:
+                attempt += 1
+                if attempt >= policy.attempts or not policy.is_retryable(e):
+                    raise
+                delay = policy.backoff(attempt - 1)
+                left = remaining()
+                if left is not None and left <= delay:
+                    raise
+                logger.warning(f"RPC {method} failed ({e}); retry {attempt}/{policy.attempts - 1} in {delay:.3f}s.")
+                time.sleep(delay)
+
+    def _hedged(self, method: str, send: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.reads += 1
+        latencies = self._latencies
+
+        def timed():
+            start = time.perf_counter()
+            result = send()
+            latencies.record(method, time.perf_counter() - start)
+            return result
+
+        threshold = latencies.threshold(method)
+        if threshold is None:
+            return timed()
+
+        # Never queue behind busy workers: that would cap concurrent reads at
+        # ``workers`` no matter how many connections the transport allows.
+        with self._lock:
+            free = self._busy < self.hedge.workers
+            if free:
+                self._busy += 1
+        if not free:
+            return timed()
+        first = self._spawn(timed)
+        done, _ = wait([first], timeout=threshold)
+        if done:
+            return first.result()
+        with self._lock:
+            allowed = self.hedged < self.hedge.max_ratio * self.reads and self._busy < self.hedge.workers
+            if allowed:
+                self.hedged += 1
+                self._busy += 1
+        if not allowed:
+            return self._result(first)
+        logger.debug(f"RPC {method} slower than {threshold * 1000:.1f}ms; sending a hedged duplicate.")
+        second = self._spawn(send)
+        return self._first_success([first, second])
+
+    def _spawn(self, fn: Callable[[], Any]):
+        """
+        Run ``fn`` on a worker the caller has already reserved in ``_busy``.
+        """
+        # Each submission runs in a copy of the caller's context, so deadlines still apply.
+        future = self._get_executor().submit(contextvars.copy_context().run, fn)
+        future.add_done_callback(self._release_worker)
+        return future
+
+    def _release_worker(self, _future) -> None:
+        with self._lock:
+            self._busy -= 1
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(self.hedge.workers, thread_name_prefix='pepecoin-hedge')
+            return self._executor
+
+    @staticmethod
+    def _result(future) -> Any:
+        left = remaining()
+        if left is None:
+            return future.result()
+        done, _ = wait([future], timeout=max(0.0, left))
+        if not done:
+            raise DeadlineExceeded()
+        return future.result()
+
+    @staticmethod
+    def _first_success(futures: List) -> Any:
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            left = remaining()
+            done, pending = wait(pending, timeout=None if left is None else max(0.0, left),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded()
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    # ------------------------- Transport Interface -------------------------
+
+    @property
+    def primary_transport(self):
+        return self.inner.primary_transport
+
+    def add_observer(self, observer) -> None:
+        self.inner.add_observer(observer)
+
+    def remove_observer(self, observer) -> None:
+        self.inner.remove_observer(observer)
+
+    def close(self) -> None:
+        """
+        Close the wrapped transport and stop the hedging threads. Both are recreated if the transport is used again.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.inner.close()
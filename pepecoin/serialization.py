@@ -0,0 +1,433 @@
+# pepecoin/serialization.py
+
+import hashlib
+import logging
+import struct
+from decimal import Decimal
+from typing import Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+HEADER_BYTES = 80
+# Dogecoin-family merged mining: blocks with this version bit carry an AuxPoW
+# proof between the header and the transactions.
+VERSION_AUXPOW = 1 << 8
+
+_unpack_u16 = struct.Struct('<H').unpack_from
+_unpack_u32 = struct.Struct('<I').unpack_from
+_unpack_i32 = struct.Struct('<i').unpack_from
+_unpack_u64 = struct.Struct('<Q').unpack_from
+_unpack_i64 = struct.Struct('<q').unpack_from
+
+RawData = Union[bytes, bytearray, memoryview, str]
+
+
+class DeserializationError(ValueError):
+    """
+    Raised when serialized block or transaction data is truncated or malformed.
+    """
+
+
+# ------------------------- Primitives -------------------------
+
+def sha256d(data) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def hash_to_hex(digest) -> str:
+    """
+    Render a 32-byte hash in the byte-reversed hex form used by the RPC interface.
+    """
+    return bytes(digest)[::-1].hex()
+
+
+def read_varint(buf: memoryview, pos: int) -> Tuple[int, int]:
+    """
+    Read a CompactSize integer at ``pos``.
+
+    :return: ``(value, position after it)``.
+    """
+    first = buf[pos]
+    if first < 0xfd:
+        return first, pos + 1
+    if first == 0xfd:
+        return _unpack_u16(buf, pos + 1)[0], pos + 3
+    if first == 0xfe:
+        return _unpack_u32(buf, pos + 1)[0], pos + 5
+    return _unpack_u64(buf, pos + 1)[0], pos + 9
+
+
+def _as_buffer(data: RawData) -> memoryview:
+    if isinstance(data, str):
+        data = bytes.fromhex(data)
+    return memoryview(data).cast('B')
+
+
+# ------------------------- Transactions -------------------------
+
+class TxIn:
+    """
+    A transaction input. Fields are read from the underlying buffer on access.
+    """
+
+    __slots__ = ('_buf', '_pos', '_script_start', '_script_end')
+
+    def __init__(self, buf: memoryview, pos: int, script_start: int, script_end: int):
+        self._buf = buf
+        self._pos = pos
+        self._script_start = script_start
+        self._script_end = script_end
+
+    @property
+    def prev_txid(self) -> str:
+        return hash_to_hex(self._buf[self._pos:self._pos + 32])
+
+    @property
+    def prev_index(self) -> int:
+        return _unpack_u32(self._buf, self._pos + 32)[0]
+
+    @property
+    def script_sig(self) -> memoryview:
+        return self._buf[self._script_start:self._script_end]
+
+    @property
+    def sequence(self) -> int:
+        return _unpack_u32(self._buf, self._script_end)[0]
+
+    @property
+    def is_coinbase(self) -> bool:
+        return self.prev_index == 0xffffffff and not any(self._buf[self._pos:self._pos + 32])
+
+    def __repr__(self):
+        return f"<TxIn {self.prev_txid}:{self.prev_index}>"
+
+
+class TxOut:
+    """
+    A transaction output. ``value`` is in base units; ``amount`` is the same value in coins.
+    """
+
+    __slots__ = ('_buf', '_pos', '_script_end')
+
+    def __init__(self, buf: memoryview, pos: int, script_end: int):
+        self._buf = buf
+        self._pos = pos
+        self._script_end = script_end
+
+    @property
+    def value(self) -> int:
+        return _unpack_i64(self._buf, self._pos)[0]
+
+    @property
+    def amount(self) -> Decimal:
+        return Decimal(self.value).scaleb(-8)
+
+    @property
+    def script_pubkey(self) -> memoryview:
+        _, start = read_varint(self._buf, self._pos + 8)
+        return self._buf[start:self._script_end]
+
+    def __repr__(self):
+        return f"<TxOut {self.amount}>"
+
+
+class Tx:
+    """
+    A transaction inside a shared buffer.
+
+    Only the transaction's boundaries are located when it is created; inputs,
+    outputs and the txid are computed on first access and then kept.
+    """
+
+    __slots__ = ('_buf', '_start', '_body_start', '_body_end', '_end', '_segwit', '_inputs', '_outputs', '_txid')
+
+    def __init__(self, buf: memoryview, start: int, body_start: int, body_end: int, end: int, segwit: bool):
+        self._buf = buf
+        self._start = start
+        self._body_start = body_start
+        self._body_end = body_end
+        self._end = end
+        self._segwit = segwit
+        self._inputs: Optional[List[TxIn]] = None
+        self._outputs: Optional[List[TxOut]] = None
+        self._txid: Optional[str] = None
+
+    @property
+    def version(self) -> int:
+        return _unpack_i32(self._buf, self._start)[0]
+
+    @property
+    def locktime(self) -> int:
+        return _unpack_u32(self._buf, self._end - 4)[0]
+
+    @property
+    def size(self) -> int:
+        return self._end - self._start
+
+    @property
+    def raw(self) -> memoryview:
+        return self._buf[self._start:self._end]
+
+    def hex(self) -> str:
+        return self.raw.hex()
+
+    @property
+    def txid(self) -> str:
+        if self._txid is None:
+            if self._segwit:
+                # The txid commits to the serialization without marker, flag and witnesses.
+                h = hashlib.sha256(self._buf[self._start:self._start + 4])
+                h.update(self._buf[self._body_start:self._body_end])
+                h.update(self._buf[self._end - 4:self._end])
+                digest = hashlib.sha256(h.digest()).digest()
+            else:
+                digest = sha256d(self.raw)
+            self._txid = hash_to_hex(digest)
+        return self._txid
+
+    def _parse_body(self) -> None:
+        buf = self._buf
+        count, pos = read_varint(buf, self._body_start)
+        inputs = []
+        for _ in range(count):
+            script_len, script_start = read_varint(buf, pos + 36)
+            script_end = script_start + script_len
+            inputs.append(TxIn(buf, pos, script_start, script_end))
+            pos = script_end + 4
+        count, pos = read_varint(buf, pos)
+        outputs = []
+        for _ in range(count):
+            script_len, script_start = read_varint(buf, pos + 8)
+            script_end = script_start + script_len
+            outputs.append(TxOut(buf, pos, script_end))
+            pos = script_end
+        self._inputs = inputs
+        self._outputs = outputs
+
+    @property
+    def inputs(self) -> List[TxIn]:
+        if self._inputs is None:
+            self._parse_body()
+        return self._inputs
+
+    @property
+    def outputs(self) -> List[TxOut]:
+        if self._outputs is None:
+            self._parse_body()
+        return self._outputs
+
+    @property
+    def is_coinbase(self) -> bool:
+        inputs = self.inputs
+        return len(inputs) == 1 and inputs[0].is_coinbase
+
+    def __repr__(self):
+        return f"<Tx {self.txid}>"
+
+
+def scan_transaction(buf: memoryview, pos: int) -> Tx:
+    """
+    Locate the transaction starting at ``pos`` and wrap it in a lazy ``Tx``.
+
+    :raises DeserializationError: If the transaction runs past the end of the buffer.
+    """
+    try:
+        start = pos
+        pos += 4
+        segwit = buf[pos] == 0 and buf[pos + 1] != 0
+        if segwit:
+            pos += 2
+        body_start = pos
+        input_count, pos = read_varint(buf, pos)
+        for _ in range(input_count):
+            script_len, pos = read_varint(buf, pos + 36)
+            pos += script_len + 4
+        output_count, pos = read_varint(buf, pos)
+        for _ in range(output_count):
+            script_len, pos = read_varint(buf, pos + 8)
+            pos += script_len
+        body_end = pos
+        if segwit:
+            for _ in range(input_count):
+                items, pos = read_varint(buf, pos)
+                for _ in range(items):
+                    item_len, pos = read_varint(buf, pos)
+                    pos += item_len
+        end = pos + 4
+    except (IndexError, struct.error) as e:
+        raise DeserializationError(f"Truncated transaction at offset {start}") from e
+    if end > len(buf):
+        raise DeserializationError(f"Truncated transaction at offset {start}")
+    return Tx(buf, start, body_start, body_end, end, segwit)
+
+
+# ------------------------- Blocks -------------------------
+
+class BlockHeader:
+    """
+    An 80-byte block header inside a shared buffer.
+    """
+
+    __slots__ = ('_buf', '_pos', '_hash')
+
+    def __init__(self, buf: memoryview, pos: int = 0):
+        if pos + HEADER_BYTES > len(buf):
+            raise DeserializationError(f"Truncated block header at offset {pos}")
+        self._buf = buf
+        self._pos = pos
+        self._hash: Optional[str] = None
+
+    @property
+    def version(self) -> int:
+        return _unpack_i32(self._buf, self._pos)[0]
+
+    @property
+    def prev_hash(self) -> str:
+        return hash_to_hex(self._buf[self._pos + 4:self._pos + 36])
+
+    @property
+    def merkle_root(self) -> str:
+        return hash_to_hex(self._buf[self._pos + 36:self._pos + 68])
+
+    @property
+    def time(self) -> int:
+        return _unpack_u32(self._buf, self._pos + 68)[0]
+
+    @property
+    def bits(self) -> int:
+        return _unpack_u32(self._buf, self._pos + 72)[0]
+
+    @property
+    def nonce(self) -> int:
+        return _unpack_u32(self._buf, self._pos + 76)[0]
+
+    @property
+    def hash(self) -> str:
+        if self._hash is None:
+            self._hash = hash_to_hex(sha256d(self._buf[self._pos:self._pos + HEADER_BYTES]))
+        return self._hash
+
+    @property
+    def is_auxpow(self) -> bool:
+        return bool(self.version & VERSION_AUXPOW)
+
+    @property
+    def chain_id(self) -> int:
+        return self.version >> 16
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.hash}>"
+
+
+class AuxPow:
+    """
+    Merged-mining proof: the parent chain's coinbase transaction, the merkle
+    branches linking it to this block, and the parent block header.
+    """
+
+    __slots__ = ('coinbase_tx', 'parent_block_hash', 'coinbase_branch', 'coinbase_index',
+                 'chain_branch', 'chain_index', 'parent_header', 'end')
+
+    def __init__(self, buf: memoryview, pos: int):
+        try:
+            self.coinbase_tx = scan_transaction(buf, pos)
+            pos = self.coinbase_tx._end
+            self.parent_block_hash = hash_to_hex(buf[pos:pos + 32])
+            self.coinbase_branch, pos = _read_branch(buf, pos + 32)
+            self.coinbase_index = _unpack_i32(buf, pos)[0]
+            self.chain_branch, pos = _read_branch(buf, pos + 4)
+            self.chain_index = _unpack_i32(buf, pos)[0]
+        except (IndexError, struct.error) as e:
+            raise DeserializationError(f"Truncated AuxPoW at offset {pos}") from e
+        self.parent_header = BlockHeader(buf, pos + 4)
+        self.end = pos + 4 + HEADER_BYTES
+
+
+def _read_branch(buf: memoryview, pos: int) -> Tuple[List[memoryview], int]:
+    count, pos = read_varint(buf, pos)
+    end = pos + 32 * count
+    if end > len(buf):
+        raise DeserializationError(f"Truncated merkle branch at offset {pos}")
+    return [buf[p:p + 32] for p in range(pos, end, 32)], end
+
+
+class Block(BlockHeader):
+    """
+    A serialized block (``getblock <hash> false``), decoded lazily.
+
+    The AuxPoW proof and the transaction list are only located when first
+    accessed, and each transaction is itself parsed only when its fields are read.
+    All of them are views into the one buffer the block was decoded from.
+    """
+
+    __slots__ = ('_auxpow', '_tx_start', '_transactions')
+
+    def __init__(self, buf: memoryview):
+        super().__init__(buf, 0)
+        self._auxpow: Optional[AuxPow] = None
+        self._tx_start: Optional[int] = None
+        self._transactions: Optional[List[Tx]] = None
+
+    @property
+    def auxpow(self) -> Optional[AuxPow]:
+        if self._auxpow is None and self.is_auxpow:
+            self._auxpow = AuxPow(self._buf, HEADER_BYTES)
+        return self._auxpow
+
+    def _transactions_offset(self) -> int:
+        if self._tx_start is None:
+            self._tx_start = self.auxpow.end if self.is_auxpow else HEADER_BYTES
+        return self._tx_start
+
+    @property
+    def tx_count(self) -> int:
+        return read_varint(self._buf, self._transactions_offset())[0]
+
+    def iter_transactions(self) -> Iterator[Tx]:
+        """
+        Yield the block's transactions without building the full list.
+        """
+        if self._transactions is not None:
+            yield from self._transactions
+            return
+        count, pos = read_varint(self._buf, self._transactions_offset())
+        for _ in range(count):
+            tx = scan_transaction(self._buf, pos)
+            pos = tx._end
+            yield tx
+
+    @property
+    def transactions(self) -> List[Tx]:
+        if self._transactions is None:
+            self._transactions = list(self.iter_transactions())
+        return self._transactions
+
+    @property
+    def size(self) -> int:
+        return len(self._buf)
+
+
+# ------------------------- Entry Points -------------------------
+
+def decode_block(data: RawData) -> Block:
+    """
+    Decode a serialized block, as returned hex-encoded by ``getblock <hash> false``.
+
+    :param data: Hex string or bytes-like object; bytes are wrapped without copying.
+    :raises DeserializationError: If the header is truncated.
+    """
+    return Block(_as_buffer(data))
+
+
+def decode_transaction(data: RawData) -> Tx:
+    """
+    Decode a serialized transaction, as returned by ``getrawtransaction <txid>`` (non-verbose).
+
+    :param data: Hex string or bytes-like object; bytes are wrapped without copying.
+    :raises DeserializationError: If the data is truncated or has trailing bytes.
+    """
+    buf = _as_buffer(data)
+    tx = scan_transaction(buf, 0)
+    if tx.size != len(buf):
+        raise DeserializationError(f"{len(buf) - tx.size} trailing bytes after transaction")
+    return tx
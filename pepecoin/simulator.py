@@ -0,0 +1,716 @@
+# pepecoin/simulator.py
+"""
+In-process simulated Pepecoin node for load and scale testing.
+
+    python -m pepecoin.simulator --addresses 200000 --utxos 2000000 --blocks 500000 --port 33873
+
+``Pepecoin(rpc_user, rpc_password, host='127.0.0.1', port=33873)`` can then be
+pointed at it unchanged.
+"""
+
+import argparse
+import base64
+import decimal
+import json
+import logging
+import random
+import struct
+import threading
+import time
+from array import array
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COIN = 100_000_000
+DEFAULT_FEE = Decimal('0.001')
+GENESIS_TIME = 1700000000
+BLOCK_SPACING = 60
+
+_FUNDING = 1  # txid namespace of the generated wallet history
+_WALLET = 2   # txid namespace of transactions created through the RPC interface
+
+
+class SimulatorError(Exception):
+    """
+    A JSON-RPC error returned to the client, with the node's error code.
+    """
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _to_satoshis(amount: Any) -> int:
+    return int((Decimal(str(amount)) * COIN).to_integral_value())
+
+
+def _to_coins(satoshis: int) -> float:
+    # Exact for amounts below 10^7 coins, and decoded as Decimal by the client.
+    return satoshis / COIN
+
+
+def _varint(n: int) -> bytes:
+    if n < 0xfd:
+        return bytes((n,))
+    if n <= 0xffff:
+        return b'\xfd' + struct.pack('<H', n)
+    return b'\xfe' + struct.pack('<I', n)
+
+
+class SimulatedNode:
+    """
+    Chain and wallet state of the simulator, answering RPCs through ``dispatch``.
+
+    The generated wallet is described by formulas rather than stored: UTXO
+    ``i`` belongs to address ``i * addresses // utxos``, was confirmed at height
+    ``i * blocks // utxos`` and has a deterministic amount, and address ``k``
+    belongs to account ``acc{k % accounts}``. Only a spent bitmap (one byte per
+    UTXO) and per-address received totals are kept per generated object, so
+    millions of UTXOs and deep chains fit in a few tens of megabytes and every
+    lookup is an index computation. Addresses, UTXOs and transactions created
+    through the RPC interface are appended to small side tables.
+
+    Simplifications: account balances are bookkeeping only (like ``move``),
+    coins are selected wallet-wide in generation order, every transaction pays
+    a flat ``fee``, and blocks are only produced by ``mine()``.
+    """
+
+    def __init__(
+        self,
+        addresses: int = 10_000,
+        utxos: Optional[int] = None,
+        accounts: int = 100,
+        blocks: int = 10_000,
+        fee: Decimal = DEFAULT_FEE,
+    ):
+        """
+        :param addresses: Number of generated wallet addresses.
+        :param utxos: Number of generated unspent outputs (defaults to one per address).
+        :param accounts: Number of accounts the generated addresses are spread over.
+        :param blocks: Height of the generated chain plus one.
+        :param fee: Flat fee paid by every transaction sent through the simulator.
+        """
+        if addresses < 1 or blocks < 1 or accounts < 1:
+            raise ValueError("addresses, accounts and blocks must be positive")
+        self.address_count = addresses
+        self.utxo_count = utxos if utxos is not None else addresses
+        self.account_count = accounts
+        self.generated_blocks = blocks
+        self.fee = _to_satoshis(fee)
+        self.tip = blocks - 1
+        self.lock = threading.RLock()
+
+        # Generated state: one byte per UTXO and one total per address.
+        self.spent = bytearray(self.utxo_count)
+        self.received = array('q', bytes(8 * addresses))
+        account_totals = [0] * accounts
+        received = self.received
+        for i in range(self.utxo_count):
+            satoshis = self._generated_amount(i)
+            k = i * addresses // self.utxo_count
+            received[k] += satoshis
+            account_totals[k % accounts] += satoshis
+        self.balances: Dict[str, int] = {'': 0}
+        self.balances.update((f"acc{j}", total) for j, total in enumerate(account_totals))
+        self._spend_cursor = 0
+
+        # Side tables for everything created through RPCs.
+        self.new_address_accounts: List[str] = []
+        self.new_addresses_by_account: Dict[str, List[int]] = {}
+        self.new_received: Dict[int, int] = {}
+        self.extra_utxos: List[list] = []  # [txid, vout, address index, satoshis, spent]
+        self.extra_by_address: Dict[int, List[int]] = {}
+        self.transactions: Dict[str, Dict] = {}
+        self.mempool: List[str] = []
+        self.block_txs: Dict[int, List[str]] = {}
+        self._tx_counter = 0
+
+    # ------------------------- Identifiers -------------------------
+
+    @staticmethod
+    def block_hash(height: int) -> str:
+        return f"00000000{height:056x}"
+
+    def block_height(self, block_hash: str) -> int:
+        try:
+            height = int(block_hash, 16)
+        except (TypeError, ValueError):
+            raise SimulatorError(-8, "blockhash must be hexadecimal")
+        if len(block_hash) != 64 or not 0 <= height <= self.tip:
+            raise SimulatorError(-5, "Block not found")
+        return height
+
+    @staticmethod
+    def _txid(namespace: int, number: int) -> str:
+        return f"{namespace:02x}{number:062x}"
+
+    @staticmethod
+    def address(index: int) -> str:
+        return f"P{index:033d}"
+
+    def address_index(self, address: str) -> Optional[int]:
+        """
+        Wallet index of ``address``, or None if the wallet does not own it.
+        """
+        if not isinstance(address, str) or len(address) != 34 or address[0] != 'P' or not address[1:].isdigit():
+            return None
+        index = int(address[1:])
+        return index if index < self.address_count + len(self.new_address_accounts) else None
+
+    def account_of(self, index: int) -> str:
+        if index < self.address_count:
+            return f"acc{index % self.account_count}"
+        return self.new_address_accounts[index - self.address_count]
+
+    # ------------------------- Generated Wallet -------------------------
+
+    @staticmethod
+    def _generated_amount(i: int) -> int:
+        return ((i * 2654435761) % 100_000 + 1) * 1000
+
+    def _generated_address(self, i: int) -> int:
+        return i * self.address_count // self.utxo_count
+
+    def _generated_height(self, i: int) -> int:
+        return i * self.generated_blocks // self.utxo_count
+
+    def _first_utxo_of_address(self, k: int) -> int:
+        return -(-k * self.utxo_count // self.address_count)
+
+    def _utxos_at_height(self, height: int) -> range:
+        if height >= self.generated_blocks:
+            return range(0)
+        start = -(-height * self.utxo_count // self.generated_blocks)
+        stop = -(-(height + 1) * self.utxo_count // self.generated_blocks)
+        return range(start, min(stop, self.utxo_count))
+
+    def _generated_entry(self, i: int) -> Dict:
+        k = self._generated_address(i)
+        height = self._generated_height(i)
+        return {
+            'txid': self._txid(_FUNDING, i),
+            'vout': 0,
+            'address': self.address(k),
+            'account': self.account_of(k),
+            'amount': _to_coins(self._generated_amount(i)),
+            'confirmations': self.tip - height + 1,
+            'spendable': True,
+        }
+
+    def _extra_entry(self, n: int) -> Dict:
+        txid, vout, k, satoshis, _ = self.extra_utxos[n]
+        height = self.transactions[txid]['height']
+        return {
+            'txid': txid,
+            'vout': vout,
+            'address': self.address(k),
+            'account': self.account_of(k),
+            'amount': _to_coins(satoshis),
+            'confirmations': 0 if height is None else self.tip - height + 1,
+            'spendable': True,
+        }
+
+    def _unspent_of_address(self, k: int) -> List[Dict]:
+        entries = []
+        if k < self.address_count:
+            for i in range(self._first_utxo_of_address(k), self._first_utxo_of_address(k + 1)):
+                if not self.spent[i]:
+                    entries.append(self._generated_entry(i))
+        for n in self.extra_by_address.get(k, ()):
+            if not self.extra_utxos[n][4]:
+                entries.append(self._extra_entry(n))
+        return entries
+
+    # ------------------------- Chain -------------------------
+
+    def mine(self, count: int = 1) -> List[str]:
+        """
+        Produce ``count`` blocks; the first one confirms everything in the mempool.
+        """
+        hashes = []
+        with self.lock:
+            for _ in range(count):
+                self.tip += 1
+                self.block_txs[self.tip] = self.mempool
+                for txid in self.mempool:
+                    self.transactions[txid]['height'] = self.tip
+                self.mempool = []
+                hashes.append(self.block_hash(self.tip))
+        return hashes
+
+    def getblockchaininfo(self) -> Dict:
+        return {
+            'chain': 'main',
+            'blocks': self.tip,
+            'headers': self.tip,
+            'bestblockhash': self.block_hash(self.tip),
+            'difficulty': 1.0,
+            'mediantime': GENESIS_TIME + BLOCK_SPACING * self.tip,
+            'verificationprogress': 1.0,
+            'initialblockdownload': False,
+            'chainwork': f"{self.tip:064x}",
+            'pruned': False,
+        }
+
+    def getblockcount(self) -> int:
+        return self.tip
+
+    def getbestblockhash(self) -> str:
+        return self.block_hash(self.tip)
+
+    def getblockhash(self, height: int) -> str:
+        if not isinstance(height, int) or not 0 <= height <= self.tip:
+            raise SimulatorError(-8, "Block height out of range")
+        return self.block_hash(height)
+
+    def getblockheader(self, block_hash: str, verbose: bool = True) -> Dict:
+        height = self.block_height(block_hash)
+        header = {'hash': block_hash, 'confirmations': self.tip - height + 1, 'height': height,
+                  'time': GENESIS_TIME + BLOCK_SPACING * height}
+        if height > 0:
+            header['previousblockhash'] = self.block_hash(height - 1)
+        if height < self.tip:
+            header['nextblockhash'] = self.block_hash(height + 1)
+        return header
+
+    def getblock(self, block_hash: str, verbosity: Any = 1) -> Any:
+        height = self.block_height(block_hash)
+        txids = [self._txid(0, height)]
+        txids.extend(self._txid(_FUNDING, i) for i in self._utxos_at_height(height))
+        txids.extend(self.block_txs.get(height, ()))
+        if verbosity in (0, False):
+            return '00' * (80 + 32 * len(txids))
+        block = {
+            'hash': block_hash,
+            'confirmations': self.tip - height + 1,
+            'size': 80 + 250 * len(txids),
+            'height': height,
+            'version': 0x620104,
+            'merkleroot': f"{height:064x}",
+            'tx': txids,
+            'time': GENESIS_TIME + BLOCK_SPACING * height,
+            'nonce': 0,
+            'bits': '1e0ffff0',
+            'difficulty': 1.0,
+        }
+        if height > 0:
+            block['previousblockhash'] = self.block_hash(height - 1)
+        if height < self.tip:
+            block['nextblockhash'] = self.block_hash(height + 1)
+        return block
+
+    def getrawmempool(self, verbose: bool = False) -> Any:
+        if not verbose:
+            return list(self.mempool)
+        return {txid: {'size': self.transactions[txid]['size'], 'fee': _to_coins(self.fee),
+                       'time': self.transactions[txid]['time'], 'height': self.tip}
+                for txid in self.mempool}
+
+    # ------------------------- Wallet Queries -------------------------
+
+    def listunspent(self, minconf: int = 1, maxconf: int = 9999999, addresses: Optional[List[str]] = None) -> List[Dict]:
+        if addresses is not None:
+            entries = []
+            for address in addresses:
+                k = self.address_index(address)
+                if k is None:
+                    raise SimulatorError(-5, f"Invalid Pepecoin address: {address}")
+                entries.extend(self._unspent_of_address(k))
+        else:
+            entries = [self._generated_entry(i) for i in range(self.utxo_count) if not self.spent[i]]
+            entries.extend(self._extra_entry(n) for n, utxo in enumerate(self.extra_utxos) if not utxo[4])
+        return [e for e in entries if minconf <= e['confirmations'] <= maxconf]
+
+    def listreceivedbyaddress(self, minconf: int = 1, include_empty: bool = False, *args) -> List[Dict]:
+        result = []
+        total = self.address_count + len(self.new_address_accounts)
+        for k in range(total):
+            satoshis = self.received[k] if k < self.address_count else self.new_received.get(k, 0)
+            if satoshis or include_empty:
+                account = self.account_of(k)
+                result.append({'address': self.address(k), 'account': account, 'label': account,
+                               'amount': _to_coins(satoshis), 'confirmations': 1})
+        return result
+
+    def getaccount(self, address: str) -> str:
+        k = self.address_index(address)
+        if k is None:
+            raise SimulatorError(-5, "Invalid Pepecoin address")
+        return self.account_of(k)
+
+    def getaddressesbyaccount(self, account: str) -> List[str]:
+        addresses = []
+        if account.startswith('acc') and account[3:].isdigit() and int(account[3:]) < self.account_count:
+            addresses = [self.address(k) for k in range(int(account[3:]), self.address_count, self.account_count)]
+        addresses.extend(self.address(k) for k in self.new_addresses_by_account.get(account, ()))
+        return addresses
+
+    def getnewaddress(self, account: str = '') -> str:
+        with self.lock:
+            index = self.address_count + len(self.new_address_accounts)
+            self.new_address_accounts.append(account)
+            self.new_addresses_by_account.setdefault(account, []).append(index)
+            self.balances.setdefault(account, 0)
+        return self.address(index)
+
+    def getbalance(self, account: str = '*', minconf: int = 1, include_watchonly: bool = False) -> float:
+        if account == '*':
+            return _to_coins(sum(self.balances.values()))
+        return _to_coins(self.balances.get(account, 0))
+
+    def listaccounts(self, minconf: int = 1, include_watchonly: bool = False) -> Dict[str, float]:
+        return {account: _to_coins(satoshis) for account, satoshis in self.balances.items()}
+
+    def move(self, from_account: str, to_account: str, amount, minconf: int = 1, comment: str = '') -> bool:
+        satoshis = _to_satoshis(amount)
+        with self.lock:
+            self.balances[from_account] = self.balances.get(from_account, 0) - satoshis
+            self.balances[to_account] = self.balances.get(to_account, 0) + satoshis
+        return True
+
+    # ------------------------- Sending -------------------------
+
+    def sendfrom(self, from_account: str, to_address: str, amount, minconf: int = 1, *args) -> str:
+        return self._send(from_account, {to_address: amount})
+
+    def sendmany(self, from_account: str, amounts: Dict[str, Any], minconf: int = 1, *args) -> str:
+        if not amounts:
+            raise SimulatorError(-8, "No outputs")
+        return self._send(from_account, amounts)
+
+    def _send(self, from_account: str, amounts: Dict[str, Any]) -> str:
+        outputs = [(address, _to_satoshis(amount)) for address, amount in amounts.items()]
+        if any(satoshis <= 0 for _, satoshis in outputs):
+            raise SimulatorError(-3, "Invalid amount")
+        total = sum(satoshis for _, satoshis in outputs) + self.fee
+        with self.lock:
+            if self.balances.get(from_account, 0) < total:
+                raise SimulatorError(-6, "Account has insufficient funds")
+            inputs, selected = self._select_coins(total)
+            self._tx_counter += 1
+            txid = self._txid(_WALLET, self._tx_counter)
+            change = selected - total
+            if change > 0:
+                outputs.append((self.getnewaddress(''), change))
+            self.balances[from_account] -= total
+            for vout, (address, satoshis) in enumerate(outputs):
+                k = self.address_index(address)
+                if k is None:
+                    continue
+                self.extra_by_address.setdefault(k, []).append(len(self.extra_utxos))
+                self.extra_utxos.append([txid, vout, k, satoshis, False])
+                if change > 0 and vout == len(outputs) - 1:
+                    continue  # change stays outside the account bookkeeping
+                self.balances[self.account_of(k)] += satoshis
+                if k < self.address_count:
+                    self.received[k] += satoshis
+                else:
+                    self.new_received[k] = self.new_received.get(k, 0) + satoshis
+            self.transactions[txid] = {
+                'account': from_account,
+                'inputs': inputs,
+                'outputs': outputs,
+                'change': change > 0,
+                'height': None,
+                'time': int(time.time()),
+                'size': 10 + 148 * len(inputs) + 34 * len(outputs),
+            }
+            self.mempool.append(txid)
+        return txid
+
+    def _select_coins(self, target: int) -> Tuple[List[Tuple[str, int]], int]:
+        generated, extra, selected = [], [], 0
+        cursor = self._spend_cursor
+        while selected < target and cursor < self.utxo_count:
+            if not self.spent[cursor]:
+                generated.append(cursor)
+                selected += self._generated_amount(cursor)
+            cursor += 1
+        for utxo in self.extra_utxos:
+            if selected >= target:
+                break
+            if not utxo[4] and self.transactions[utxo[0]]['height'] is not None:
+                extra.append(utxo)
+                selected += utxo[3]
+        if selected < target:
+            raise SimulatorError(-6, "Insufficient funds")
+
+        self._spend_cursor = cursor
+        for i in generated:
+            self.spent[i] = 1
+        for utxo in extra:
+            utxo[4] = True
+        inputs = [(self._txid(_FUNDING, i), 0) for i in generated] + [(utxo[0], utxo[1]) for utxo in extra]
+        return inputs, selected
+
+    # ------------------------- Transactions -------------------------
+
+    def _tx_outputs(self, txid: str) -> Tuple[List[Tuple[str, int]], Optional[int]]:
+        if txid in self.transactions:
+            tx = self.transactions[txid]
+            return tx['outputs'], tx['height']
+        namespace, number = int(txid[:2], 16), int(txid[2:], 16)
+        if namespace == _FUNDING and number < self.utxo_count:
+            return [(self.address(self._generated_address(number)), self._generated_amount(number))], \
+                self._generated_height(number)
+        raise SimulatorError(-5, "No information available about transaction")
+
+    def gettransaction(self, txid: str, include_watchonly: bool = False) -> Dict:
+        outputs, height = self._tx_outputs(txid)
+        tx = self.transactions.get(txid)
+        details = []
+        for vout, (address, satoshis) in enumerate(outputs):
+            if tx is not None and not (tx['change'] and vout == len(outputs) - 1):
+                details.append({'account': tx['account'], 'address': address, 'category': 'send',
+                                'amount': -_to_coins(satoshis), 'vout': vout, 'fee': -_to_coins(self.fee)})
+            k = self.address_index(address)
+            if k is not None and (tx is None or not (tx['change'] and vout == len(outputs) - 1)):
+                details.append({'account': self.account_of(k), 'address': address, 'category': 'receive',
+                                'amount': _to_coins(satoshis), 'vout': vout})
+        result = {
+            'txid': txid,
+            'amount': _to_coins(sum(s for _, s in outputs)),
+            'confirmations': 0 if height is None else self.tip - height + 1,
+            'time': GENESIS_TIME + BLOCK_SPACING * height if height is not None else tx['time'],
+            'details': details,
+            'hex': self._raw_transaction(txid),
+        }
+        if height is not None:
+            result['blockhash'] = self.block_hash(height)
+            result['blockheight'] = height
+        return result
+
+    def _raw_transaction(self, txid: str) -> str:
+        """
+        Serialized form of a transaction: real inputs and amounts, placeholder scripts.
+        """
+        outputs, _ = self._tx_outputs(txid)
+        tx = self.transactions.get(txid)
+        inputs = tx['inputs'] if tx else [('00' * 32, 0xffffffff)]
+        parts = [struct.pack('<i', 1), _varint(len(inputs))]
+        for prev, n in inputs:
+            parts += [bytes.fromhex(prev)[::-1], struct.pack('<I', n), b'\x00', b'\xff\xff\xff\xff']
+        parts.append(_varint(len(outputs)))
+        for address, satoshis in outputs:
+            script = b'\x76\xa9\x14' + address.encode()[-20:].rjust(20, b'0') + b'\x88\xac'
+            parts += [struct.pack('<q', satoshis), _varint(len(script)), script]
+        parts.append(struct.pack('<I', 0))
+        return b''.join(parts).hex()
+
+    def getrawtransaction(self, txid: str, verbose: Any = False) -> Any:
+        outputs, height = self._tx_outputs(txid)
+        if not verbose:
+            return self._raw_transaction(txid)
+        tx = self.transactions.get(txid)
+        vin = [{'txid': prev, 'vout': n} for prev, n in tx['inputs']] if tx else [{'coinbase': '00'}]
+        result = {
+            'txid': txid,
+            'version': 1,
+            'locktime': 0,
+            'vin': vin,
+            'vout': [{'value': _to_coins(satoshis), 'n': n,
+                      'scriptPubKey': {'type': 'pubkeyhash', 'addresses': [address]}}
+                     for n, (address, satoshis) in enumerate(outputs)],
+            'confirmations': 0 if height is None else self.tip - height + 1,
+        }
+        if height is not None:
+            result['blockhash'] = self.block_hash(height)
+        return result
+
+    def listsinceblock(self, block_hash: str = '', target_confirmations: int = 1, include_watchonly: bool = False) -> Dict:
+        since = self.block_height(block_hash) if block_hash else -1
+        transactions = []
+        for height in range(since + 1, min(self.tip, self.generated_blocks - 1) + 1):
+            for i in self._utxos_at_height(height):
+                entry = self._generated_entry(i)
+                entry.update(category='receive', blockhash=self.block_hash(height), blockheight=height)
+                del entry['spendable']
+                transactions.append(entry)
+        for txid, tx in self.transactions.items():
+            if tx['height'] is not None and tx['height'] <= since:
+                continue
+            for detail in self.gettransaction(txid)['details']:
+                detail.update(txid=txid, confirmations=0 if tx['height'] is None else self.tip - tx['height'] + 1)
+                if tx['height'] is not None:
+                    detail.update(blockhash=self.block_hash(tx['height']), blockheight=tx['height'])
+                transactions.append(detail)
+        last = max(0, self.tip - target_confirmations + 1)
+        return {'transactions': transactions, 'lastblock': self.block_hash(last)}
+
+    # ------------------------- Dispatch -------------------------
+
+    METHODS = (
+        'getblockchaininfo', 'getblockcount', 'getbestblockhash', 'getblockhash', 'getblockheader', 'getblock',
+        'getrawmempool', 'listunspent', 'listreceivedbyaddress', 'getaccount', 'getaddressesbyaccount',
+        'getnewaddress', 'getbalance', 'listaccounts', 'move', 'sendfrom', 'sendmany', 'gettransaction',
+        'getrawtransaction', 'listsinceblock',
+    )
+
+    def dispatch(self, request: Dict) -> Dict:
+        """
+        Answer one decoded JSON-RPC request object.
+
+        Methods run under ``lock``, so readers never iterate state that a send or ``mine()`` is changing.
+        """
+        request_id = request.get('id')
+        method = request.get('method')
+        if method not in self.METHODS:
+            return {'result': None, 'error': {'code': -32601, 'message': 'Method not found'}, 'id': request_id}
+        try:
+            with self.lock:
+                result = getattr(self, method)(*request.get('params', []))
+        except SimulatorError as e:
+            return {'result': None, 'error': {'code': e.code, 'message': e.message}, 'id': request_id}
+        except (TypeError, ValueError, KeyError, IndexError) as e:
+            return {'result': None, 'error': {'code': -1, 'message': str(e)}, 'id': request_id}
+        return {'result': result, 'error': None, 'id': request_id}
+
+
+class PepecoinSimulator:
+    """
+    Serves a ``SimulatedNode`` over JSON-RPC/HTTP with keep-alive, batching,
+    optional basic auth and optional per-request latency.
+
+    Usable as a context manager::
+
+        with PepecoinSimulator(SimulatedNode(addresses=100_000)) as sim:
+            node = Pepecoin('user', 'pass', port=sim.port)
+    """
+
+    def __init__(
+        self,
+        node: Optional[SimulatedNode] = None,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        rpc_user: Optional[str] = None,
+        rpc_password: Optional[str] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        :param node: Simulated state to serve; a default-sized one is created if omitted.
+        :param host: Interface to listen on.
+        :param port: Port to listen on, or 0 for any free port (see ``port`` afterwards).
+        :param rpc_user: If set together with ``rpc_password``, requests must authenticate.
+        :param rpc_password: RPC password.
+        :param latency: Seconds added to every HTTP request.
+        :param jitter: Maximum extra random seconds added to every HTTP request.
+        :param seed: Seed for the jitter.
+        """
+        self.node = node or SimulatedNode()
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._auth = None
+        if rpc_user is not None and rpc_password is not None:
+            self._auth = 'Basic ' + base64.b64encode(f"{rpc_user}:{rpc_password}".encode('utf8')).decode('ascii')
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if simulator._auth is not None and self.headers.get('Authorization') != simulator._auth:
+                    self.send_response(401)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                status, data = simulator.handle(body)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.host, self.port = self.httpd.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    def handle(self, body: bytes) -> Tuple[int, bytes]:
+        """
+        Answer a raw request body; returns the HTTP status and response body.
+        """
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            payload = json.loads(body, parse_float=decimal.Decimal)
+        except ValueError:
+            response, status = {'result': None, 'error': {'code': -32700, 'message': 'Parse error'}, 'id': None}, 500
+        else:
+            if isinstance(payload, list):
+                response, status = [self.node.dispatch(item) for item in payload], 200
+            else:
+                response = self.node.dispatch(payload)
+                status = 500 if response['error'] else 200
+        return status, json.dumps(response, default=float).encode('utf8')
+
+    def start(self) -> 'PepecoinSimulator':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="pepecoin-simulator", daemon=True)
+        self._thread.start()
+        logger.info(f"Simulated Pepecoin node listening on {self.host}:{self.port}")
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'PepecoinSimulator':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a simulated Pepecoin node.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=33873)
+    parser.add_argument('--rpc-user')
+    parser.add_argument('--rpc-password')
+    parser.add_argument('--addresses', type=int, default=10_000)
+    parser.add_argument('--utxos', type=int)
+    parser.add_argument('--accounts', type=int, default=100)
+    parser.add_argument('--blocks', type=int, default=10_000)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--block-interval', type=float, default=0.0, help="mine a block every N seconds")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    node = SimulatedNode(args.addresses, args.utxos, args.accounts, args.blocks)
+    simulator = PepecoinSimulator(node, args.host, args.port, args.rpc_user, args.rpc_password,
+                                  args.latency_ms / 1000, args.jitter_ms / 1000)
+    simulator.start()
+    try:
+        while True:
+            if args.block_interval:
+                time.sleep(args.block_interval)
+                node.mine()
+            else:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
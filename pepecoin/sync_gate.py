@@ -0,0 +1,147 @@
+# pepecoin/sync_gate.py
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYNC_CACHE_TTL = 30.0
+DEFAULT_MAX_HEADER_GAP = 10
+
+
+class SyncState:
+    """
+    Sync verdict derived from successive ``getblockchaininfo`` results.
+
+    Until the node is first seen synchronized, the verdict follows the same rule
+    as ``Pepecoin.is_sync_needed``. After that the (time-based, and therefore
+    drifting) ``verificationprogress`` estimate is ignored: the verdict is only
+    re-evaluated when the tip moves or headers run more than ``max_header_gap``
+    blocks ahead of the validated chain.
+    """
+
+    __slots__ = ('max_header_gap', 'synced', 'tip', 'checked_at')
+
+    def __init__(self, max_header_gap: int = DEFAULT_MAX_HEADER_GAP):
+        self.max_header_gap = max_header_gap
+        self.synced: Optional[bool] = None
+        self.tip: Optional[str] = None
+        self.checked_at: Optional[float] = None
+
+    def update(self, info: Dict) -> bool:
+        """
+        Fold a fresh ``getblockchaininfo`` result into the state and return the verdict.
+        """
+        is_initial_download = info.get('initialblockdownload', True)
+        verification_progress = info.get('verificationprogress', 0)
+        tip = info.get('bestblockhash')
+        gap = info.get('headers', 0) - info.get('blocks', 0)
+
+        previous = self.synced
+        if self.synced and tip == self.tip and gap <= self.max_header_gap:
+            pass  # Nothing moved; keep the cached verdict.
+        elif self.synced:
+            self.synced = not is_initial_download and gap <= self.max_header_gap
+        else:
+            self.synced = not is_initial_download and verification_progress >= 0.9999
+
+        self.tip = tip
+        self.checked_at = time.monotonic()
+        if previous != self.synced:
+            if self.synced:
+                logger.info("Node is fully synchronized with the network.")
+            else:
+                logger.warning(f"Node is still syncing (headers ahead by {gap} blocks, "
+                               f"verification progress {verification_progress * 100:.2f}%).")
+        return self.synced
+
+    def invalidate(self) -> None:
+        """
+        Forget the verdict so the next check goes to the node.
+        """
+        self.synced = None
+        self.checked_at = None
+
+    def is_fresh(self, ttl: float) -> bool:
+        return self.checked_at is not None and time.monotonic() - self.checked_at < ttl
+
+
+class SyncGate:
+    """
+    In-memory sync check for write paths such as ``send_from`` and address generation.
+
+    A daemon thread refreshes the state every ``ttl`` seconds, so once the node is
+    synchronized ``is_synced()`` answers without an RPC. While the node is not yet
+    synchronized (or the last refresh failed) the check goes to the node whenever
+    the cached verdict is older than ``ttl``.
+    """
+
+    def __init__(
+        self,
+        rpc_connection,
+        ttl: float = DEFAULT_SYNC_CACHE_TTL,
+        max_header_gap: int = DEFAULT_MAX_HEADER_GAP,
+        background: bool = True,
+    ):
+        """
+        :param rpc_connection: RPC transport used to call ``getblockchaininfo``.
+        :param ttl: Seconds between refreshes of the cached state.
+        :param max_header_gap: Header/block gap above which a synced node is considered syncing again.
+        :param background: Refresh in a daemon thread instead of on the caller's thread.
+        """
+        self.rpc_connection = rpc_connection
+        self.ttl = ttl
+        self.background = background
+        self.state = SyncState(max_header_gap)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_synced(self) -> bool:
+        """
+        Return True if the node is synchronized, using the cached state when possible.
+        """
+        self._start_refresher()
+        state = self.state
+        if state.synced and (self.background or state.is_fresh(self.ttl)):
+            return True
+        with self._lock:
+            if not self.state.is_fresh(self.ttl):
+                self._refresh()
+            return bool(self.state.synced)
+
+    def refresh(self) -> bool:
+        """
+        Query the node now and return the updated verdict.
+        """
+        with self._lock:
+            self._refresh()
+            return bool(self.state.synced)
+
+    def _refresh(self) -> None:
+        try:
+            self.state.update(self.rpc_connection.getblockchaininfo())
+        except Exception as e:
+            logger.error(f"Error checking synchronization status: {e}")
+            self.state.invalidate()
+
+    def _start_refresher(self) -> None:
+        if not self.background or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pepecoin-sync-gate", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.ttl):
+            with self._lock:
+                self._refresh()
+
+    def stop(self) -> None:
+        """
+        Stop the background refresher.
+        """
+        self._stop.set()
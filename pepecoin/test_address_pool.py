@@ -0,0 +1,63 @@
+# pepecoin/test_address_pool.py
+
+import itertools
+import time
+
+from pepecoin.account import Account
+from pepecoin.address_pool import AddressPool
+from pepecoin.transport import RPCTransport
+
+
+def address_handlers():
+    counter = itertools.count()
+    calls = []
+
+    def getnewaddress(account):
+        calls.append(account)
+        return f"P{account}{next(counter)}"
+
+    return {'getnewaddress': getnewaddress}, calls
+
+
+def test_pool_refills_in_batches_and_never_reissues(fake_rpc, tmp_path):
+    handlers, calls = address_handlers()
+    server = fake_rpc(handlers)
+    transport = RPCTransport('user', 'pass', port=server.port)
+    state = str(tmp_path / 'pool.json')
+
+    pool = AddressPool(transport, 'shop', state_path=state, low_water=5, refill_batch=10, background=False)
+    pool.refill()
+    assert len(pool) == 10 and server.requests == 1
+
+    snapshot = open(state).read()
+    issued = [pool.pop() for _ in range(4)]
+    assert server.requests == 1
+    assert open(state).read() == snapshot  # checkouts only append to the issued log
+    assert open(state + '.issued').read().split() == issued
+    issued.append(pool.pop())  # drops to the low-water mark: one batched refill
+    assert server.requests == 2 and len(pool) == 15
+    issued.append(pool.pop())
+    pool.stop()
+
+    restarted = AddressPool(transport, 'shop', state_path=state, low_water=5, refill_batch=10, background=False)
+    reissued = [restarted.pop() for _ in range(len(restarted))]
+    assert not set(issued) & set(reissued)
+    assert len(set(issued + reissued)) == len(issued + reissued)
+
+
+def test_account_uses_background_pool(fake_rpc):
+    handlers, calls = address_handlers()
+    server = fake_rpc(handlers)
+    transport = RPCTransport('user', 'pass', port=server.port)
+    pool = AddressPool(transport, 'shop', low_water=2, refill_batch=8)
+    try:
+        deadline = time.monotonic() + 5
+        while len(pool) < 8 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        account = Account('user', 'pass', account_name='shop', transport=transport, address_pool=pool)
+        requests = server.requests
+        addresses = [account.generate_address() for _ in range(3)]
+        assert len(set(addresses)) == 3
+        assert server.requests == requests and len(pool) == 5
+    finally:
+        pool.stop()
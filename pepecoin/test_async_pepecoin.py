@@ -0,0 +1,79 @@
+# pepecoin/test_async_pepecoin.py
+
+import asyncio
+from decimal import Decimal
+
+from pepecoin.async_pepecoin import AsyncPepecoin
+from pepecoin.conftest import FakeRPCError
+
+
+def getbalance(account=None, *args):
+    if account == 'missing':
+        raise FakeRPCError(-11, 'Invalid account name')
+    return Decimal('1.5') if account else Decimal('100.00000001')
+
+
+HANDLERS = {
+    'getblockchaininfo': lambda: {'blocks': 10, 'headers': 10, 'initialblockdownload': False, 'verificationprogress': 1},
+    'getbalance': getbalance,
+    'getblockhash': lambda height: f"{height:064x}",
+    'getnewaddress': lambda account='': f"P{account}",
+}
+
+
+def test_concurrent_calls_multiplex_over_few_sockets(fake_rpc):
+    server = fake_rpc(HANDLERS)
+
+    async def main():
+        async with AsyncPepecoin('user', 'pass', port=server.port, max_concurrency=4) as node:
+            balances = await asyncio.gather(*(node.get_balance(f"acc{i}") for i in range(500)))
+            assert len(node.rpc_connection._idle) <= 4
+            return balances
+
+    assert asyncio.run(main()) == [Decimal('1.5')] * 500
+
+
+def test_batch_accounts_and_errors(fake_rpc):
+    server = fake_rpc(HANDLERS)
+
+    async def main():
+        async with AsyncPepecoin('user', 'pass', port=server.port) as node:
+            hashes = await node.get_block_hashes(range(3))
+            total = await node.get_balance()
+            missing = await node.get_balance('missing')
+            address = await node.get_account('shop').generate_address()
+            return hashes, total, missing, address
+
+    hashes, total, missing, address = asyncio.run(main())
+    assert hashes == [f"{h:064x}" for h in range(3)]
+    assert total == Decimal('100.00000001')
+    assert missing is None
+    assert address == 'Pshop'
+
+
+def test_node_and_multi_account_helpers(fake_rpc):
+    sent = []
+
+    def sendfrom(account, address, amount, *args):
+        sent.append((account, address, amount))
+        return f"tx-{account}"
+
+    server = fake_rpc(dict(HANDLERS, sendfrom=sendfrom, uptime=lambda: 42,
+                           getpeerinfo=lambda: [{'id': 0}], addnode=lambda node, command: None))
+
+    async def main():
+        async with AsyncPepecoin('user', 'pass', port=server.port, sync_cache_ttl=None) as node:
+            assert await node.get_node_uptime() == 42
+            assert await node.get_peer_info() == [{'id': 0}]
+            assert await node.add_node('10.0.0.1:33874') is True
+            mass = await node.mass_transfer_from_accounts(['a', 'b'], 'Pdest', [1, 2])
+            merged = await node.consolidate_accounts(['c', 'd'], 'vault')
+            failed = await node.consolidate_accounts(['e', 'missing'], 'vault')
+            return mass, merged, failed
+
+    mass, merged, failed = asyncio.run(main())
+    assert mass == ['tx-a', 'tx-b']
+    assert merged == ['tx-c', 'tx-d']
+    assert failed == []  # the 'missing' account fails the balance batch
+    assert sorted(sent) == [('a', 'Pdest', 1), ('b', 'Pdest', 2),
+                            ('c', 'Pvault', Decimal('1.5')), ('d', 'Pvault', Decimal('1.5'))]
@@ -0,0 +1,67 @@
+# pepecoin/test_balances.py
+
+from decimal import Decimal
+
+import pytest
+
+from pepecoin import Pepecoin
+from pepecoin.balances import BalanceTracker
+from pepecoin.simulator import PepecoinSimulator, SimulatedNode
+from pepecoin.transport import RPCTransport
+
+
+@pytest.fixture
+def simulator():
+    node = SimulatedNode(addresses=200, utxos=1000, accounts=5, blocks=100)
+    with PepecoinSimulator(node, rpc_user='user', rpc_password='pass') as sim:
+        yield sim
+
+
+def expected_by_address(transport, minconf):
+    totals = {}
+    for u in transport.listunspent(minconf, 9999999):
+        totals[u['address']] = totals.get(u['address'], Decimal(0)) + u['amount']
+    return totals
+
+
+def test_snapshot_matches_per_account_and_per_address_calls(simulator):
+    transport = RPCTransport('user', 'pass', port=simulator.port)
+    snapshot = BalanceTracker(transport).refresh()
+
+    assert snapshot.height == 99
+    assert snapshot.account_balances(1) == transport.listaccounts(1)
+    for minconf in (0, 1, 6):
+        assert snapshot.address_balances(minconf) == expected_by_address(transport, minconf)
+    with pytest.raises(ValueError):
+        snapshot.account('acc1', minconf=3)
+
+
+def test_incremental_refresh_follows_sends_and_blocks(simulator):
+    node = simulator.node
+    transport = RPCTransport('user', 'pass', port=simulator.port)
+    tracker = BalanceTracker(transport)
+    tracker.refresh()
+
+    deposit = node.address(7)
+    node.sendfrom('acc1', deposit, 3)
+    snapshot = tracker.refresh()
+    assert tracker._incremental == 1
+    for minconf in (0, 1, 6):
+        assert snapshot.address_balances(minconf) == expected_by_address(transport, minconf)
+
+    for _ in range(7):
+        node.mine()
+        node.sendmany('acc2', {node.address(9): 1, 'Pexternal': 2})
+        snapshot = tracker.refresh()
+        for minconf in (0, 1, 6):
+            assert snapshot.address_balances(minconf) == expected_by_address(transport, minconf)
+    assert snapshot.account('acc2', minconf=0) == transport.getbalance('acc2')
+
+
+def test_pepecoin_reuses_tracker(simulator):
+    node = Pepecoin('user', 'pass', port=simulator.port, lazy=True, setup_logging=False, sync_cache_ttl=None)
+    first = node.get_balance_snapshot()
+    simulator.node.mine()
+    second = node.get_balance_snapshot()
+    assert second.height == first.height + 1 and node.balance_tracker._incremental == 1
+    node.close()
@@ -0,0 +1,29 @@
+# pepecoin/test_block_iterator.py
+
+import pytest
+from bitcoinrpc.authproxy import JSONRPCException
+
+from pepecoin.block_iterator import BlockPrefetcher
+from pepecoin.conftest import FakeRPCError
+from pepecoin.transport import RPCTransport
+
+
+def block_hash(height):
+    if height > 100:
+        raise FakeRPCError(-8, 'Block height out of range')
+    return f"{height:064x}"
+
+
+def test_block_prefetcher_yields_in_order_and_stops_early(fake_rpc):
+    server = fake_rpc({'getblockhash': block_hash, 'getblock': lambda h: {'height': int(h, 16)}})
+    transport = RPCTransport('user', 'pass', port=server.port)
+
+    blocks = list(BlockPrefetcher(transport, 3, 57, prefetch=8))
+    assert [b['height'] for b in blocks] == list(range(3, 58))
+
+    with pytest.raises(JSONRPCException):
+        list(BlockPrefetcher(transport, 95, 105, prefetch=4))
+
+    iterator = iter(BlockPrefetcher(transport, 0, 100, prefetch=4))
+    assert next(iterator)['height'] == 0
+    iterator.close()
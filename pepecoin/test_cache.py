@@ -0,0 +1,79 @@
+# pepecoin/test_cache.py
+
+from decimal import Decimal
+
+from pepecoin import Pepecoin
+from pepecoin.cache import LRUCache, ObjectCache
+
+CONFIRMED_TX = {'txid': 'aa', 'blockhash': 'b1', 'confirmations': 10,
+                'vout': [{'value': Decimal('12345678.12345678'), 'n': 0}]}
+MEMPOOL_TX = {'txid': 'bb', 'confirmations': 0, 'vout': [{'value': Decimal('0.00000001'), 'n': 0}]}
+
+
+def test_lru_is_bounded_by_bytes():
+    lru = LRUCache(max_bytes=10)
+    lru.put('a', b'12345')
+    lru.put('b', b'12345')
+    lru.get('a')
+    lru.put('c', b'12345')
+    assert lru.get('b') is None
+    assert lru.get('a') == b'12345' and lru.get('c') == b'12345'
+    assert lru.size == 10
+
+
+def test_confirmed_objects_survive_restart_and_mempool_does_not(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ObjectCache(path)
+    cache.put_transaction('aa', CONFIRMED_TX)
+    cache.put_transaction('bb', MEMPOOL_TX)
+    cache.put_block('b1', {'hash': 'b1', 'height': 7, 'confirmations': 100})
+    assert cache.get_transaction('bb') == MEMPOOL_TX
+    cache.close()
+
+    cache = ObjectCache(path)
+    assert cache.get_transaction('aa') == CONFIRMED_TX
+    assert cache.get_transaction('bb') is None
+    assert cache.get_block('b1')['height'] == 7
+    assert cache.stats()['disk_hits'] == 2 and cache.stats()['misses'] == 1
+
+    cache.purge_from_height(7)
+    assert cache.get_block('b1') is None
+    assert cache.get_transaction('aa') is None
+
+
+def test_reorg_purges_transactions_cached_without_their_blocks(tmp_path):
+    cache = ObjectCache(str(tmp_path / 'cache.sqlite'))
+    cache.put_transaction('aa', CONFIRMED_TX, height=7)
+    cache.put_transaction('cc', {'txid': 'cc', 'blockhash': 'b0', 'confirmations': 10}, height=6)
+    cache.put_block('b0', '00ff', verbosity=0, height=6)
+
+    cache.purge_from_height(7)
+    assert cache.get_transaction('aa') is None
+    assert cache.get_transaction('cc')['blockhash'] == 'b0'
+    assert cache.get_block('b0', verbosity=0) == '00ff'
+
+    cache.purge_from_height(6)
+    assert cache.get_transaction('cc') is None
+    assert cache.get_block('b0', verbosity=0) is None
+
+
+def test_pepecoin_caches_transactions_with_block_heights(fake_rpc, tmp_path):
+    transactions = {'aa': CONFIRMED_TX, 'bb': MEMPOOL_TX}
+    server = fake_rpc({
+        'getrawtransaction': lambda txid, verbose: transactions[txid],
+        'getblockheader': lambda block_hash: {'hash': block_hash, 'height': 7},
+    })
+    cache = ObjectCache(str(tmp_path / 'cache.sqlite'))
+    node = Pepecoin('user', 'pass', port=server.port, lazy=True, setup_logging=False,
+                    sync_cache_ttl=None, cache=cache)
+
+    assert node.get_raw_transactions(['aa', 'bb']) == [CONFIRMED_TX, MEMPOOL_TX]
+    assert cache.block_height('b1') == 7
+    requests = server.requests
+    assert node.get_raw_transaction('aa') == CONFIRMED_TX
+    assert server.requests == requests
+
+    cache.purge_from_height(8)
+    assert cache.get_transaction('aa') == CONFIRMED_TX
+    cache.purge_from_height(7)
+    assert cache.get_transaction('aa') is None
@@ -0,0 +1,60 @@
+# pepecoin/test_codec.py
+
+import json
+from decimal import Decimal
+
+import pytest
+from bitcoinrpc.authproxy import JSONRPCException
+
+from pepecoin.codec import ArrayStreamDecoder, OrjsonCodec, StdlibCodec, get_codec
+from pepecoin.conftest import FakeRPCError
+from pepecoin.transport import RPCTransport
+
+BODIES = [
+    b'{"result":["' + b'ab' * 32 + b'"],"error":null,"id":1}',
+    b'{"result":{"amount":21000000.12345678,"fee":1e-05,"confirmations":6},"error":null,"id":2}',
+    b'{"result":{"nonce":' + str(2 ** 70).encode() + b'},"error":null,"id":3}',
+    b'{"result":{"amount":1e5,"scaled":[2E+3, -7e2]},"error":null,"id":4}',
+    b'{"result":{"hash":"3e5f' + b'0e' * 30 + b'","account":"EVE"},"error":null,"id":5}',
+]
+
+
+@pytest.mark.parametrize('body', BODIES)
+def test_orjson_codec_matches_stdlib_decimals(body):
+    pytest.importorskip('orjson')
+    decoded = OrjsonCodec().decode(body)
+    assert decoded == StdlibCodec().decode(body)
+    assert repr(decoded) == repr(json.loads(body, parse_float=Decimal))
+
+
+def test_get_codec_resolves_names():
+    assert isinstance(get_codec('json'), StdlibCodec)
+    assert get_codec(None).name in ('json', 'orjson')
+    with pytest.raises(TypeError):
+        get_codec(42)
+
+
+def test_call_raw_returns_undecoded_body(fake_rpc):
+    def fail():
+        raise FakeRPCError(-5, 'Block not found')
+
+    server = fake_rpc({'getbalance': lambda: Decimal('1.00000001'), 'getblock': fail})
+    transport = RPCTransport('user', 'pass', port=server.port, codec='json')
+
+    raw = transport.call_raw('getbalance')
+    assert isinstance(raw, bytes)
+    assert json.loads(raw, parse_float=Decimal)['result'] == Decimal('1.00000001')
+    with pytest.raises(JSONRPCException):
+        transport.call_raw('getblock')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_array_stream_decoder_yields_elements_across_chunks(chunk_size):
+    body = json.dumps({'result': {'transactions': [{'n': i, 'amount': 0.5} for i in range(20)] + [3],
+                                  'lastblock': 'ff'}, 'error': None, 'id': 1}).encode()
+    stream = ArrayStreamDecoder((body[i:i + chunk_size] for i in range(0, len(body), chunk_size)), 'transactions')
+
+    elements = list(stream)
+    assert elements[:20] == [{'n': i, 'amount': Decimal('0.5')} for i in range(20)]
+    assert elements[20] == 3
+    assert stream.value('lastblock') == 'ff' and stream.value('error') is None
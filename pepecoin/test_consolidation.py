@@ -0,0 +1,56 @@
+# pepecoin/test_consolidation.py
+
+from decimal import Decimal
+
+from pepecoin.consolidation import UTXOConsolidator, estimate_size, fee_for_size
+
+
+def make_unspent(address, count, amount='0.5', account=''):
+    return [{'txid': f"{address}-{i}", 'vout': 0, 'address': address, 'account': account,
+             'amount': Decimal(amount), 'confirmations': 10, 'spendable': True} for i in range(count)]
+
+
+class FakeWallet:
+    def __init__(self, unspent):
+        self.unspent = unspent
+        self.created = []
+        self.sent = []
+
+    def listunspent(self, minconf, *args):
+        return self.unspent
+
+    def createrawtransaction(self, inputs, outputs):
+        self.created.append((inputs, outputs))
+        return f"raw{len(self.created)}"
+
+    def signrawtransaction(self, raw):
+        return {'hex': 'signed-' + raw, 'complete': True}
+
+    def sendrawtransaction(self, hex_string):
+        self.sent.append(hex_string)
+        return f"tx{len(self.sent)}"
+
+
+def test_dry_run_chunks_by_size_and_skips_small_groups():
+    wallet = FakeWallet(make_unspent('Pa', 1500) + make_unspent('Pb', 1) + make_unspent('Pc', 3, amount='0.0001'))
+    consolidator = UTXOConsolidator(wallet, fee_rate=Decimal('0.01'), max_tx_bytes=50_000)
+
+    report = consolidator.run(dry_run=True)
+
+    assert consolidator.max_inputs == (50_000 - estimate_size(0)) // 148
+    assert [len(tx.inputs) for tx in report.transactions] == [337, 337, 337, 337, 152]
+    assert all(tx.size <= 50_000 for tx in report.transactions)
+    assert report.input_count == 1500
+    assert report.total_fees == sum(fee_for_size(tx.size, Decimal('0.01')) for tx in report.transactions)
+    assert wallet.created == []
+
+
+def test_run_by_account_signs_and_broadcasts():
+    wallet = FakeWallet(make_unspent('Pa', 3, account='deposits') + make_unspent('Pb', 2, '2', account='deposits'))
+    report = UTXOConsolidator(wallet, fee_rate=Decimal('0.01')).run(group_by='account')
+
+    assert report.txids == ['tx1']
+    inputs, outputs = wallet.created[0]
+    assert len(inputs) == 5
+    assert outputs == {'Pb': Decimal('5.5') - report.total_fees}
+    assert wallet.sent == ['signed-raw1']
@@ -0,0 +1,107 @@
+# pepecoin/test_fee_oracle.py
+
+from decimal import Decimal
+
+import pytest
+
+from pepecoin import Pepecoin
+from pepecoin.conftest import FakeRPCError
+from pepecoin.fee_oracle import FeeOracle
+from pepecoin.transport import RPCTransport
+
+
+@pytest.fixture
+def chain(fake_rpc):
+    state = {'tip': 'aa', 'height': 100, 'rate': Decimal('0.01'), 'fail': False, 'tip_fail': False}
+
+    def getbestblockhash():
+        if state['tip_fail']:
+            raise FakeRPCError(-28, 'Loading block index...')
+        return state['tip']
+
+    def estimatesmartfee(target, mode):
+        if state['fail']:
+            raise FakeRPCError(-1, 'Estimation failed')
+        if state['rate'] is None:
+            return {'errors': ['Insufficient data or no feerate found'], 'blocks': 0}
+        return {'feerate': state['rate'] * target, 'blocks': target}
+
+    server = fake_rpc({
+        'getbestblockhash': getbestblockhash,
+        'getblockcount': lambda: state['height'],
+        'estimatesmartfee': estimatesmartfee,
+    })
+    return state, server
+
+
+def test_estimates_are_served_from_memory(chain):
+    state, server = chain
+    oracle = FeeOracle(RPCTransport('user', 'pass', port=server.port), targets=(1, 6),
+                       poll_interval=60, background=False)
+
+    for _ in range(100):
+        estimate = oracle.estimate(6)
+    assert estimate.feerate == Decimal('0.06') and estimate.height == 100 and not estimate.stale
+    assert oracle.estimate(3).feerate == Decimal('0.01')  # nearest smaller target
+    assert server.requests == 2  # one tip check, one batch for both targets
+
+
+def test_new_tip_recomputes_once(chain):
+    state, server = chain
+    oracle = FeeOracle(RPCTransport('user', 'pass', port=server.port), targets=(2,), background=False)
+    oracle.refresh()
+    oracle.refresh()
+    assert server.requests == 3
+
+    state.update(tip='bb', height=101, rate=Decimal('0.02'))
+    oracle.refresh()
+    assert oracle.estimate(2).feerate == Decimal('0.04') and oracle.height == 101
+
+
+@pytest.mark.parametrize('failure', ['fail', 'rate'])
+def test_node_errors_keep_last_value_as_stale(chain, failure):
+    state, server = chain
+    oracle = FeeOracle(RPCTransport('user', 'pass', port=server.port), targets=(1,), background=False)
+    oracle.refresh()
+
+    state.update(tip='bb', **{failure: True if failure == 'fail' else None})
+    oracle.refresh()
+    estimate = oracle.estimate(1)
+    assert estimate.feerate == Decimal('0.01') and estimate.stale and estimate.errors
+
+    state.update(fail=False, rate=Decimal('0.03'))
+    if failure == 'rate':
+        oracle.refresh(force=True)  # the node answered for this tip; only a new block or force retries
+    else:
+        oracle.refresh()
+    assert oracle.estimate(1) == (1, Decimal('0.03'), 1, 100, False, ())
+
+
+def test_failed_tip_check_is_not_stale_after_recovery(chain):
+    state, server = chain
+    oracle = FeeOracle(RPCTransport('user', 'pass', port=server.port), targets=(1,), background=False)
+    oracle.refresh()
+
+    state['tip_fail'] = True
+    oracle.refresh()
+    assert oracle.estimate(1).stale
+
+    state['tip_fail'] = False
+    oracle.refresh()  # same tip as before the failure
+    assert oracle.estimate(1) == (1, Decimal('0.01'), 1, 100, False, ())
+
+
+def test_pepecoin_estimate_smart_fee_uses_oracle(chain):
+    state, server = chain
+    node = Pepecoin('user', 'pass', port=server.port, lazy=True, setup_logging=False, sync_cache_ttl=None)
+    node.get_fee_oracle(targets=(1, 6), poll_interval=60)
+    for _ in range(10):
+        fee = node.estimate_smart_fee(6)
+    assert fee == {'feerate': Decimal('0.06'), 'blocks': 6, 'stale': False}
+    assert server.requests == 2
+    assert node.get_fee_oracle(targets=(6, 1)) is node.fee_oracle
+    with pytest.raises(ValueError):
+        node.get_fee_oracle(targets=(2,))
+    with pytest.raises(ValueError):
+        node.get_fee_oracle(poll_interval=5)
+    node.close()
@@ -0,0 +1,71 @@
+# pepecoin/test_history.py
+
+from decimal import Decimal
+
+import pytest
+
+from pepecoin import Pepecoin
+from pepecoin.history import HistoryCursor, WalletHistory
+from pepecoin.simulator import PepecoinSimulator, SimulatedNode
+from pepecoin.transport import RPCTransport
+
+
+@pytest.fixture
+def simulator():
+    node = SimulatedNode(addresses=500, utxos=3000, accounts=10, blocks=100)
+    with PepecoinSimulator(node, rpc_user='user', rpc_password='pass') as sim:
+        yield sim
+
+
+def test_full_pass_streams_every_entry_and_advances_cursor(simulator):
+    node = Pepecoin('user', 'pass', port=simulator.port, sync_cache_ttl=None, setup_logging=False)
+    try:
+        expected = node.rpc_connection.listsinceblock('', 1, False)
+        history = node.get_wallet_history()
+        records = list(history)
+
+        assert [r.key for r in records] == [f"{t['txid']}:{t['vout']}:receive" for t in expected['transactions']]
+        assert sum(r.amount for r in records) == sum(t['amount'] for t in expected['transactions'])
+        assert history.cursor == HistoryCursor(expected['lastblock'])
+
+        txid = node.send_from('acc1', simulator.node.address(3), Decimal('2'))
+        simulator.node.mine()
+        assert {r.txid for r in history} == {txid}
+        shop = node.get_account('acc3').iter_history(cursor=HistoryCursor(expected['lastblock']))
+        assert [(r.category, r.amount) for r in shop] == [('receive', Decimal('2'))]
+    finally:
+        node.close()
+
+
+def test_resumes_from_saved_checkpoint(simulator, tmp_path):
+    state_path = str(tmp_path / 'history.json')
+    transport = RPCTransport('user', 'pass', port=simulator.port)
+    total = len(transport.listsinceblock('', 1, False)['transactions'])
+
+    first = WalletHistory(transport, state_path=state_path, checkpoint_every=100)
+    delivered = []
+    for record in first:
+        delivered.append(record.key)
+        if len(delivered) == 250:
+            break  # crash after processing 250 entries; 200 were checkpointed
+
+    second = WalletHistory(transport, state_path=state_path, checkpoint_every=100)
+    assert second.cursor.position == 200
+    delivered.extend(r.key for r in second)
+
+    assert len(delivered) == total + 50  # entries 201-250 are delivered twice
+    assert len(set(delivered)) == total
+    transport.close()
+
+
+def test_restarts_pass_when_history_changed_under_cursor(fake_rpc):
+    entries = [{'txid': f"{i:064x}", 'vout': 0, 'category': 'receive', 'account': 'a', 'amount': Decimal(1)}
+               for i in range(5)]
+    server = fake_rpc({'listsinceblock': lambda *a: {'transactions': entries, 'lastblock': 'ff'}})
+    transport = RPCTransport('user', 'pass', port=server.port)
+
+    stale = HistoryCursor('', 3, 'not-the-third-entry')
+    records = list(WalletHistory(transport, cursor=stale))
+
+    assert len(records) == 5
+    transport.close()
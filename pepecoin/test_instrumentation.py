@@ -0,0 +1,51 @@
+# pepecoin/test_instrumentation.py
+
+import urllib.request
+
+import pytest
+from bitcoinrpc.authproxy import JSONRPCException
+
+from pepecoin.conftest import FakeRPCError
+from pepecoin.instrumentation import CallbackObserver, RPCMetrics
+from pepecoin.transport import RPCTransport
+
+
+def failing(*args):
+    raise FakeRPCError(-5, 'Invalid address')
+
+
+def test_metrics_record_latency_bytes_errors_and_in_flight(fake_rpc):
+    server = fake_rpc({'getblockcount': lambda: 42, 'validateaddress': failing, 'getblockhash': lambda h: f"h{h}"})
+    transport = RPCTransport('user', 'pass', port=server.port)
+    metrics = RPCMetrics()
+    events = []
+    transport.add_observer(metrics)
+    transport.add_observer(CallbackObserver(events.append))
+
+    assert transport.getblockcount() == 42
+    with pytest.raises(JSONRPCException):
+        transport.validateaddress('bogus')
+    transport.batch([('getblockhash', 1), ('validateaddress', 'x'), ('getblockhash', 2)])
+
+    snapshot = metrics.snapshot()
+    assert snapshot['getblockcount']['count'] == 1
+    assert snapshot['getblockcount']['buckets'][-1] == (float('inf'), 1)
+    assert snapshot['getblockcount']['request_bytes'] > 0 and snapshot['getblockcount']['response_bytes'] > 0
+    assert snapshot['validateaddress']['errors'] == {-5: 1}
+    assert snapshot['batch:getblockhash+validateaddress']['errors'] == {-5: 1}
+    assert all(stats['in_flight'] == 0 for stats in snapshot.values())
+    assert [(e.method, e.calls) for e in events] == [('getblockcount', 1), ('validateaddress', 1),
+                                                         ('batch:getblockhash+validateaddress', 3)]
+
+    http = metrics.serve(port=0)
+    try:
+        url = f"http://127.0.0.1:{http.server_address[1]}/metrics"
+        text = urllib.request.urlopen(url).read().decode()
+    finally:
+        metrics.stop_serving()
+    assert 'pepecoin_rpc_duration_seconds_count{method="getblockcount"} 1' in text
+    assert 'pepecoin_rpc_errors_total{method="validateaddress",code="-5"} 1' in text
+
+    transport.remove_observer(metrics)
+    transport.getblockcount()
+    assert metrics.snapshot()['getblockcount']['count'] == 1
@@ -0,0 +1,54 @@
+# pepecoin/test_mempool.py
+
+import queue
+from decimal import Decimal
+
+import pytest
+
+from pepecoin import Pepecoin
+from pepecoin.mempool import ADDED, REMOVED
+from pepecoin.simulator import PepecoinSimulator, SimulatedNode
+
+
+@pytest.fixture
+def node():
+    sim_node = SimulatedNode(addresses=100, utxos=500, accounts=5, blocks=50)
+    with PepecoinSimulator(sim_node, rpc_user='user', rpc_password='pass') as sim:
+        client = Pepecoin('user', 'pass', port=sim.port, lazy=True, setup_logging=False, sync_cache_ttl=None)
+        yield client, sim
+        client.close()
+
+
+def test_tracker_reports_additions_and_removals(node):
+    client, sim = node
+    events = queue.Queue()
+    tracker = client.get_mempool_tracker(event_queue=events)
+    assert tracker.poll() == []
+
+    deposit = sim.node.address(3)
+    txid = client.rpc_connection.sendfrom('acc1', deposit, 2)
+    added = tracker.poll()
+    assert [(e.kind, e.txid) for e in added] == [(ADDED, txid)]
+    assert tracker.txids_for(deposit) == {txid}
+    assert tracker.entries_for(deposit)[0].amount_to(deposit) == Decimal('2')
+    assert tracker.poll() == []  # nothing new: no transaction is fetched again
+
+    sim.node.mine()
+    removed = tracker.poll()
+    assert [(e.kind, e.txid) for e in removed] == [(REMOVED, txid)]
+    assert len(tracker) == 0 and tracker.txids_for(deposit) == set()
+    assert events.qsize() == 2
+
+
+def test_memory_is_bounded(node):
+    client, sim = node
+    watched = sim.node.address(4)
+    tracker = client.get_mempool_tracker(watch_addresses=[watched])
+    other = client.rpc_connection.sendfrom('acc1', sim.node.address(5), 1)
+    paid = client.rpc_connection.sendfrom('acc2', watched, 1)
+    assert [e.txid for e in tracker.poll()] == [paid]
+    assert other not in tracker
+
+    capped = client.get_mempool_tracker(max_entries=1)
+    assert len(capped.poll()) == 1 and capped.skipped == 1
+    assert capped.poll() == []
@@ -0,0 +1,138 @@
+# pepecoin/test_multinode.py
+
+import threading
+import time
+
+import pytest
+
+from pepecoin import Pepecoin
+from pepecoin.conftest import FakeRPCError
+from pepecoin.multinode import MultiNodeTransport
+from pepecoin.transport import RPCTransport
+
+
+def node_handlers(height, served, name):
+    def getblockhash(h):
+        served.append(name)
+        if h > height[0]:
+            raise FakeRPCError(-8, 'Block height out of range')
+        return f"{h:064x}"
+
+    return {
+        'getblockcount': lambda: height[0],
+        'getblockhash': getblockhash,
+        'getrawmempool': lambda: served.append(name) or [f"tx-{name}"],
+        'getblockchaininfo': lambda: {'blocks': height[0], 'headers': height[0], 'bestblockhash': '00' * 32,
+                                      'initialblockdownload': False, 'verificationprogress': 1},
+        'getbalance': lambda *a: served.append(name) or 1,
+    }
+
+
+@pytest.fixture
+def cluster(fake_rpc):
+    served = []
+    heights = {name: [100] for name in ('primary', 'a', 'b')}
+    servers = {name: fake_rpc(node_handlers(heights[name], served, name)) for name in heights}
+    transports = {name: RPCTransport('user', 'pass', port=server.port) for name, server in servers.items()}
+    multi = MultiNodeTransport(transports['primary'], [transports['a'], transports['b']], background=False)
+    yield multi, heights, served, servers
+    multi.close()
+
+
+def test_reads_are_spread_and_writes_go_to_primary(cluster):
+    multi, heights, served, _ = cluster
+    multi.check_health()
+
+    for h in range(30):
+        multi.getblockhash(h)
+    assert set(served) == {'primary', 'a', 'b'}
+
+    served.clear()
+    multi.getbalance('acc0')
+    assert served == ['primary']
+
+
+def test_lagging_node_leaves_rotation_until_it_catches_up(cluster):
+    multi, heights, served, _ = cluster
+    heights['b'][0] = 90
+    multi.check_health()
+    assert [s['healthy'] for s in multi.status()] == [True, True, False]
+
+    for h in range(20):
+        multi.getblockhash(h)
+    assert 'b' not in served
+
+    heights['b'][0] = 100
+    multi.check_health()
+    assert multi.replicas[1].healthy
+
+
+def test_read_fails_over_when_node_is_down(cluster):
+    multi, heights, served, servers = cluster
+    servers['a'].stop()
+
+    results = [multi.getblockhash(h) for h in range(10)]
+
+    assert results == [f"{h:064x}" for h in range(10)]
+    assert not multi.replicas[0].healthy
+    assert 'a' not in served
+
+
+def test_least_outstanding_prefers_idle_node(fake_rpc):
+    release = threading.Event()
+    slow = fake_rpc({'getblockhash': lambda h: release.wait(5) and 'slow'})
+    fast = fake_rpc({'getblockhash': lambda h: 'fast'})
+    multi = MultiNodeTransport(RPCTransport('user', 'pass', port=slow.port),
+                               [RPCTransport('user', 'pass', port=fast.port)], background=False)
+    stuck = threading.Thread(target=multi.getblockhash, args=(1,))
+    stuck.start()
+    while multi.primary.outstanding == 0:
+        time.sleep(0.001)
+
+    assert [multi.getblockhash(h) for h in range(5)] == ['fast'] * 5
+    release.set()
+    stuck.join()
+    multi.close()
+
+
+def test_reads_a_lagging_replica_has_not_seen_go_to_the_primary(cluster):
+    multi, heights, served, _ = cluster
+    heights['a'][0] = heights['b'][0] = 99  # within max_lag, so still in rotation
+    multi.check_health()
+
+    for _ in range(6):
+        assert multi.getblockhash(100) == f"{100:064x}"
+    results = multi.batch([('getblockhash', 99), ('getblockhash', 100)])
+    assert [r.unwrap() for r in results] == [f"{99:064x}", f"{100:064x}"]
+    assert all(s['healthy'] for s in multi.status())
+
+
+def test_mempool_reads_stay_on_the_primary(cluster):
+    multi, _, served, _ = cluster
+    multi.check_health()
+
+    for _ in range(10):
+        assert multi.getrawmempool() == ['tx-primary']
+    assert multi.batch([('getblockhash', 1), ('getrawmempool',)])[1].result == ['tx-primary']
+    assert set(served) == {'primary'}
+
+
+def test_pepecoin_builds_multinode_transport(cluster):
+    multi, _, _, servers = cluster
+    node = Pepecoin('user', 'pass', port=servers['primary'].port, lazy=True, setup_logging=False,
+                    read_endpoints=[('127.0.0.1', servers['a'].port)], sync_cache_ttl=None)
+    assert isinstance(node.rpc_connection, MultiNodeTransport)
+    assert node.get_block_count() == 100
+    node.close()
+
+
+def test_unrelated_errors_are_not_retried(fake_rpc):
+    def missing(h):
+        raise FakeRPCError(-8, 'Block height out of range')
+
+    bad = fake_rpc({'getblockhash': missing})
+    multi = MultiNodeTransport(RPCTransport('user', 'pass', port=bad.port), [], background=False)
+    with pytest.raises(Exception):
+        multi.getblockhash(10 ** 6)
+    assert multi.primary.healthy
+    multi.close()
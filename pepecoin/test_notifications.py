@@ -0,0 +1,122 @@
+# pepecoin/test_notifications.py
+
+import asyncio
+import struct
+import time
+
+import pytest
+
+from pepecoin.notifications import HASHBLOCK, HASHTX, NotificationSubscriber
+from pepecoin.transport import RPCTransport
+
+
+def frames(topic, body_hex, sequence):
+    return [topic.encode(), bytes.fromhex(body_hex), struct.pack('<I', sequence)]
+
+
+def block_hash(height):
+    return f"{height:064x}"
+
+
+@pytest.fixture
+def chain(fake_rpc):
+    mempool = []
+    server = fake_rpc({
+        'getblockheader': lambda h: {'height': int(h, 16), 'confirmations': 1},
+        'getblockhash': block_hash,
+        'getrawmempool': lambda: list(mempool),
+    })
+    return RPCTransport('user', 'pass', port=server.port), mempool
+
+
+def test_block_gap_is_filled_from_rpc(chain):
+    transport, _ = chain
+    delivered = []
+    subscriber = NotificationSubscriber('tcp://127.0.0.1:1', transport, on_notification=delivered.append)
+
+    subscriber._process(frames(HASHBLOCK, block_hash(10), 7))
+    result = subscriber._process(frames(HASHBLOCK, block_hash(14), 9))
+
+    assert [n.hash for n in result] == [block_hash(h) for h in (11, 12, 13, 14)]
+    assert [n.caught_up for n in result] == [True, True, True, False]
+    assert [n.hash for n in delivered] == [block_hash(h) for h in range(10, 15)]
+    assert subscriber.missed[HASHBLOCK] == 1
+
+
+def test_transaction_gap_replays_unseen_mempool_entries(chain):
+    transport, mempool = chain
+    seen, missed, latest = 'aa' * 32, 'bb' * 32, 'cc' * 32
+    subscriber = NotificationSubscriber('tcp://127.0.0.1:1', transport)
+
+    subscriber._process(frames(HASHTX, seen, 0xffffffff))
+    assert len(subscriber._process(frames(HASHTX, seen, 0))) == 1  # the counter wrapped; no gap
+    assert subscriber.missed[HASHTX] == 0
+
+    mempool.extend([seen, missed, latest])
+    result = subscriber._process(frames(HASHTX, latest, 5))
+    assert [(n.hash, n.caught_up) for n in result] == [(missed, True), (latest, False)]
+    assert subscriber.missed[HASHTX] == 4
+
+
+def test_gaps_without_rpc_are_only_counted():
+    subscriber = NotificationSubscriber('tcp://127.0.0.1:1')
+    subscriber._process(frames(HASHBLOCK, block_hash(1), 1))
+    assert len(subscriber._process(frames(HASHBLOCK, block_hash(5), 4))) == 1
+    assert subscriber.missed[HASHBLOCK] == 2
+
+
+def test_receives_from_a_zmq_publisher():
+    zmq = pytest.importorskip('zmq')
+    publisher = zmq.Context.instance().socket(zmq.PUB)
+    port = publisher.bind_to_random_port('tcp://127.0.0.1')
+    subscriber = NotificationSubscriber(f"tcp://127.0.0.1:{port}").connect()
+    try:
+        received = []
+        deadline = time.monotonic() + 5
+        while not received and time.monotonic() < deadline:  # PUB drops messages until the SUB has joined
+            publisher.send_multipart(frames(HASHBLOCK, block_hash(1), 0))
+            received = subscriber.receive(timeout=0.1)
+        assert received and received[0].hash == block_hash(1)
+    finally:
+        subscriber.close()
+        publisher.close(linger=0)
+
+
+def test_async_iteration_survives_a_failing_listener():
+    zmq = pytest.importorskip('zmq')
+    publisher = zmq.Context.instance().socket(zmq.PUB)
+    port = publisher.bind_to_random_port('tcp://127.0.0.1')
+    subscriber = NotificationSubscriber(f"tcp://127.0.0.1:{port}")
+
+    def broken(notification):
+        raise RuntimeError('listener bug')
+
+    subscriber._listeners.append(broken)
+
+    async def main():
+        async def publish():
+            sequence = 0
+            while True:  # PUB drops messages until the SUB has joined
+                publisher.send_multipart(frames(HASHBLOCK, block_hash(sequence), sequence))
+                sequence += 1
+                await asyncio.sleep(0.05)
+
+        publishing = asyncio.ensure_future(publish())
+        received = []
+        try:
+            async for notification in subscriber:
+                received.append(notification)
+                if len(received) == 2:
+                    break
+        finally:
+            publishing.cancel()
+        return received
+
+    try:
+        received = asyncio.run(asyncio.wait_for(main(), 10))
+        assert [n.topic for n in received] == [HASHBLOCK, HASHBLOCK]
+        assert received[1].sequence == received[0].sequence + 1
+        assert subscriber._listeners == [broken]
+    finally:
+        subscriber.close()
+        publisher.close(linger=0)
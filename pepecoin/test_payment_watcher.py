@@ -0,0 +1,75 @@
+# pepecoin/test_payment_watcher.py
+
+import queue
+from decimal import Decimal
+
+from pepecoin.payment_watcher import PaymentWatcher
+
+
+class FakeWallet:
+    """Serves listsinceblock from a list of receive entries and a tip counter."""
+
+    def __init__(self):
+        self.height = 100
+        self.entries = []  # (txid, address, amount, block_height or None)
+        self.calls = []
+        self.targets = []
+
+    def receive(self, txid, address, amount, height=None):
+        self.entries.append((txid, address, Decimal(amount), height))
+
+    def listsinceblock(self, blockhash, target_confirmations, include_watchonly):
+        self.calls.append(blockhash)
+        self.targets.append(target_confirmations)
+        since = int(blockhash[1:]) if blockhash else -1
+        transactions = []
+        for txid, address, amount, height in self.entries:
+            if height is not None and height <= since:
+                continue
+            confirmations = 0 if height is None else self.height - height + 1
+            transactions.append({'category': 'receive', 'txid': txid, 'vout': 0, 'address': address,
+                                 'amount': amount, 'confirmations': confirmations})
+        return {'transactions': transactions, 'lastblock': f"h{self.height - target_confirmations + 1}"}
+
+
+def test_invoice_lifecycle_and_restart(tmp_path):
+    wallet = FakeWallet()
+    events = queue.Queue()
+    state = str(tmp_path / 'watcher.json')
+    watcher = PaymentWatcher(wallet, state_path=state, event_queue=events)
+    watcher.add_invoice('inv1', 'Paddr1', '2.5', min_confirmations=3)
+    watcher.add_invoice('inv2', 'Paddr2', '1')
+
+    wallet.receive('t1', 'Paddr1', '1.0')
+    assert [e.kind for e in watcher.poll()] == ['underpaid']
+
+    wallet.receive('t2', 'Paddr1', '1.5')
+    wallet.receive('t3', 'Pother', '9')
+    assert [e.kind for e in watcher.poll()] == ['paid']
+
+    restarted = PaymentWatcher(wallet, state_path=state)
+    assert restarted.cursor == watcher.cursor
+    assert restarted.invoices['inv1'].received == Decimal('2.5')
+
+    wallet.entries = [(txid, address, amount, 101) for txid, address, amount, _ in wallet.entries]
+    wallet.height = 103
+    assert [(e.kind, e.invoice.invoice_id) for e in restarted.poll()] == [('confirmed', 'inv1')]
+    assert 'inv1' not in restarted.invoices
+    assert restarted.invoices['inv2'].status == 'pending'
+
+
+def test_zero_confirmations_and_cursor_lag_follow_open_invoices():
+    wallet = FakeWallet()
+    watcher = PaymentWatcher(wallet, default_min_confirmations=2)
+    instant = watcher.add_invoice('instant', 'Paddr1', '1', min_confirmations=0)
+    assert instant.min_confirmations == 0
+    watcher.add_invoice('slow', 'Paddr2', '1', min_confirmations=6)
+
+    wallet.receive('t1', 'Paddr1', '1')
+    assert [(e.kind, e.invoice.invoice_id) for e in watcher.poll()] == [('confirmed', 'instant')]
+    assert wallet.targets[-1] == 6
+
+    watcher.remove_invoice('slow')
+    watcher.add_invoice('default', 'Paddr3', '1')
+    watcher.poll()
+    assert wallet.targets[-1] == 2
@@ -0,0 +1,116 @@
+# pepecoin/test_payouts.py
+
+from decimal import Decimal
+
+import pytest
+
+import time
+
+from pepecoin.conftest import FakeRPCError
+from pepecoin.payouts import Move, Payment, PayoutEngine
+from pepecoin.resilience import deadline
+from pepecoin.transport import RPCTransport
+
+
+def make_wallet_handlers(sent, moves, failing_sources=(), max_outputs=None, slow=0.0):
+    def sendmany(account, outputs, minconf, comment):
+        time.sleep(slow)
+        if account in failing_sources:
+            raise FakeRPCError(-6, 'Account has insufficient funds')
+        if max_outputs is not None and len(outputs) > max_outputs:
+            raise FakeRPCError(-4, 'Transaction too large')
+        sent.append((account, outputs))
+        return f"tx{len(sent)}"
+
+    def move(from_account, to_account, amount, minconf, comment):
+        moves.append((from_account, to_account, Decimal(str(amount))))
+        return True
+
+    def gettransaction(txid):
+        _, outputs = sent[int(txid[2:]) - 1]
+        return {'txid': txid, 'details': [{'category': 'send', 'address': address, 'vout': vout}
+                                          for vout, address in enumerate(outputs)]}
+
+    return {'sendmany': sendmany, 'move': move, 'gettransaction': gettransaction}
+
+
+def test_payouts_share_transactions_and_report_outputs(fake_rpc):
+    sent, moves = [], []
+    server = fake_rpc(make_wallet_handlers(sent, moves))
+    engine = PayoutEngine(RPCTransport('user', 'pass', port=server.port), max_outputs_per_tx=2)
+
+    report = engine.pay([
+        Payment('a', 'P1', '1'),
+        Payment('b', 'P2', '2'),
+        Payment('a', 'P1', '0.5'),
+        Payment('c', 'P3', '3'),
+    ], merge_sources_into='a')
+
+    assert moves == [('b', 'a', Decimal('2')), ('c', 'a', Decimal('3'))]
+    assert [account for account, _ in sent] == ['a', 'a']
+    assert sent[0][1] == {'P1': 1.5, 'P2': 2.0}
+    assert report.txids == ['tx1', 'tx2']
+    assert [(r.txid, r.vout) for r in report.results] == [('tx1', 0), ('tx1', 1), ('tx1', 0), ('tx2', 0)]
+    assert not report.failed
+
+
+def test_failed_transaction_is_reported_per_payment(fake_rpc):
+    sent, moves = [], []
+    server = fake_rpc(make_wallet_handlers(sent, moves, failing_sources={'b'}))
+    engine = PayoutEngine(RPCTransport('user', 'pass', port=server.port))
+
+    report = engine.pay([Payment('a', 'P1', 1), Payment('b', 'P2', 2)])
+
+    assert report.txids == ['tx1']
+    assert [r.payment.to_address for r in report.failed] == ['P2']
+    assert report.failed[0].error.error['code'] == -6
+
+
+def test_failed_payments_are_moved_back_to_their_sources(fake_rpc):
+    sent, moves = [], []
+    server = fake_rpc(make_wallet_handlers(sent, moves, failing_sources={'a'}))
+    engine = PayoutEngine(RPCTransport('user', 'pass', port=server.port))
+
+    report = engine.pay([Payment('a', 'P1', 1), Payment('b', 'P2', 2), Payment('c', 'P3', 3)],
+                        merge_sources_into='a')
+
+    assert len(report.failed) == 3
+    assert moves == [('b', 'a', Decimal('2')), ('c', 'a', Decimal('3')),
+                     ('a', 'b', Decimal('2')), ('a', 'c', Decimal('3'))]
+    assert report.moves[2:] == [Move('a', 'b', Decimal('2')), Move('a', 'c', Decimal('3'))]
+
+
+def test_outputs_are_limited_by_estimated_size_and_oversized_transactions_split(fake_rpc):
+    sent, moves = [], []
+    server = fake_rpc(make_wallet_handlers(sent, moves, max_outputs=3))
+    transport = RPCTransport('user', 'pass', port=server.port)
+    assert PayoutEngine(transport).max_outputs_per_tx == (100_000 - 10 - 148 * 100 - 34) // 34
+    with pytest.raises(ValueError):
+        PayoutEngine(transport, max_tx_bytes=1000)
+
+    report = PayoutEngine(transport).pay([Payment('a', f"P{i}", 1) for i in range(10)])
+
+    assert not report.failed
+    assert sorted(len(outputs) for _, outputs in sent) == [2, 2, 3, 3]
+    assert sorted(address for _, outputs in sent for address in outputs) == sorted(f"P{i}" for i in range(10))
+
+
+@pytest.mark.parametrize('timeout', ['deadline', 'socket'])
+def test_timed_out_send_is_unknown_and_not_moved_back(fake_rpc, timeout):
+    sent, moves = [], []
+    server = fake_rpc(make_wallet_handlers(sent, moves, slow=0.5))
+    transport = RPCTransport('user', 'pass', port=server.port, timeout=0.2 if timeout == 'socket' else 30)
+    engine = PayoutEngine(transport)
+    payments = [Payment('a', 'P1', 1), Payment('b', 'P2', 2)]
+
+    if timeout == 'deadline':
+        with deadline(0.2):
+            report = engine.pay(payments, merge_sources_into='a')
+    else:
+        report = engine.pay(payments, merge_sources_into='a')
+
+    assert [r.payment.to_address for r in report.unknown] == ['P1', 'P2']
+    assert not report.failed
+    assert report.moves == [Move('b', 'a', Decimal('2'))]  # nothing moved back: it may have been paid
+    time.sleep(0.4)
+    assert len(sent) == 1  # the node did send it
@@ -0,0 +1,178 @@
+# pepecoin/test_resilience.py
+
+import itertools
+import threading
+import time
+
+import pytest
+
+from pepecoin import Pepecoin
+from pepecoin.conftest import FakeRPCError
+from pepecoin.resilience import (
+    DeadlineExceeded,
+    HedgePolicy,
+    ResilientTransport,
+    RetryPolicy,
+    deadline,
+    remaining,
+)
+from pepecoin.transport import RPCTransport
+
+FAST_RETRY = RetryPolicy(attempts=3, base_delay=0.001)
+
+
+def test_deadline_cuts_the_socket_timeout(fake_rpc):
+    server = fake_rpc({'getblockcount': lambda: time.sleep(2) or 1})
+    transport = RPCTransport('user', 'pass', port=server.port)
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        with deadline(0.2):
+            transport.getblockcount()
+    assert time.monotonic() - start < 1
+
+
+def test_expired_deadline_sends_nothing(fake_rpc):
+    server = fake_rpc({'getblockcount': lambda: 1})
+    transport = RPCTransport('user', 'pass', port=server.port)
+
+    with deadline(10):
+        with deadline(-1):
+            assert remaining() < 0
+            with pytest.raises(DeadlineExceeded):
+                transport.getblockcount()
+        assert remaining() > 9
+    assert remaining() is None
+    assert server.requests == 0
+
+
+def test_deadline_cuts_the_wait_for_a_connection_slot(fake_rpc):
+    release = threading.Event()
+    server = fake_rpc({'getblockcount': lambda: release.wait(5) and 1})
+    transport = RPCTransport('user', 'pass', port=server.port, max_connections=1)
+    holder = threading.Thread(target=transport.getblockcount)
+    holder.start()
+    while server.requests == 0:
+        time.sleep(0.01)
+
+    start = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceeded):
+            with deadline(0.2):
+                transport.getblockcount()
+        assert time.monotonic() - start < 1
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_reads_are_retried_while_node_warms_up(fake_rpc):
+    calls = itertools.count()
+
+    def warming(*params):
+        if next(calls) < 2:
+            raise FakeRPCError(-28, 'Loading block index...')
+        return 7
+
+    server = fake_rpc({'getblockcount': warming, 'sendtoaddress': warming})
+    transport = ResilientTransport(RPCTransport('user', 'pass', port=server.port), retry=FAST_RETRY)
+
+    assert transport.getblockcount() == 7
+    assert server.requests == 3
+
+    calls = itertools.count()
+    with pytest.raises(Exception):
+        transport.sendtoaddress('addr', 1)
+    assert server.requests == 4  # writes are never repeated
+
+
+def test_unrelated_errors_are_not_retried(fake_rpc):
+    def missing(height):
+        raise FakeRPCError(-8, 'Block height out of range')
+
+    server = fake_rpc({'getblockhash': missing})
+    transport = ResilientTransport(RPCTransport('user', 'pass', port=server.port), retry=FAST_RETRY)
+    with pytest.raises(Exception):
+        transport.getblockhash(10 ** 6)
+    assert server.requests == 1
+
+
+def test_slow_read_is_hedged(fake_rpc):
+    slow_calls = itertools.count()
+    release = threading.Event()
+
+    def getblockhash(height):
+        if height == 30 and next(slow_calls) == 0:
+            release.wait(5)
+            return 'slow'
+        time.sleep(0.005)
+        return 'fast'
+
+    server = fake_rpc({'getblockhash': getblockhash})
+    transport = ResilientTransport(RPCTransport('user', 'pass', port=server.port),
+                                   hedge=HedgePolicy(min_samples=20, max_ratio=0.5))
+    for h in range(30):
+        transport.getblockhash(h)
+
+    # A warm-up call may itself straggle past the quantile and be hedged, so
+    # only count the hedges the slow call adds.
+    before = transport.hedged
+    start = time.monotonic()
+    assert transport.getblockhash(30) == 'fast'
+    assert time.monotonic() - start < 1
+    assert transport.hedged == before + 1
+    release.set()
+
+    transport.close()
+    assert not any(t.name.startswith('pepecoin-hedge') for t in threading.enumerate())
+    assert transport.getblockhash(31) == 'fast'  # usable again after close()
+    transport.close()
+
+
+def test_hedging_does_not_cap_concurrent_reads_at_workers(fake_rpc):
+    readers = 6
+    # Only passes once all slow reads are in flight together.
+    barrier = threading.Barrier(readers, timeout=3)
+
+    def getblockhash(height):
+        if height >= 100:
+            barrier.wait()
+        return height
+
+    server = fake_rpc({'getblockhash': getblockhash})
+    transport = ResilientTransport(RPCTransport('user', 'pass', port=server.port),
+                                   hedge=HedgePolicy(min_samples=20, workers=2))
+    for h in range(20):
+        transport.getblockhash(h)
+
+    results = [None] * readers
+
+    def read(i):
+        results[i] = transport.getblockhash(100 + i)
+
+    threads = [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [100 + i for i in range(readers)]
+    assert not barrier.broken
+    transport.close()
+
+
+def test_pepecoin_wraps_transport_and_exposes_deadline(fake_rpc):
+    server = fake_rpc({
+        'getblockcount': lambda: 5,
+        'getblockchaininfo': lambda: {'initialblockdownload': False, 'verificationprogress': 1.0,
+                                      'blocks': 5, 'headers': 5, 'bestblockhash': 'tip'},
+        'getnewaddress': lambda account: 'Pnew',
+    })
+    node = Pepecoin('user', 'pass', port=server.port, lazy=True, setup_logging=False,
+                    retry=RetryPolicy(), hedge=HedgePolicy())
+    assert isinstance(node.rpc_connection, ResilientTransport)
+    assert node.sync_gate.rpc_connection is node.rpc_connection.inner
+    with node.deadline(5):
+        assert node.get_block_count() == 5
+    assert node.generate_new_address('shop') == 'Pnew'
+    node.close()
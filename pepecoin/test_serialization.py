@@ -0,0 +1,88 @@
+# pepecoin/test_serialization.py
+
+import struct
+from decimal import Decimal
+
+import pytest
+
+from pepecoin import Pepecoin
+from pepecoin.serialization import DeserializationError, decode_block, decode_transaction
+
+# Bitcoin's genesis block: a well-known header and coinbase transaction with published hashes.
+GENESIS_HEADER = bytes.fromhex(
+    "0100000000000000000000000000000000000000000000000000000000000000000000003ba3edfd7a7b12b27ac72c3e"
+    "67768f617fc81bc3888a51323a9fb8aa4b1e5e4a29ab5f49ffff001d1dac2b7c"
+)
+GENESIS_HASH = "000000000019d6689c085ae165831e934ff763ae46a2a6c172b3f1b60a8ce26f"
+COINBASE_TX = bytes.fromhex(
+    "01000000010000000000000000000000000000000000000000000000000000000000000000ffffffff4d04ffff001d0104"
+    "455468652054696d65732030332f4a616e2f32303039204368616e63656c6c6f72206f6e206272696e6b206f66207365"
+    "636f6e64206261696c6f757420666f722062616e6b73ffffffff0100f2052a01000000434104678afdb0fe5548271967"
+    "f1a67130b7105cd6a828e03909a67962e0ea1f61deb649f6bc3f4cef38c4f35504e51ec112de5c384df7ba0b8d578a4c"
+    "702b6bf11d5fac00000000"
+)
+COINBASE_TXID = "4a5e1e4baab89f3a32518a88c31bc87f618f76673e2cc77ab2127b7afdeda33b"
+
+
+def test_decodes_plain_block_and_computes_hashes():
+    block = decode_block((GENESIS_HEADER + b'\x01' + COINBASE_TX).hex())
+
+    assert block.hash == GENESIS_HASH
+    assert not block.is_auxpow
+    assert block.time == 1231006505 and block.bits == 0x1d00ffff
+    [tx] = block.transactions
+    assert tx.txid == COINBASE_TXID == block.merkle_root
+    assert tx.is_coinbase
+    assert tx.outputs[0].value == 5_000_000_000
+    assert tx.outputs[0].amount == Decimal('50')
+    assert len(tx.outputs[0].script_pubkey) == 67
+
+
+def test_decodes_auxpow_block():
+    version = (98 << 16) | 0x100 | 0x4  # chain id 98, AuxPoW flag
+    header = struct.pack('<i', version) + GENESIS_HEADER[4:]
+    auxpow = (COINBASE_TX + b'\x11' * 32          # parent coinbase tx and its block hash
+              + b'\x02' + b'\x22' * 64 + struct.pack('<i', 0)   # coinbase merkle branch, index
+              + b'\x01' + b'\x33' * 32 + struct.pack('<i', 1)   # chain merkle branch, index
+              + GENESIS_HEADER)                                # parent block header
+    spend = (struct.pack('<i', 1) + b'\x01' + bytes.fromhex(COINBASE_TXID)[::-1] + struct.pack('<I', 0)
+             + b'\x00' + b'\xff\xff\xff\xff' + b'\x01' + struct.pack('<q', 12345) + b'\x00' + b'\x00' * 4)
+    block = decode_block(header + auxpow + b'\x02' + COINBASE_TX + spend)
+
+    assert block.is_auxpow and block.chain_id == 98
+    assert block.auxpow.coinbase_tx.txid == COINBASE_TXID
+    assert len(block.auxpow.coinbase_branch) == 2 and block.auxpow.chain_index == 1
+    assert block.auxpow.parent_header.hash == GENESIS_HASH
+    assert block.tx_count == 2
+    assert block.transactions[1].inputs[0].prev_txid == COINBASE_TXID
+    assert block.transactions[1].outputs[0].value == 12345
+
+
+def test_segwit_txid_excludes_witness():
+    legacy = decode_transaction(COINBASE_TX)
+    witness = COINBASE_TX[:4] + b'\x00\x01' + COINBASE_TX[4:-4] + b'\x01\x02\xaa\xbb' + COINBASE_TX[-4:]
+    assert decode_transaction(witness).txid == legacy.txid
+
+
+def test_truncated_data_raises():
+    with pytest.raises(DeserializationError):
+        decode_transaction(COINBASE_TX[:-10])
+    with pytest.raises(DeserializationError):
+        decode_block(GENESIS_HEADER[:40])
+
+
+def test_get_decoded_block_uses_serialized_rpc(fake_rpc):
+    calls = []
+
+    def getblock(block_hash, verbose=True):
+        calls.append(verbose)
+        return (GENESIS_HEADER + b'\x01' + COINBASE_TX).hex()
+
+    server = fake_rpc({'getblock': getblock, 'getrawtransaction': lambda txid, verbose: COINBASE_TX.hex()})
+    node = Pepecoin('user', 'pass', port=server.port, lazy=True, setup_logging=False)
+
+    assert node.get_decoded_block(GENESIS_HASH).hash == GENESIS_HASH
+    assert [b.hash for b in node.get_decoded_blocks([GENESIS_HASH] * 3)] == [GENESIS_HASH] * 3
+    assert node.get_decoded_transaction(COINBASE_TXID).txid == COINBASE_TXID
+    assert calls == [False] * 4
+    node.close()
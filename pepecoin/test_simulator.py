@@ -0,0 +1,113 @@
+# pepecoin/test_simulator.py
+
+import sys
+from decimal import Decimal
+
+import pytest
+
+from pepecoin import Pepecoin
+from pepecoin.simulator import PepecoinSimulator, SimulatedNode
+from pepecoin.utils import get_all_addresses
+
+
+@pytest.fixture
+def simulator():
+    node = SimulatedNode(addresses=1000, utxos=5000, accounts=10, blocks=200)
+    with PepecoinSimulator(node, rpc_user='user', rpc_password='pass') as sim:
+        yield sim
+
+
+def test_pepecoin_reads_from_simulator(simulator):
+    node = Pepecoin('user', 'pass', port=simulator.port, sync_cache_ttl=None)
+    try:
+        assert node.get_block_count() == 199
+        block = node.get_block(node.get_block_hash(10))
+        assert block['height'] == 10 and len(block['tx']) == 1 + 25
+
+        address = simulator.node.address(7)
+        unspent = node.rpc_connection.listunspent(1, 9999999, [address])
+        assert len(unspent) == 5 and all(u['address'] == address for u in unspent)
+        assert node.get_balance_of_address(address) == sum(u['amount'] for u in unspent)
+
+        addresses = get_all_addresses(node)
+        assert len(addresses) == 1000
+        assert node.rpc_connection.getaccount(address) == 'acc7'
+        assert address in node.rpc_connection.getaddressesbyaccount('acc7')
+    finally:
+        node.close()
+
+
+def test_sends_go_through_mempool_into_blocks(simulator):
+    node = Pepecoin('user', 'pass', port=simulator.port, sync_cache_ttl=None)
+    try:
+        deposit = node.get_account('shop').generate_address()
+        before = node.rpc_connection.getbalance('acc1')
+        txid = node.send_from('acc1', deposit, Decimal('1.5'))
+        payout = node.rpc_connection.sendmany('acc2', {'Pexternal': 1, deposit: 2})
+
+        assert node.rpc_connection.getrawmempool() == [txid, payout]
+        assert node.rpc_connection.getbalance('acc1') == before - Decimal('1.5') - Decimal('0.001')
+        assert node.rpc_connection.getbalance('shop') == Decimal('3.5')
+
+        cursor = node.get_best_block_hash()
+        simulator.node.mine()
+        assert node.rpc_connection.getrawmempool() == []
+        assert node.get_block(node.get_best_block_hash())['tx'][1:] == [txid, payout]
+
+        since = node.rpc_connection.listsinceblock(cursor, 1, True)
+        received = [t for t in since['transactions'] if t['category'] == 'receive']
+        assert sorted(t['amount'] for t in received) == [Decimal('1.5'), Decimal('2')]
+        assert node.get_balance_of_address(deposit) == Decimal('3.5')
+    finally:
+        node.close()
+
+
+def test_simulator_rejects_bad_credentials(simulator):
+    with pytest.raises(Exception):
+        Pepecoin('user', 'wrong', port=simulator.port, sync_cache_ttl=None)
+
+
+def test_writes_pass_the_default_sync_gate(simulator):
+    node = Pepecoin('user', 'pass', port=simulator.port)
+    try:
+        assert node.sync_gate.rpc_connection is node.rpc_connection
+        deposit = node.generate_new_address('shop')
+        assert node.send_from('acc1', deposit, Decimal('1'))
+    finally:
+        node.close()
+
+
+def test_concurrent_reads_and_sends(simulator):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from pepecoin.transport import RPCTransport
+
+    transport = RPCTransport('user', 'pass', port=simulator.port, pool_size=8)
+    cursor = transport.getbestblockhash()
+    errors = []
+
+    def send(i):
+        transport.sendfrom(f"acc{i % 10}", simulator.node.address(i), 1)
+        if i % 10 == 1:
+            simulator.node.mine()
+
+    def read(_):
+        try:
+            transport.listsinceblock(cursor, 1, True)
+            transport.getrawmempool()
+        except Exception as e:
+            errors.append(e)
+
+    before = simulator.requests
+    height = transport.getblockcount()
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often enough to hit a read mid-iteration
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda i: send(i) if i % 2 else read(i), range(400)))
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+    assert simulator.requests - before == 1 + 200 + 2 * 200
+    assert transport.getblockcount() == height + 40
+    transport.close()
@@ -0,0 +1,33 @@
+# pepecoin/test_startup.py
+
+import subprocess
+import sys
+
+import pytest
+
+from pepecoin import Pepecoin
+
+
+def test_import_does_not_load_optional_modules():
+    code = (
+        "import sys; from pepecoin import Pepecoin; "
+        "print(sorted(m for m in ('asyncio', 'sqlite3', 'indented_logger', 'pepecoin.test_pepecoin', "
+        "'pepecoin.cache', 'pepecoin.async_pepecoin') if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '[]'
+
+
+def test_lazy_client_defers_first_rpc(fake_rpc):
+    server = fake_rpc({'getblockchaininfo': lambda: {'blocks': 1, 'headers': 1}, 'getblockcount': lambda: 1})
+    node = Pepecoin('user', 'pass', port=server.port, lazy=True, setup_logging=False)
+    assert server.requests == 0
+    assert node.connect() is node
+    assert server.requests == 1
+    node.close()
+
+
+def test_connect_fails_fast_when_node_is_down():
+    node = Pepecoin('user', 'pass', port=1, lazy=True, setup_logging=False)
+    with pytest.raises(OSError):
+        node.connect()
@@ -0,0 +1,39 @@
+# pepecoin/test_sync_gate.py
+
+from pepecoin.sync_gate import SyncGate, SyncState
+from pepecoin.transport import RPCTransport
+
+
+def info(tip, blocks, headers=None, ibd=False, progress=1.0):
+    return {
+        'bestblockhash': tip,
+        'blocks': blocks,
+        'headers': blocks if headers is None else headers,
+        'initialblockdownload': ibd,
+        'verificationprogress': progress,
+    }
+
+
+def test_state_ignores_progress_drift_once_synced():
+    state = SyncState(max_header_gap=10)
+    assert state.update(info('a', 100, ibd=True, progress=0.5)) is False
+    assert state.update(info('b', 200)) is True
+    # Progress is a time-based estimate and decays between blocks.
+    assert state.update(info('b', 200, progress=0.999)) is True
+    assert state.update(info('c', 201, progress=0.999)) is True
+    assert state.update(info('c', 201, headers=260)) is False
+
+
+def test_gate_answers_writes_from_memory(fake_rpc):
+    calls = []
+
+    def getblockchaininfo():
+        calls.append(1)
+        return info('a', 100)
+
+    server = fake_rpc({'getblockchaininfo': getblockchaininfo})
+    gate = SyncGate(RPCTransport('user', 'pass', port=server.port), ttl=60)
+
+    assert all(gate.is_synced() for _ in range(100))
+    assert len(calls) == 1
+    gate.stop()
@@ -0,0 +1,60 @@
+# pepecoin/test_thread_safety.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pepecoin.transport import RPCTransport
+
+
+class ConcurrencyProbe:
+    """Echo handler that records how many requests the server handled at once."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, *params):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return list(params)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_many_threads_get_their_own_responses(fake_rpc):
+    server = fake_rpc({'echo': ConcurrencyProbe()})
+    transport = RPCTransport('user', 'pass', port=server.port, max_connections=8)
+
+    def worker(thread_id):
+        mismatches = 0
+        for i in range(50):
+            if transport.echo(thread_id, i) != [thread_id, i]:
+                mismatches += 1
+            results = transport.batch([('echo', thread_id, i, j) for j in range(5)])
+            if [r.result for r in results] != [[thread_id, i, j] for j in range(5)]:
+                mismatches += 1
+        return mismatches
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        assert sum(pool.map(worker, range(32))) == 0
+
+
+def test_max_connections_bounds_concurrency_without_serializing(fake_rpc):
+    probe = ConcurrencyProbe(delay=0.02)
+    server = fake_rpc({'echo': probe})
+    transport = RPCTransport('user', 'pass', port=server.port, max_connections=4)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda i: transport.echo(i), range(40)))
+
+    assert results == [[i] for i in range(40)]
+    # The server saw the limit reached but never exceeded.
+    assert probe.peak == 4
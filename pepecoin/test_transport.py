@@ -0,0 +1,137 @@
+# pepecoin/test_transport.py
+
+import http.client
+import socket
+import time
+from decimal import Decimal
+
+import pytest
+from bitcoinrpc.authproxy import JSONRPCException
+
+from pepecoin.conftest import FakeRPCError
+from pepecoin.transport import RPCBatch, RPCTransport, _is_dropped
+
+
+def block_hash(height):
+    if height > 100:
+        raise FakeRPCError(-8, 'Block height out of range')
+    return f"{height:064x}"
+
+
+def test_batch_returns_results_in_order_with_per_call_errors(fake_rpc):
+    server = fake_rpc({'getblockhash': block_hash, 'getbalance': lambda *a: Decimal('1.00000001')})
+    transport = RPCTransport('user', 'pass', port=server.port)
+
+    results = transport.batch([('getblockhash', 5), ('getblockhash', 500), ('getbalance',)])
+
+    assert results[0].unwrap() == f"{5:064x}"
+    assert not results[1].ok and results[1].error.code == -8
+    with pytest.raises(JSONRPCException):
+        results[1].unwrap()
+    assert results[2].result == Decimal('1.00000001')
+    assert server.requests == 1
+
+
+def test_batch_is_split_into_chunks(fake_rpc):
+    server = fake_rpc({'getblockhash': block_hash})
+    transport = RPCTransport('user', 'pass', port=server.port, batch_chunk_size=10)
+
+    results = transport.batch([('getblockhash', h) for h in range(25)])
+
+    assert [r.unwrap() for r in results] == [f"{h:064x}" for h in range(25)]
+    assert server.requests == 3
+
+
+def test_single_call_and_batch_context(fake_rpc):
+    server = fake_rpc({'getblockhash': block_hash})
+    transport = RPCTransport('user', 'pass', port=server.port)
+
+    assert transport.getblockhash(1) == f"{1:064x}"
+    with pytest.raises(JSONRPCException):
+        transport.getblockhash(101)
+
+    with RPCBatch(transport) as batch:
+        batch.getblockhash(2)
+        batch.getblockhash(3)
+    assert [r.result for r in batch.results] == [f"{2:064x}", f"{3:064x}"]
+
+
+def test_connections_are_pooled_and_shared_with_accounts(fake_rpc):
+    from pepecoin.account import Account
+
+    server = fake_rpc({'getblockhash': block_hash, 'getnewaddress': lambda name: f"P{name}"})
+    transport = RPCTransport('user', 'pass', port=server.port, pool_size=2)
+    accounts = [Account('user', 'pass', account_name=f"acc{i}", transport=transport) for i in range(20)]
+
+    assert [a.generate_address() for a in accounts] == [f"Pacc{i}" for i in range(20)]
+    assert transport.pool.idle_count == 1
+
+
+def test_idle_connections_are_evicted(fake_rpc):
+    server = fake_rpc({'getblockhash': block_hash})
+    transport = RPCTransport('user', 'pass', port=server.port, idle_timeout=0)
+
+    transport.getblockhash(1)
+    conn, _ = transport.pool.acquire()
+    assert transport.pool.idle_count == 0
+    transport.pool.release(conn)
+    time.sleep(0.01)
+    _, reused = transport.pool.acquire()
+    assert not reused
+
+
+class DroppedReply(Exception):
+    pass
+
+
+def dropping(handler, drops):
+    """
+    Run ``handler``, then drop the connection without replying for the first ``drops`` calls.
+    """
+    executed = []
+
+    def run(*params):
+        executed.append(params)
+        result = handler(*params)
+        if len(executed) <= drops:
+            raise DroppedReply()
+        return result
+
+    return run, executed
+
+
+def test_reads_are_resent_after_the_connection_drops(fake_rpc):
+    getblockhash, executed = dropping(block_hash, drops=1)
+    server = fake_rpc({'getblockcount': lambda: 100, 'getblockhash': getblockhash})
+    server.httpd.handle_error = lambda *args: None
+    transport = RPCTransport('user', 'pass', port=server.port)
+
+    transport.getblockcount()  # pools a connection
+    assert transport.getblockhash(7) == f"{7:064x}"
+    assert len(executed) == 2
+
+
+def test_writes_are_not_resent_after_the_connection_drops(fake_rpc):
+    sendfrom, executed = dropping(lambda *params: 'txid', drops=2)
+    server = fake_rpc({'getblockcount': lambda: 100, 'sendfrom': sendfrom})
+    server.httpd.handle_error = lambda *args: None
+    transport = RPCTransport('user', 'pass', port=server.port)
+
+    transport.getblockcount()
+    with pytest.raises(http.client.RemoteDisconnected):
+        transport.sendfrom('acc1', 'Paddr', 1)
+    assert len(executed) == 1  # the node may have sent it; the caller must check before trying again
+    transport.getblockcount()
+    with pytest.raises(http.client.RemoteDisconnected):
+        transport.batch([('getblockcount',), ('sendfrom', 'acc1', 'Paddr', 1)])
+    assert len(executed) == 2
+
+
+def test_idle_connection_closed_by_the_node_is_not_reused():
+    local, remote = socket.socketpair()
+    conn = http.client.HTTPConnection('127.0.0.1')
+    conn.sock = local
+    assert not _is_dropped(conn)
+    remote.close()
+    assert _is_dropped(conn)
+    local.close()
@@ -0,0 +1,615 @@
+# pepecoin/transport.py
+
+import base64
+import http.client
+import itertools
+import json
+import logging
+import select
+import socket
+import threading
+import time
+from typing import Any, Iterator, List, Optional, Sequence
+
+from bitcoinrpc.authproxy import JSONRPCException, EncodeDecimal
+
+from .codec import StdlibCodec, get_codec, is_error_free
+from .instrumentation import RPCEvent, RPCObserver, batch_label, error_code, notify_finished, notify_started
+from .resilience import DeadlineExceeded, deadline_passed, request_timeout
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "pepecoin-python/transport"
+DEFAULT_TIMEOUT = 30
+DEFAULT_BATCH_CHUNK_SIZE = 500
+DEFAULT_POOL_SIZE = 4
+DEFAULT_STREAM_CHUNK_SIZE = 1 << 16
+# pepecoind drops idle keep-alive connections after -rpcservertimeout (30s by default),
+# so idle sockets are evicted well before that.
+DEFAULT_IDLE_TIMEOUT = 15.0
+
+# Chain, mempool and network queries that any synced node answers the same way.
+# Everything else (wallet calls, sends, node control) goes to the primary (see ``pepecoin.multinode``).
+READ_METHODS = frozenset((
+    'getbestblockhash', 'getblock', 'getblockchaininfo', 'getblockcount', 'getblockhash', 'getblockheader',
+    'getchaintips', 'getdifficulty', 'getmempoolentry', 'getmempoolinfo', 'getrawmempool', 'getrawtransaction',
+    'gettxout', 'gettxoutproof', 'decoderawtransaction', 'decodescript', 'estimatefee', 'estimatesmartfee',
+    'estimatepriority', 'estimatesmartpriority', 'getmininginfo', 'getnetworkinfo', 'getconnectioncount',
+    'verifymessage', 'verifytxoutproof',
+))
+
+# Calls that change nothing on the node, so they can be resent when a pooled connection
+# turns out to be dead mid-request. Anything else (sendfrom, sendmany, move, sendrawtransaction,
+# getnewaddress, ...) may already have been executed and is never resent.
+IDEMPOTENT_METHODS = READ_METHODS | frozenset((
+    'getaccount', 'getaddressesbyaccount', 'getbalance', 'getinfo', 'getreceivedbyaccount',
+    'getreceivedbyaddress', 'gettransaction', 'getwalletinfo', 'listaccounts', 'listreceivedbyaccount',
+    'listreceivedbyaddress', 'listsinceblock', 'listtransactions', 'listunspent', 'validateaddress',
+))
+
+
+class BatchResult:
+    """
+    Outcome of a single call inside a JSON-RPC batch.
+
+    Exactly one of ``result`` / ``error`` is meaningful: ``error`` holds the
+    ``JSONRPCException`` the node reported for this call, or None on success.
+    """
+
+    __slots__ = ('method', 'params', 'result', 'error')
+
+    def __init__(self, method: str, params: Sequence, result: Any = None, error: Optional[JSONRPCException] = None):
+        self.method = method
+        self.params = params
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> Any:
+        """
+        Return the result, raising the per-call error if there was one.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def __repr__(self):
+        if self.ok:
+            return f"<BatchResult {self.method} ok>"
+        return f"<BatchResult {self.method} error={self.error}>"
+
+
+def encode_request(method: str, params: Sequence, request_id: int) -> bytes:
+    """
+    Serialize a single JSON-RPC request body.
+    """
+    payload = {'version': '1.1', 'method': method, 'params': list(params), 'id': request_id}
+    return json.dumps(payload, default=EncodeDecimal).encode('utf8')
+
+
+def encode_batch(calls: Sequence[Sequence], ids: Sequence[int]) -> bytes:
+    """
+    Serialize ``(method, *params)`` calls as a JSON-RPC array request body.
+    """
+    payload = [
+        {'version': '1.1', 'method': call[0], 'params': list(call[1:]), 'id': request_id}
+        for call, request_id in zip(calls, ids)
+    ]
+    return json.dumps(payload, default=EncodeDecimal).encode('utf8')
+
+
+def parse_response(response: Any) -> Any:
+    """
+    Return the result of a decoded single-call response.
+
+    :raises JSONRPCException: If the node reported an error.
+    """
+    if not isinstance(response, dict):
+        raise JSONRPCException({'code': -343, 'message': 'unexpected JSON-RPC response'})
+    if response.get('error') is not None:
+        raise JSONRPCException(response['error'])
+    if 'result' not in response:
+        raise JSONRPCException({'code': -343, 'message': 'missing JSON-RPC result'})
+    return response['result']
+
+
+def parse_batch_response(calls: Sequence[Sequence], ids: Sequence[int], responses: Any) -> List[BatchResult]:
+    """
+    Match decoded batch responses to their calls by id.
+
+    :raises JSONRPCException: If the node rejected the batch as a whole.
+    """
+    if isinstance(responses, dict):
+        # The node rejected the batch as a whole (e.g. a parse error).
+        raise JSONRPCException(responses.get('error') or {'code': -343, 'message': 'unexpected JSON-RPC response'})
+
+    by_id = {response.get('id'): response for response in responses}
+    results = []
+    for call, request_id in zip(calls, ids):
+        response = by_id.get(request_id)
+        item = BatchResult(call[0], tuple(call[1:]))
+        if response is None or ('result' not in response and response.get('error') is None):
+            item.error = JSONRPCException({'code': -343, 'message': 'missing JSON-RPC result'})
+        elif response.get('error') is not None:
+            item.error = JSONRPCException(response['error'])
+        else:
+            item.result = response['result']
+        results.append(item)
+    return results
+
+
+class ConnectionPool:
+    """
+    Pool of persistent keep-alive HTTP connections to a single node.
+
+    Every request checks out its own connection, so the pool is safe to share
+    between threads without serializing requests. At most ``pool_size`` idle
+    connections are kept; idle connections older than ``idle_timeout`` seconds
+    are closed instead of being reused.
+
+    If ``max_connections`` is set, no more than that many requests are in
+    flight at once and further checkouts wait for a free slot. Matching it to
+    the node's ``-rpcthreads`` keeps every RPC worker busy without piling
+    requests into the node's work queue.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        timeout: float = DEFAULT_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_connections: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self._idle: List[tuple] = []  # (connection, released_at), most recently used last
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections) if max_connections else None
+
+    def acquire(self) -> tuple:
+        """
+        Check out a connection.
+
+        :return: ``(connection, reused)`` where ``reused`` tells whether the socket was pooled.
+        :raises JSONRPCException: If no slot frees up within ``timeout`` seconds.
+        :raises DeadlineExceeded: If the caller's deadline passes while waiting for a slot.
+        """
+        if self._slots is not None and not self._slots.acquire(timeout=request_timeout(self.timeout)):
+            if deadline_passed():
+                raise DeadlineExceeded()
+            raise JSONRPCException({'code': -344, 'message': 'timed out waiting for a free RPC connection'})
+        now = time.monotonic()
+        stale = []
+        conn = None
+        with self._lock:
+            while self._idle:
+                candidate, released_at = self._idle.pop()
+                if now - released_at > self.idle_timeout:
+                    stale.append(candidate)
+                else:
+                    conn = candidate
+                    break
+            # Anything left below an expired connection is older still.
+            if stale:
+                stale.extend(c for c, _ in self._idle)
+                self._idle.clear()
+        for candidate in stale:
+            candidate.close()
+        if conn is not None and _is_dropped(conn):
+            # The node closed it while idle; nothing was sent on it, so a fresh socket is safe for any call.
+            conn.close()
+            conn = None
+        if conn is not None:
+            return conn, True
+        return self._new_connection(), False
+
+    def replace(self, conn: http.client.HTTPConnection) -> http.client.HTTPConnection:
+        """
+        Close a broken checked-out connection and return a fresh one in its slot.
+        """
+        conn.close()
+        return self._new_connection()
+
+    def release(self, conn: http.client.HTTPConnection) -> None:
+        """
+        Return a healthy connection to the pool.
+        """
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+        if conn is not None:
+            conn.close()
+        if self._slots is not None:
+            self._slots.release()
+
+    def discard(self, conn: http.client.HTTPConnection) -> None:
+        """
+        Close a connection that failed instead of returning it to the pool.
+        """
+        conn.close()
+        if self._slots is not None:
+            self._slots.release()
+
+    def close(self) -> None:
+        """
+        Close all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+
+def _is_dropped(conn: http.client.HTTPConnection) -> bool:
+    """
+    True if an idle keep-alive connection was closed by the node: its socket is readable (EOF) with no request out.
+    """
+    if conn.sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+def is_idempotent(calls: Sequence[Sequence]) -> bool:
+    """
+    True if every call in ``calls`` is safe to send twice (see ``IDEMPOTENT_METHODS``).
+    """
+    return all(call[0] in IDEMPOTENT_METHODS for call in calls)
+
+
+class RPCTransport:
+    """
+    JSON-RPC over HTTP transport for a Pepecoin node.
+
+    Attribute access works like ``AuthServiceProxy`` (``transport.getblockcount()``),
+    so it can be used anywhere an ``rpc_connection`` is expected. On top of that it
+    supports sending many calls as a single JSON-RPC array request via ``batch``.
+
+    HTTP connections are kept alive in a ``ConnectionPool`` and reused across calls,
+    so one transport can be shared by a ``Pepecoin`` instance and all of its accounts.
+    Each request uses its own checked-out connection and request ids are unique
+    per transport, so it is safe to call from many threads at once.
+
+    Observers added with ``add_observer`` are told about every round trip
+    (method, latency, byte sizes, error codes). Without observers calls take
+    the uninstrumented path.
+    """
+
+    def __init__(
+        self,
+        rpc_user: str,
+        rpc_password: str,
+        host: str = '127.0.0.1',
+        port: int = 33873,
+        timeout: float = DEFAULT_TIMEOUT,
+        batch_chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_connections: Optional[int] = None,
+        codec: Any = None,
+    ):
+        """
+        :param rpc_user: RPC username.
+        :param rpc_password: RPC password.
+        :param host: RPC host.
+        :param port: RPC port.
+        :param timeout: Socket timeout in seconds for each HTTP request.
+        :param batch_chunk_size: Maximum number of calls sent in one batch request.
+        :param pool_size: Maximum number of idle keep-alive connections to keep.
+        :param idle_timeout: Seconds after which an idle connection is closed instead of reused.
+        :param max_connections: Maximum number of requests in flight at once, or None for no limit.
+        :param codec: Response decoder (see ``pepecoin.codec``): None picks the fastest exact one installed.
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.batch_chunk_size = batch_chunk_size
+        authpair = f"{rpc_user}:{rpc_password}".encode('utf8')
+        self._auth_header = b'Basic ' + base64.b64encode(authpair)
+        self._ids = itertools.count(1)
+        self.pool = ConnectionPool(host, port, timeout, pool_size, idle_timeout, max_connections)
+        self.observers: tuple = ()
+        self.codec: StdlibCodec = get_codec(codec)
+
+    def __getattr__(self, name: str) -> '_RPCMethod':
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return _RPCMethod(self, name)
+
+    # ------------------------- Single Calls -------------------------
+
+    def call(self, method: str, *params) -> Any:
+        """
+        Perform a single RPC call and return its result.
+
+        :raises JSONRPCException: If the node reports an error.
+        """
+        body = encode_request(method, params, next(self._ids))
+        resend = method in IDEMPOTENT_METHODS
+        if self.observers:
+            return self._observed(method, 1, body, lambda data: parse_response(self._decode(data)), resend)
+        return parse_response(self._decode(self._post(body, resend)))
+
+    def call_raw(self, method: str, *params) -> bytes:
+        """
+        Perform a single RPC call and return the node's response body undecoded.
+
+        The body is the JSON-RPC envelope ``{"result":...,"error":null,"id":...}``
+        exactly as the node sent it, for callers that only forward or store it.
+        It is decoded only if it does not visibly report success.
+
+        :raises JSONRPCException: If the node reports an error.
+        """
+        body = encode_request(method, params, next(self._ids))
+        resend = method in IDEMPOTENT_METHODS
+        if self.observers:
+            return self._observed(method, 1, body, self._check_raw, resend)
+        return self._check_raw(self._post(body, resend))
+
+    def _check_raw(self, data: bytes) -> bytes:
+        if not is_error_free(data):
+            parse_response(self._decode(data))
+        return data
+
+    def stream(self, method: str, *params, chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Perform a single RPC call and yield the response body in chunks as it arrives.
+
+        For responses too large to hold in memory, e.g. ``listsinceblock`` on a big
+        wallet (see ``pepecoin.codec.ArrayStreamDecoder``). The connection goes back
+        to the pool once the body has been read, and is closed if the consumer stops early.
+
+        :raises JSONRPCException: If the node answers with an HTTP error status.
+        """
+        body = encode_request(method, params, next(self._ids))
+        observers = self.observers
+        if observers:
+            notify_started(observers, method)
+        start = time.perf_counter()
+        received = 0
+        errors: tuple = ()
+        conn, reused = self.pool.acquire()
+        complete = False
+        try:
+            try:
+                response = self._request(conn, body)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if not reused or method not in IDEMPOTENT_METHODS:
+                    raise
+                logger.debug("Pooled RPC connection was closed by the node; reconnecting.")
+                conn = self.pool.replace(conn)
+                response = self._request(conn, body)
+            if response.status != 200:
+                # Error replies are small; decode them to raise the node's error.
+                data = response.read()
+                received = len(data)
+                complete = True
+                parse_response(self._decode(data))
+                yield data
+                return
+            while True:
+                chunk = response.read(chunk_size)
+                if not chunk:
+                    break
+                received += len(chunk)
+                yield chunk
+            complete = True
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            errors = (error_code(e),)
+            if isinstance(e, socket.timeout) and deadline_passed():
+                raise DeadlineExceeded() from e
+            raise
+        finally:
+            if complete:
+                self.pool.release(conn)
+            else:
+                self.pool.discard(conn)
+            if observers:
+                notify_finished(observers, RPCEvent(method, 1, time.perf_counter() - start,
+                                                    len(body), received, errors))
+
+    # ------------------------- Batch Calls -------------------------
+
+    def batch(self, calls: Sequence[Sequence], chunk_size: Optional[int] = None) -> List[BatchResult]:
+        """
+        Send many calls as JSON-RPC array requests.
+
+        :param calls: Sequence of ``(method, *params)`` tuples or lists.
+        :param chunk_size: Maximum calls per HTTP request; defaults to ``batch_chunk_size``.
+        :return: One ``BatchResult`` per call, in the order the calls were given.
+        :raises JSONRPCException: If a whole chunk is rejected by the node.
+        """
+        chunk_size = chunk_size or self.batch_chunk_size
+        results: List[BatchResult] = []
+        for start in range(0, len(calls), chunk_size):
+            results.extend(self._batch_chunk(calls[start:start + chunk_size]))
+        return results
+
+    def _batch_chunk(self, calls: Sequence[Sequence]) -> List[BatchResult]:
+        if not calls:
+            return []
+        ids = [next(self._ids) for _ in calls]
+        body = encode_batch(calls, ids)
+        resend = is_idempotent(calls)
+        if self.observers:
+            return self._observed(batch_label(calls), len(calls), body,
+                                  lambda data: parse_batch_response(calls, ids, self._decode(data)), resend)
+        return parse_batch_response(calls, ids, self._decode(self._post(body, resend)))
+
+    # ------------------------- Instrumentation -------------------------
+
+    def add_observer(self, observer: RPCObserver) -> None:
+        """
+        Report every request to ``observer`` (see ``pepecoin.instrumentation``).
+        """
+        self.observers = self.observers + (observer,)
+
+    def remove_observer(self, observer: RPCObserver) -> None:
+        self.observers = tuple(o for o in self.observers if o is not observer)
+
+    def _observed(self, method: str, calls: int, body: bytes, parse, resend: bool) -> Any:
+        observers = self.observers
+        notify_started(observers, method)
+        start = time.perf_counter()
+        data = b''
+        errors: tuple = ()
+        try:
+            data = self._post(body, resend)
+            result = parse(data)
+            if method.startswith('batch'):
+                errors = tuple(error_code(r.error) for r in result if r.error is not None)
+            return result
+        except BaseException as e:
+            errors = (error_code(e),)
+            raise
+        finally:
+            notify_finished(observers, RPCEvent(method, calls, time.perf_counter() - start,
+                                                len(body), len(data), errors))
+
+    # ------------------------- HTTP -------------------------
+
+    def _decode(self, data: bytes) -> Any:
+        return self.codec.decode(data)
+
+    def _post(self, body: bytes, resend: bool) -> bytes:
+        """
+        :param resend: The request is idempotent, so it may be sent again if the pooled connection died under it.
+        """
+        conn, reused = self.pool.acquire()
+        try:
+            try:
+                data = self._send(conn, body)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if not reused or not resend:
+                    raise
+                # The node closed an idle keep-alive connection; retry once on a fresh socket.
+                logger.debug("Pooled RPC connection was closed by the node; reconnecting.")
+                conn = self.pool.replace(conn)
+                data = self._send(conn, body)
+        except BaseException as e:
+            self.pool.discard(conn)
+            if isinstance(e, socket.timeout) and deadline_passed():
+                raise DeadlineExceeded() from e
+            raise
+        self.pool.release(conn)
+        return data
+
+    def _send(self, conn: http.client.HTTPConnection, body: bytes) -> bytes:
+        return self._request(conn, body).read()
+
+    def _request(self, conn: http.client.HTTPConnection, body: bytes) -> http.client.HTTPResponse:
+        # Cut the socket timeout to whatever is left of the caller's deadline (see ``resilience.deadline``).
+        timeout = request_timeout(self.timeout)
+        if conn.timeout != timeout:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        conn.request('POST', '/', body, {
+            'Host': self.host,
+            'User-Agent': USER_AGENT,
+            'Authorization': self._auth_header,
+            'Content-Type': 'application/json',
+        })
+        response = conn.getresponse()
+        if response.getheader('Content-Type') != 'application/json':
+            raise JSONRPCException({
+                'code': -342,
+                'message': f"non-JSON HTTP response with '{response.status} {response.reason}' from server",
+            })
+        return response
+
+    @property
+    def primary_transport(self) -> 'RPCTransport':
+        """
+        The transport writes go to: this one. Defined so it is not taken for an RPC method.
+        """
+        return self
+
+    def close(self) -> None:
+        """
+        Close all pooled HTTP connections. New ones are opened on the next call.
+        """
+        self.pool.close()
+
+
+class _RPCMethod:
+    __slots__ = ('_transport', '_name')
+
+    def __init__(self, transport: RPCTransport, name: str):
+        self._transport = transport
+        self._name = name
+
+    def __call__(self, *params) -> Any:
+        return self._transport.call(self._name, *params)
+
+
+class RPCBatch:
+    """
+    Collects RPC calls and sends them as one batch.
+
+    Usable as a context manager; the batch is executed when the block exits::
+
+        with node.new_batch() as batch:
+            for height in range(1000, 1100):
+                batch.getblockhash(height)
+        hashes = [r.unwrap() for r in batch.results]
+    """
+
+    def __init__(self, transport: RPCTransport, chunk_size: Optional[int] = None):
+        self._transport = transport
+        self._chunk_size = chunk_size
+        self._calls: List[tuple] = []
+        self.results: List[BatchResult] = []
+
+    def add(self, method: str, *params) -> int:
+        """
+        Queue a call and return its index in ``results``.
+        """
+        self._calls.append((method,) + params)
+        return len(self._calls) - 1
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *params: self.add(name, *params)
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def execute(self) -> List[BatchResult]:
+        """
+        Send all queued calls and return their results in order.
+        """
+        self.results = self._transport.batch(self._calls, self._chunk_size)
+        self._calls = []
+        return self.results
+
+    def __enter__(self) -> 'RPCBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.execute()
+        return False
@@ -4,6 +4,8 @@
 # import time
 # from pepecoin import Pepecoin
 import logging
+from decimal import Decimal
+from typing import Dict, Iterator, List, NamedTuple, Optional
 
 # Configure logging to display info messages
 logging.basicConfig(level=logging.INFO)
@@ -45,45 +47,77 @@ def bring_addresses_by_account(pepecoin_node, account_name) :
             logger.error(f"Error calling getaddressesbyaccount('{account_name}'): {e}")
 
 
+class AddressRecord(NamedTuple):
+    """
+    One wallet address as reported by ``listreceivedbyaddress``.
+    """
+    address: str
+    account: Optional[str]
+    amount: Decimal
+    confirmations: int
+
+
+def iter_all_addresses(pepecoin_node, minconf: int = 0, include_empty: bool = True,
+                       batch_size: int = 500) -> Iterator[AddressRecord]:
+    """
+    Yield every address known by the node, in the order the node lists them.
+
+    The account of each address is taken from the ``account`` field that
+    ``listreceivedbyaddress`` already returns. Only addresses without that field
+    are resolved with ``getaccount``, batched ``batch_size`` at a time.
+    Processed entries are released as they are yielded, so callers that consume
+    the generator incrementally never hold a second copy of the wallet.
+    """
+    # listreceivedbyaddress( minconf, include_empty )
+    # minconf=0: include all transactions, even unconfirmed
+    # include_empty=True: include addresses that haven't received any payments
+    addresses_info = pepecoin_node.rpc_connection.listreceivedbyaddress(minconf, include_empty)
+    logger.info(f"Total existing addresses result: {len(addresses_info)}")
+
+    # Pop from the end of a reversed list so each entry is dropped once it is consumed.
+    addresses_info.reverse()
+    while addresses_info:
+        window = [addresses_info.pop() for _ in range(min(batch_size, len(addresses_info)))]
+        missing = [info['address'] for info in window if info.get('account', info.get('label')) is None]
+        accounts = _lookup_accounts(pepecoin_node, missing) if missing else {}
+        for info in window:
+            address = info['address']
+            account = info.get('account', info.get('label'))
+            if account is None:
+                account = accounts.get(address)
+            yield AddressRecord(address, account, _to_decimal(info['amount']), info.get('confirmations', 0))
+
+
+def _to_decimal(amount) -> Decimal:
+    return amount if isinstance(amount, Decimal) else Decimal(str(amount))
+
+
+def _lookup_accounts(pepecoin_node, addresses: List[str]) -> Dict[str, Optional[str]]:
+    accounts = {}
+    for address, result in zip(addresses, pepecoin_node.rpc_connection.batch([("getaccount", a) for a in addresses])):
+        if not result.ok:
+            # If getaccount is not supported or fails, set None or a default
+            logger.warning(f"Error calling getaccount({address}): {result.error}")
+        accounts[address] = result.result
+    return accounts
+
+
 def get_all_addresses(pepecoin_node):
     """
     Retrieve all addresses known by the node and their total amount received.
     This includes addresses with zero balance, if any.
-    Mark the first address for easy access later.
+
+    :return: Dict mapping each address to the amount it received, as ``Decimal``.
+             Use ``iter_all_addresses`` to stream records (with accounts) instead.
     """
     try:
-        # listreceivedbyaddress( minconf, include_empty ) 
-        # minconf=0: include all transactions, even unconfirmed
-        # include_empty=True: include addresses that haven't received any payments
-        addresses_info = pepecoin_node.rpc_connection.listreceivedbyaddress(0, True)
-        logger.info(f"Total existing addresses result: {len(addresses_info)}")
-        
-
-        # addresses_grouped = pepecoin_node.rpc_connection.listaddressgroupings()
-        # logger.info(f"listaddressgroupings result: {addresses_grouped}")
-        
-        
         all_addresses = {}
-        first_address = None
-        
-        for i, info in enumerate(addresses_info):
-            address = info['address']
-            amount = float(info['amount'])
-            
-            try:
-                account_name = pepecoin_node.rpc_connection.getaccount(address)
-            except Exception as e:
-                # If getaccount is not supported or fails, set None or a default
-                account_name = None
-                logger.warning(f"Error calling getaccount({address}): {e}")
-
-            all_addresses[address] = amount
-            
-            logger.info(f"   Address {i}: {address} , Account {account_name} ,  Balance: {amount} $PEP")
-            
-            
+        for i, record in enumerate(iter_all_addresses(pepecoin_node)):
+            all_addresses[record.address] = record.amount
+            logger.debug(f"   Address {i}: {record.address} , Account {record.account} ,  Balance: {record.amount} $PEP")
 
+        logger.info(f"Retrieved {len(all_addresses)} addresses.")
         return all_addresses
     except Exception as e:
         logger.error(f"Failed to retrieve addresses: {e}")
-        return {}
\ No newline at end of file
+        return {}
@@ -44,6 +44,10 @@ setup(
                         'python-dotenv',
                         'python-bitcoinrpc',
                       'click'],
+    extras_require={
+        'fast': ['orjson'],  # faster exact response decoding, see pepecoin/codec.py
+        'zmq': ['pyzmq'],  # push notifications, see pepecoin/notifications.py
+    },
     classifiers=[
         'Development Status :: 3 - Alpha',  # Development status
         'Intended Audience :: Developers',